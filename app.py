@@ -1,11 +1,53 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, Response, stream_with_context
+from werkzeug.local import LocalProxy
+from functools import wraps
+import click
+from datetime import date, datetime
+from decimal import Decimal
+import json
 import os
-from conexion import db  # Importar la conexión MySQL
+import shutil
+import tempfile
+from conexion import db, ErrorBD, es_duplicado  # Conexión a MySQL (o SQLite con DB_BACKEND=sqlite)
+from busqueda import indice
+import importador
+import sesiones
+import identidad
+import contrasenas
+import imagenes
+import estaticos
+import respuestas
+from respuestas import etag_catalogo
+import fragmentos
+from fragmentos import pagina_anonima
+import perfilador
+import carrito
+from carrito import carritos
+from models import Usuario, Producto, Favorito, ResumenVendedor
+from favoritos import cache_favoritos
 
 app = Flask(__name__)
 app.secret_key = 'tu_clave_secreta_aqui'  # Cambia esto por una clave secreta segura
 
+# La cookie solo lleva el ID de la sesión; los datos quedan en el servidor
+app.session_interface = sesiones.crear_interfaz(app)
+
+# CSS, JS e imágenes con hash en la URL y caché de un año (ESTATICOS_VERSIONADOS=0 en desarrollo)
+if os.environ.get('ESTATICOS_VERSIONADOS', '1') != '0':
+    estaticos.iniciar(app)
+
+# HTML y JSON comprimidos con brotli/gzip según Accept-Encoding
+respuestas.iniciar(app)
+
+# {% call fragmento(...) %} en las plantillas: HTML cacheado por versión del catálogo
+fragmentos.iniciar(app)
+
+# Consultas por petición (Server-Timing), registro de consultas lentas y /metrics
+perfilador.iniciar(app, db)
+
+# Carritos en el servidor (CARRITO_STORE=memoria|sqlite)
+carrito.iniciar(app)
+
 UPLOAD_FOLDER = 'static/imagenes/perfiles'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -18,12 +60,33 @@ def init_db():
         print("Error al conectar con MySQL")
 
 
+def usuario_actual():
+    """Usuario de la sesión; sale del mapa de identidad o de la caché de usuarios si ya se leyó"""
+    if 'user_id' not in session:
+        return None
+    return Usuario.buscar_por_id(session['user_id'])
+
+
+app.jinja_env.globals['variantes_imagen'] = imagenes.variantes
+
+
+@app.context_processor
+def inyectar_usuario():
+    """Expone `usuario` en las plantillas; solo se consulta si la plantilla lo usa"""
+    return {'usuario': LocalProxy(usuario_actual)}
+
+
 # ----------------- Rutas principales -----------------
 
+PRODUCTOS_DESTACADOS = 8
+
 @app.route('/')
+@pagina_anonima
 def index():
     """Página principal"""
-    return render_template('index.html')
+    # Los productos se consultan solo si el fragmento no está en caché
+    return render_template('index.html',
+                           destacados=lambda: Producto.obtener_productos(limit=PRODUCTOS_DESTACADOS))
 
 @app.route('/inicio_vendedor')
 def index_vendedor():
@@ -31,7 +94,8 @@ def index_vendedor():
         flash('No tienes permiso para acceder a esta página', 'error')
         return redirect(url_for('login'))
     
-    return render_template('index_vendedor.html')
+    # Lee las tablas de resumen: no agrega pedidos ni reseñas en cada visita
+    return render_template('index_vendedor.html', panel=ResumenVendedor.panel(session['user_id']))
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -44,18 +108,19 @@ def login():
             flash('Por favor completa todos los campos', 'error')
             return render_template('login.html')
 
-        query = 'SELECT * FROM usuarios WHERE correo = %s'
-        users = db.execute_query(query, (correo,))
+        user = Usuario.buscar_por_correo(correo, fresco=True)
 
-        if users and len(users) > 0:
-            user = users[0]
-            if check_password_hash(user['password_hash'], contraseña):
-                # Guardamos en sesión los datos
+        if user:
+            correcta, hash_nuevo = contrasenas.verificar(user['password_hash'], contraseña)
+            if correcta:
+                if hash_nuevo:
+                    # Hash antiguo (SHA-256 o costo anterior): se reemplaza aprovechando el login
+                    Usuario.actualizar_usuario(user['id_usuario'], {'password_hash': hash_nuevo})
+
+                # En la sesión solo va la identidad; el resto se lee con usuario_actual()
+                session.clear()
+                session.regenerar()
                 session['user_id'] = user['id_usuario']
-                session['user_name'] = user['nombre']
-                session['user_email'] = user['correo']
-                session['user_phone'] = user['telefono']
-                session['user_address'] = user['direccion']
                 session['user_role'] = user['rol']
 
                 flash('Inicio de sesión exitoso', 'success')
@@ -97,14 +162,7 @@ def registrar():
             flash('La contraseña debe tener al menos 6 caracteres', 'error')
             return render_template('registrar.html')
 
-        check_query = 'SELECT id_usuario FROM usuarios WHERE correo = %s'
-        existing_users = db.execute_query(check_query, (correo,))
-
-        if existing_users and len(existing_users) > 0:
-            flash('Ya existe una cuenta con este correo electrónico', 'error')
-            return render_template('registrar.html')
-
-        hashed_password = generate_password_hash(contraseña)
+        hashed_password = contrasenas.hashear(contraseña)
 
         rol_mapping = {
             'cliente': 'COMPRADOR',
@@ -117,8 +175,17 @@ def registrar():
             VALUES (%s, %s, %s, %s, %s, %s, %s)
         '''
 
-        user_id = db.execute_insert(insert_query,
-            (nombre, apellido, correo, telefono, hashed_password, rol_bd, direccion))
+        # El índice único sobre correo rechaza los duplicados, sin consultar antes
+        try:
+            with db.transaction():
+                user_id = db.execute_insert(insert_query,
+                    (nombre, apellido, correo, telefono, hashed_password, rol_bd, direccion))
+        except ErrorBD as e:
+            if es_duplicado(e):
+                flash('Ya existe una cuenta con este correo electrónico', 'error')
+                return render_template('registrar.html')
+            print(f"❌ Error en INSERT: {e}")
+            user_id = None
 
         if user_id:
             flash('Cuenta creada exitosamente', 'success')
@@ -134,14 +201,13 @@ def registrar():
 def logout():
     """Cerrar sesión"""
     session.clear()
+    session.regenerar()
     flash('Sesión cerrada exitosamente', 'success')
     return redirect(url_for('index'))
 
 
 # ----------------- Perfil comprador -----------------
 
-from werkzeug.utils import secure_filename
-
 @app.route('/editar_perfil', methods=['POST'])
 def editar_perfil():
     """Actualizar datos del perfil del comprador"""
@@ -156,13 +222,21 @@ def editar_perfil():
     telefono = request.form.get('telefono')
     direccion = request.form.get('direccion')
 
-    # Si subió nueva foto
+    # Si subió nueva foto: se valida aquí y se procesa en el pool de imágenes;
+    # la columna foto se actualiza cuando las miniaturas están listas
     foto = request.files.get('foto')
-    foto_filename = None
     if foto and foto.filename != '':
-        filename = secure_filename(foto.filename)
-        foto_filename = f"user_{user_id}_{filename}"
-        foto.save(os.path.join(app.config['UPLOAD_FOLDER'], foto_filename))
+        try:
+            datos, _ = imagenes.leer_subida(foto.stream)
+        except imagenes.ImagenInvalida as e:
+            flash(f'No se pudo usar la foto: {e}', 'error')
+            return redirect(url_for('perfil_comprador'))
+
+        def guardar_foto(ruta):
+            Usuario.actualizar_usuario(user_id, {'foto': ruta})
+
+        imagenes.procesar_en_segundo_plano(datos, 'perfiles', al_terminar=guardar_foto)
+        flash('Tu foto se está procesando y aparecerá en unos segundos', 'success')
 
     # Construir query dinámico
     update_fields = []
@@ -183,23 +257,13 @@ def editar_perfil():
     if direccion:
         update_fields.append("direccion = %s")
         params.append(direccion)
-    if foto_filename:
-        update_fields.append("foto = %s")
-        params.append(f"imagenes/perfiles/{foto_filename}")
 
     params.append(user_id)
 
     if update_fields:
         query = f"UPDATE usuarios SET {', '.join(update_fields)} WHERE id_usuario = %s"
         db.execute_update(query, tuple(params))
-
-        # Actualizar sesión
-        if nombre: session['user_name'] = nombre
-        if apellido: session['user_lastname'] = apellido
-        if correo: session['user_email'] = correo
-        if telefono: session['user_phone'] = telefono
-        if direccion: session['user_address'] = direccion
-        if foto_filename: session['user_foto'] = f"imagenes/perfiles/{foto_filename}"
+        identidad.invalidar(user_id)
 
         flash("Perfil actualizado correctamente", "success")
 
@@ -222,15 +286,12 @@ def perfil_vendedor():
 
     user_id = session['user_id']
 
-    query = 'SELECT * FROM usuarios WHERE id_usuario = %s'
-    result = db.execute_query(query, (user_id,))
+    vendedor = Usuario.buscar_por_id(user_id)
 
-    if not result or len(result) == 0:
+    if not vendedor:
         flash('Usuario no encontrado', 'error')
         return redirect(url_for('index'))
 
-    vendedor = result[0]  # suponiendo que execute_query devuelve lista de dicts
-
     return render_template('perfil_vendedor.html', vendedor=vendedor)
 
 
@@ -262,47 +323,126 @@ def carrito_compras():
     if 'user_id' not in session:
         flash('Debes iniciar sesión para acceder a esta página', 'error')
         return redirect(url_for('login'))
-    return render_template('carrito_compras.html')
+    return render_template('carrito_compras.html', carrito=carritos.detalle(session['user_id']))
 
 
 @app.route('/productos')
+@etag_catalogo(por_usuario=True)
+@pagina_anonima
 def productos():
     """Página de productos"""
     query = '''
-        SELECT p.*, u.nombre as vendedor_nombre 
+        SELECT p.*, u.nombre as vendedor_nombre,
+               COALESCE(p.categoria, 'Sin categoría') as categoria_listado
         FROM productos p 
         JOIN usuarios u ON p.id_vendedor = u.id_usuario 
         WHERE p.estado = 'PUBLICADO'
         ORDER BY p.id_producto DESC
     '''
-    productos = db.execute_query(query)
-    return render_template('productos.html', productos=productos)
+    # La consulta corre solo si el fragmento del listado no está en caché
+    return render_template('productos.html', productos=lambda: db.execute_query(query, cache=True) or [])
 
 
-@app.route('/api/productos')
-def api_productos():
-    """API para obtener productos"""
+API_PRODUCTOS_LIMITE = 50       # tamaño de página por defecto
+API_PRODUCTOS_LIMITE_MAX = 200  # máximo permitido en ?limit=
+
+
+def _producto_api(producto):
+    """Convierte una fila de productos al formato que expone la API"""
+    return {
+        'id': producto['id_producto'],
+        'nombre': producto['nombre'],
+        'descripcion': producto['descripcion'],
+        'precio': float(producto['precio']) if producto['precio'] else 0,
+        'categoria': producto['categoria'],
+        'vendedor': producto['vendedor_nombre']
+    }
+
+
+def consulta_api_productos(after=None, limit=None):
+    """Arma el SELECT de /api/productos; retorna (query, params)
+
+    Se comparte con el modo ASGI (asgi.py), que ejecuta la misma consulta con el
+    pool asíncrono.
+    """
     query = '''
-        SELECT p.*, u.nombre as vendedor_nombre 
+        SELECT p.id_producto, p.nombre, p.descripcion, p.precio, p.categoria,
+               u.nombre as vendedor_nombre
         FROM productos p 
         JOIN usuarios u ON p.id_vendedor = u.id_usuario 
         WHERE p.estado = 'PUBLICADO'
-        ORDER BY p.id_producto DESC
     '''
-    productos = db.execute_query(query)
+    params = []
+
+    if after is not None:
+        query += " AND p.id_producto < %s"
+        params.append(after)
+
+    query += " ORDER BY p.id_producto DESC"
+
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, tuple(params)
+
+
+def limite_api_productos(limit):
+    """Ajusta ?limit= al rango permitido"""
+    if limit is None:
+        limit = API_PRODUCTOS_LIMITE
+    return min(max(limit, 1), API_PRODUCTOS_LIMITE_MAX)
+
+
+def pagina_api_productos(productos, limit):
+    """Cuerpo JSON de una página de /api/productos (se consultó una fila de más)"""
+    hay_mas = len(productos) > limit
+    productos_list = [_producto_api(producto) for producto in productos[:limit]]
+    return {
+        'productos': productos_list,
+        'siguiente': productos_list[-1]['id'] if hay_mas else None
+    }
+
+
+@app.route('/api/productos')
+@etag_catalogo()
+def api_productos():
+    """API para obtener productos, paginada por id_producto (?after=&limit=)
+
+    Con ?formato=ndjson la respuesta se transmite por partes, una línea JSON
+    por producto, leyendo desde un cursor del servidor.
+    """
+    after = request.args.get('after', type=int)
+    formato = request.args.get('formato', 'json')
+
+    if formato == 'ndjson':
+        # Sin ?limit= se transmite el catálogo completo desde `after`
+        limit = request.args.get('limit', type=int)
+        query, params = consulta_api_productos(after, max(limit, 1) if limit else None)
+
+        def generar():
+            for producto in db.iter_query(query, params):
+                yield json.dumps(_producto_api(producto), ensure_ascii=False) + '\n'
+
+        return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
+
+    limit = limite_api_productos(request.args.get('limit', type=int))
+
+    # Se pide una fila extra para saber si hay página siguiente
+    query, params = consulta_api_productos(after, limit + 1)
+    productos = db.execute_query(query, params, cache=True)
 
-    productos_list = []
-    for producto in productos:
-        productos_list.append({
-            'id': producto['id_producto'],
-            'nombre': producto['nombre'],
-            'descripcion': producto['descripcion'],
-            'precio': float(producto['precio']) if producto['precio'] else 0,
-            'categoria': producto['categoria'],
-            'vendedor': producto['vendedor_nombre']
-        })
+    return jsonify(pagina_api_productos(productos, limit))
 
-    return jsonify(productos_list)
+@app.route('/api/buscar')
+@etag_catalogo()
+def api_buscar():
+    """Búsqueda de productos por texto, respondida desde el índice en memoria"""
+    texto = request.args.get('q', '').strip()
+    limit = request.args.get('limit', 20, type=int)
+    limit = min(max(limit, 1), API_PRODUCTOS_LIMITE_MAX)
+
+    resultados = indice.buscar(texto, limit) if texto else []
+    return jsonify({'q': texto, 'resultados': resultados})
 
 @app.route('/stock')
 def stock():
@@ -311,8 +451,244 @@ def stock():
         flash('No tienes permiso para acceder a esta página', 'error')
         return redirect(url_for('login'))
 
-    # Aquí más adelante puedes cargar los productos del vendedor desde la base de datos
-    return render_template('stock.html')
+    vendedor_id = session['user_id']
+    return render_template('stock.html',
+                           productos=Producto.obtener_productos_vendedor(vendedor_id),
+                           stock_bajo=ResumenVendedor.stock_bajo(vendedor_id),
+                           umbral_stock=ResumenVendedor.STOCK_BAJO)
+
+@app.route('/stock/importar', methods=['POST'])
+def importar_productos():
+    """Importa un catálogo CSV/JSON/NDJSON del vendedor
+
+    Con ?formato=ndjson la respuesta transmite el avance lote por lote.
+    """
+    if 'user_id' not in session or session.get('user_role') != 'VENDEDOR':
+        flash('No tienes permiso para realizar esta acción', 'error')
+        return redirect(url_for('login'))
+
+    archivo = request.files.get('archivo')
+    if not archivo or archivo.filename == '':
+        flash('Selecciona un archivo para importar', 'error')
+        return redirect(url_for('stock'))
+
+    formato_archivo = importador.formato_de(archivo.filename)
+    if formato_archivo not in importador.LECTORES:
+        flash('El archivo debe ser .csv, .json o .ndjson', 'error')
+        return redirect(url_for('stock'))
+
+    vendedor_id = session['user_id']
+
+    if request.args.get('formato') == 'ndjson':
+        # Flask cierra los archivos subidos al terminar la vista, antes de transmitir
+        # la respuesta: se copian (en disco, por bloques) a un temporal propio
+        copia = tempfile.TemporaryFile()
+        shutil.copyfileobj(archivo.stream, copia)
+        copia.seek(0)
+
+        def generar():
+            try:
+                filas = importador.leer(copia, formato_archivo)
+                for resumen in importador.importar_por_lotes(vendedor_id, filas):
+                    # Los avances intermedios solo cuentan errores; el final trae el detalle
+                    avance = resumen if resumen['fin'] else dict(resumen, errores=len(resumen['errores']))
+                    yield json.dumps(avance, ensure_ascii=False) + '\n'
+            finally:
+                copia.close()
+
+        return Response(generar(), mimetype='application/x-ndjson')
+
+    resumen = importador.importar(vendedor_id, importador.leer(archivo.stream, formato_archivo))
+    flash(f"Importación terminada: {resumen['guardadas']} productos guardados, "
+          f"{resumen['invalidas']} filas con errores", 'success' if not resumen['invalidas'] else 'error')
+    return redirect(url_for('stock'))
+
+# ----------------- API del carrito -----------------
+
+def api_con_sesion(vista):
+    """Responde 401 en JSON si no hay sesión iniciada"""
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({'error': 'Debes iniciar sesión'}), 401
+        return vista(*args, **kwargs)
+    return envoltura
+
+
+def _cantidad_pedida(por_defecto=None):
+    """Cantidad entera del cuerpo JSON, o None si falta o no es válida"""
+    cantidad = (request.get_json(silent=True) or {}).get('cantidad', por_defecto)
+    if isinstance(cantidad, bool) or not isinstance(cantidad, int):
+        return None
+    return cantidad
+
+
+@app.route('/api/carrito')
+@api_con_sesion
+def api_carrito():
+    """Líneas del carrito con precio y stock, y el resumen de la compra"""
+    return jsonify(carritos.detalle(session['user_id']))
+
+@app.route('/api/carrito', methods=['POST'])
+@api_con_sesion
+def api_carrito_agregar():
+    """Agrega unidades de un producto: {"id_producto": 1, "cantidad": 1}"""
+    producto_id = (request.get_json(silent=True) or {}).get('id_producto')
+    cantidad = _cantidad_pedida(1)
+    if not isinstance(producto_id, int) or cantidad is None or cantidad < 1:
+        return jsonify({'error': 'id_producto y cantidad deben ser enteros positivos'}), 400
+    if carritos.agregar(session['user_id'], producto_id, cantidad) is None:
+        return jsonify({'error': 'El producto no está disponible'}), 404
+    return jsonify(carritos.detalle(session['user_id']))
+
+@app.route('/api/carrito/<int:producto_id>', methods=['PUT'])
+@api_con_sesion
+def api_carrito_actualizar(producto_id):
+    """Fija la cantidad de una línea: {"cantidad": 3}; 0 la quita"""
+    cantidad = _cantidad_pedida()
+    if cantidad is None or cantidad < 0:
+        return jsonify({'error': 'cantidad debe ser un entero mayor o igual a cero'}), 400
+    if carritos.fijar(session['user_id'], producto_id, cantidad) is None:
+        return jsonify({'error': 'El producto no está disponible'}), 404
+    return jsonify(carritos.detalle(session['user_id']))
+
+@app.route('/api/carrito/<int:producto_id>', methods=['DELETE'])
+@api_con_sesion
+def api_carrito_quitar(producto_id):
+    """Quita un producto del carrito"""
+    carritos.quitar(session['user_id'], producto_id)
+    return jsonify(carritos.detalle(session['user_id']))
+
+@app.route('/api/carrito', methods=['DELETE'])
+@api_con_sesion
+def api_carrito_vaciar():
+    """Vacía el carrito"""
+    carritos.vaciar(session['user_id'])
+    return jsonify(carritos.detalle(session['user_id']))
+
+# ----------------- API de favoritos -----------------
+
+API_FAVORITOS_IDS_MAX = 200  # productos por consulta en ?ids=
+
+@app.route('/api/favoritos')
+@api_con_sesion
+def api_favoritos():
+    """Cuáles de los productos de ?ids=1,2,3 son favoritos; sin ?ids= retorna todos los IDs"""
+    texto = request.args.get('ids')
+    if texto is None:
+        return jsonify({'favoritos': sorted(Favorito.ids_favoritos(session['user_id']))})
+    try:
+        producto_ids = [int(parte) for parte in texto.split(',') if parte.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids debe ser una lista de enteros separados por comas'}), 400
+    estados = Favorito.estados(session['user_id'], producto_ids[:API_FAVORITOS_IDS_MAX])
+    return jsonify({'favoritos': {str(pid): favorito for pid, favorito in estados.items()}})
+
+@app.route('/api/favoritos/<int:producto_id>', methods=['POST'])
+@api_con_sesion
+def api_favoritos_alternar(producto_id):
+    """Agrega el producto a favoritos, o lo quita si ya estaba"""
+    return jsonify({'id': producto_id, 'favorito': Favorito.alternar(session['user_id'], producto_id)})
+
+# ----------------- API del vendedor -----------------
+
+def _json_panel(valor):
+    """Fechas y decimales del panel a tipos de JSON"""
+    if isinstance(valor, dict):
+        return {clave: _json_panel(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_json_panel(v) for v in valor]
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+
+@app.route('/api/vendedor/panel')
+@api_con_sesion
+def api_panel_vendedor():
+    """Ventas por día, más vendidos, stock bajo y calificaciones (?dias=30)"""
+    if session.get('user_role') != 'VENDEDOR':
+        return jsonify({'error': 'Solo para vendedores'}), 403
+    dias = min(max(request.args.get('dias', 30, type=int), 1), 366)
+    return jsonify(_json_panel(ResumenVendedor.panel(session['user_id'], dias)))
+
+# ----------------- Métricas -----------------
+
+@app.route('/metrics')
+def metrics():
+    """Contadores en formato de texto de Prometheus"""
+    lineas = []
+    if db.cache is not None:
+        for nombre, valor in db.cache.stats().items():
+            lineas.append(f'mercadovecino_query_cache_{nombre} {valor}')
+    for nombre, valor in identidad.cache_usuarios.stats().items():
+        lineas.append(f'mercadovecino_usuarios_cache_{nombre} {valor}')
+    for nombre, valor in cache_favoritos.stats().items():
+        lineas.append(f'mercadovecino_favoritos_cache_{nombre} {valor}')
+    for nombre, valor in fragmentos.cache_fragmentos.stats().items():
+        lineas.append(f'mercadovecino_fragmentos_cache_{nombre} {valor}')
+    lineas.extend(perfilador.perfilador.metricas())
+    return Response('\n'.join(lineas) + '\n', mimetype='text/plain; version=0.0.4')
+
+# ----------------- Comandos -----------------
+
+@app.cli.command('reconstruir-ratings')
+def reconstruir_ratings():
+    """Recalcula rating, rating_suma y total_resenas de todos los productos"""
+    from models import Resena
+    filas = Resena.reconstruir_ratings()
+    print(f"✅ Resumen de calificaciones reconstruido ({filas} productos actualizados)")
+
+
+@app.cli.command('reconstruir-resumenes')
+def reconstruir_resumenes():
+    """Recalcula las tablas de resumen del panel del vendedor desde pedidos y reseñas"""
+    filas = ResumenVendedor.reconstruir()
+    if filas is not None:
+        print(f"✅ Resúmenes del vendedor reconstruidos ({filas} productos con ventas)")
+
+
+@app.cli.command('importar-productos')
+@click.argument('vendedor_id', type=int)
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--formato', help='csv, json o ndjson (por defecto según la extensión)')
+@click.option('--lote', default=importador.TAMAÑO_LOTE, show_default=True, help='Filas por transacción')
+def importar_productos_cli(vendedor_id, archivo, formato, lote):
+    """Importa un catálogo de productos para VENDEDOR_ID desde ARCHIVO"""
+    with open(archivo, 'rb') as f:
+        try:
+            filas = importador.leer(f, formato or importador.formato_de(archivo))
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--formato')
+        for resumen in importador.importar_por_lotes(vendedor_id, filas, lote):
+            print(f"… {resumen['procesadas']} filas leídas, {resumen['guardadas']} guardadas, "
+                  f"{resumen['invalidas']} con errores")
+
+    for error in resumen['errores']:
+        print(f"❌ {error}")
+    print(f"✅ Importación terminada: {resumen['guardadas']} productos guardados")
+
+
+@app.cli.command('migrar')
+def migrar():
+    """Aplica las migraciones pendientes de migraciones/"""
+    import esquema
+    aplicadas = esquema.migrar()
+    if not aplicadas:
+        print("✅ El esquema ya está al día")
+
+
+@app.cli.command('verificar-indices')
+def verificar_indices():
+    """Falla si alguna consulta de models.py hace un escaneo completo de tabla o no se pudo verificar"""
+    import esquema
+    problemas = esquema.reportar_indices()
+    if problemas is None:
+        raise SystemExit(2)
+    if problemas:
+        raise SystemExit(1)
 
 # ----------------- Inicialización -----------------
 
@@ -0,0 +1,176 @@
+"""
+Modo ASGI: rutas de lectura asíncronas sobre un pool asíncrono de MySQL
+
+/api/productos (JSON y NDJSON) y /api/buscar se atienden como corrutinas: una
+petición que espera a MySQL no ocupa un hilo, así un proceso mantiene cientos
+de clientes lentos a la vez. El resto de la aplicación Flask (páginas, sesión,
+formularios) se atiende igual que en WSGI, en hilos, a través de asgiref.
+
+Las respuestas son las mismas que en WSGI, incluidos ETag/304 y compresión.
+
+Uso:
+    uvicorn asgi:app --workers 4
+"""
+import asyncio
+import json
+from contextlib import aclosing
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.http import parse_accept_header, parse_etags
+
+import app as aplicacion
+from busqueda import indice
+from conexion import db
+from conexion_async import AsyncDatabaseConnection, ErrorAsync
+from respuestas import calcular_etag, comprimir_cuerpo
+
+db_async = AsyncDatabaseConnection.desde(db)
+flask_asgi = WsgiToAsgi(aplicacion.app)
+
+
+# ---------- Utilidades ----------
+
+class Peticion:
+    """Lo que las rutas asíncronas necesitan del scope de ASGI"""
+
+    def __init__(self, scope):
+        self.path = scope['path']
+        self.query_string = scope.get('query_string', b'').decode('latin-1')
+        self.args = {clave: valores[0] for clave, valores in parse_qs(self.query_string).items()}
+        self.headers = {nombre.decode('latin-1').lower(): valor.decode('latin-1')
+                        for nombre, valor in scope.get('headers', [])}
+        self.metodo = scope['method']
+
+    @property
+    def full_path(self):
+        # Igual que request.full_path de werkzeug, para que el ETag coincida entre modos
+        return f"{self.path}?{self.query_string}"
+
+    def entero(self, nombre, defecto=None):
+        try:
+            return int(self.args[nombre])
+        except (KeyError, ValueError):
+            return defecto
+
+
+def _cabeceras(extra):
+    return [(nombre.lower().encode('latin-1'), valor.encode('latin-1')) for nombre, valor in extra.items()]
+
+
+async def responder(send, peticion, cuerpo, tipo='application/json', status=200, cabeceras=None):
+    """Envía una respuesta completa, comprimida si el cliente lo acepta"""
+    cabeceras = dict(cabeceras or {})
+    cabeceras['Content-Type'] = tipo
+    cabeceras['Vary'] = 'Accept-Encoding'
+    cuerpo, codificacion = comprimir_cuerpo(cuerpo, parse_accept_header(peticion.headers.get('accept-encoding')))
+    if codificacion:
+        cabeceras['Content-Encoding'] = codificacion
+    cabeceras['Content-Length'] = str(len(cuerpo))
+    await send({'type': 'http.response.start', 'status': status, 'headers': _cabeceras(cabeceras)})
+    await send({'type': 'http.response.body', 'body': b'' if peticion.metodo == 'HEAD' else cuerpo})
+
+
+async def condicional(send, peticion):
+    """Calcula el ETag del catálogo; si el cliente ya lo tiene responde 304 y retorna None"""
+    # La versión del catálogo puede consultar MySQL (cada pocos segundos): va en un hilo
+    etag = await asyncio.to_thread(calcular_etag, peticion.full_path)
+    if parse_etags(peticion.headers.get('if-none-match')).contains_weak(etag):
+        await send({'type': 'http.response.start', 'status': 304,
+                    'headers': _cabeceras({'ETag': f'W/"{etag}"', 'Cache-Control': 'no-cache'})})
+        await send({'type': 'http.response.body', 'body': b''})
+        return None
+    return {'ETag': f'W/"{etag}"', 'Cache-Control': 'no-cache'}
+
+
+# ---------- Rutas asíncronas ----------
+
+async def api_productos(peticion, send):
+    """Versión asíncrona de app.api_productos"""
+    cabeceras = await condicional(send, peticion)
+    if cabeceras is None:
+        return
+
+    after = peticion.entero('after')
+
+    if peticion.args.get('formato') == 'ndjson':
+        limit = peticion.entero('limit')
+        query, params = aplicacion.consulta_api_productos(after, max(limit, 1) if limit else None)
+        cabeceras['Content-Type'] = 'application/x-ndjson'
+        await send({'type': 'http.response.start', 'status': 200, 'headers': _cabeceras(cabeceras)})
+        if peticion.metodo != 'HEAD':
+            try:
+                # aclosing: si el cliente se va y send() falla, el cursor suelta la conexión ya
+                async with aclosing(db_async.iter_query(query, params)) as productos:
+                    async for producto in productos:
+                        linea = json.dumps(aplicacion._producto_api(producto), ensure_ascii=False) + '\n'
+                        await send({'type': 'http.response.body', 'body': linea.encode(), 'more_body': True})
+            except ErrorAsync:
+                # El 200 ya salió: una última línea avisa del error y la respuesta se corta
+                # sin terminarla, para que el cliente no la tome por completa
+                linea = json.dumps({'error': 'Error al leer los productos'}) + '\n'
+                await send({'type': 'http.response.body', 'body': linea.encode(), 'more_body': True})
+                raise
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    limit = aplicacion.limite_api_productos(peticion.entero('limit'))
+    query, params = aplicacion.consulta_api_productos(after, limit + 1)
+    productos = await db_async.execute_query(query, params, cache=True)
+    cuerpo = json.dumps(aplicacion.pagina_api_productos(productos, limit), ensure_ascii=False).encode()
+    await responder(send, peticion, cuerpo, cabeceras=cabeceras)
+
+
+async def api_buscar(peticion, send):
+    """Versión asíncrona de app.api_buscar"""
+    cabeceras = await condicional(send, peticion)
+    if cabeceras is None:
+        return
+
+    texto = peticion.args.get('q', '').strip()
+    limit = min(max(peticion.entero('limit', 20), 1), aplicacion.API_PRODUCTOS_LIMITE_MAX)
+
+    if texto and indice.vencido():
+        # Construir el índice lee todo el catálogo: se hace fuera del event loop
+        await asyncio.to_thread(indice.asegurar_cargado)
+    resultados = indice.buscar(texto, limit) if texto else []
+    cuerpo = json.dumps({'q': texto, 'resultados': resultados}, ensure_ascii=False).encode()
+    await responder(send, peticion, cuerpo, cabeceras=cabeceras)
+
+
+RUTAS = {
+    '/api/productos': api_productos,
+    '/api/buscar': api_buscar,
+}
+
+
+# ---------- Aplicación ----------
+
+async def _lifespan(receive, send):
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'lifespan.startup':
+            if await db_async.connect():
+                await send({'type': 'lifespan.startup.complete'})
+            else:
+                await send({'type': 'lifespan.startup.failed', 'message': 'No se pudo conectar a MySQL'})
+        elif mensaje['type'] == 'lifespan.shutdown':
+            await db_async.disconnect()
+            await asyncio.to_thread(db.disconnect)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """Aplicación ASGI: rutas asíncronas propias y Flask para todo lo demás"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+        ruta = RUTAS.get(scope['path'])
+        if ruta is not None:
+            await ruta(Peticion(scope), send)
+            return
+
+    await flask_asgi(scope, receive, send)
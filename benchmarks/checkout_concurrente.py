@@ -0,0 +1,135 @@
+"""
+Benchmark: compras simultáneas con Pedido.crear_pedido_completo
+
+Compara dos modos contra la misma base de datos MySQL (con el esquema de migraciones/):
+  - por_fila: crear_pedido + agregar_item_pedido + UPDATE de stock, un commit por fila
+  - transaccional: crear_pedido_completo, una transacción con bloqueo de filas
+
+Crea un vendedor, un comprador y productos de prueba, y los borra al terminar.
+Al final verifica que ningún producto haya quedado con stock negativo.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/checkout_concurrente.py --hilos 16 --compras 50 --items 15
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conexion import db  # noqa: E402
+from models import Pedido, StockInsuficiente  # noqa: E402
+
+
+def sembrar(productos, stock):
+    """Crea los usuarios y productos de prueba y retorna (comprador_id, vendedor_id, producto_ids)"""
+    marca = uuid.uuid4().hex[:8]
+    vendedor_id = db.execute_insert("""
+        INSERT INTO usuarios (nombre, apellido, correo, password_hash, rol)
+        VALUES ('bench', 'vendedor', %s, 'x', 'VENDEDOR')
+    """, (f"bench-vendedor-{marca}@mercadovecino.co",))
+    comprador_id = db.execute_insert("""
+        INSERT INTO usuarios (nombre, apellido, correo, password_hash, rol)
+        VALUES ('bench', 'comprador', %s, 'x', 'COMPRADOR')
+    """, (f"bench-comprador-{marca}@mercadovecino.co",))
+    producto_ids = [
+        db.execute_insert("""
+            INSERT INTO productos (id_vendedor, nombre, descripcion, categoria, precio, stock)
+            VALUES (%s, %s, 'bench', 'bench', 1000, %s)
+        """, (vendedor_id, f"bench-{marca}-{i}", stock))
+        for i in range(productos)
+    ]
+    return comprador_id, vendedor_id, producto_ids
+
+
+def limpiar(comprador_id, vendedor_id, producto_ids):
+    """Borra todo lo creado por sembrar() y por las compras"""
+    marcadores = ', '.join(['%s'] * len(producto_ids))
+    # Primero los resúmenes del panel, que referencian a los productos y al vendedor
+    db.execute_update(f"DELETE FROM ventas_producto WHERE id_producto IN ({marcadores})", producto_ids)
+    for tabla in ('ventas_vendedor_dia', 'calificaciones_vendedor_dia'):
+        db.execute_update(f"DELETE FROM {tabla} WHERE id_vendedor = %s", (vendedor_id,))
+    db.execute_update(f"DELETE FROM pedido_items WHERE id_producto IN ({marcadores})", producto_ids)
+    db.execute_update("DELETE FROM pedidos WHERE id_comprador = %s", (comprador_id,))
+    db.execute_update(f"DELETE FROM productos WHERE id_producto IN ({marcadores})", producto_ids)
+    db.execute_update("DELETE FROM usuarios WHERE id_usuario IN (%s, %s)", (comprador_id, vendedor_id))
+
+
+def compra_por_fila(comprador_id, vendedor_id, items):
+    """Camino anterior: un INSERT/UPDATE con su commit por cada fila, sin bloqueo"""
+    pedido_id = Pedido.crear_pedido(comprador_id, vendedor_id, 1000 * sum(i['cantidad'] for i in items))
+    for item in items:
+        Pedido.agregar_item_pedido(pedido_id, item['id_producto'], item['cantidad'], 1000)
+        db.execute_update("UPDATE productos SET stock = stock - %s WHERE id_producto = %s",
+                          (item['cantidad'], item['id_producto']))
+
+
+def medir(modo, hilos, compras, items_por_compra, productos, stock):
+    comprador_id, vendedor_id, producto_ids = sembrar(productos, stock)
+    exitosas = [0] * hilos
+    rechazadas = [0] * hilos
+
+    def cliente(i):
+        rnd = random.Random(i)
+        for _ in range(compras):
+            items = [{'id_producto': pid, 'cantidad': 1}
+                     for pid in rnd.sample(producto_ids, items_por_compra)]
+            if modo == 'por_fila':
+                compra_por_fila(comprador_id, vendedor_id, items)
+                exitosas[i] += 1
+            else:
+                try:
+                    if Pedido.crear_pedido_completo(comprador_id, items):
+                        exitosas[i] += 1
+                except StockInsuficiente:
+                    rechazadas[i] += 1
+
+    workers = [threading.Thread(target=cliente, args=(i,)) for i in range(hilos)]
+    inicio = time.monotonic()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    duracion = time.monotonic() - inicio
+
+    marcadores = ', '.join(['%s'] * len(producto_ids))
+    minimo = db.execute_query(
+        f"SELECT MIN(stock) as minimo FROM productos WHERE id_producto IN ({marcadores})", producto_ids)
+    limpiar(comprador_id, vendedor_id, producto_ids)
+
+    return {
+        'modo': modo,
+        'hilos': hilos,
+        'items_por_compra': items_por_compra,
+        'segundos': round(duracion, 3),
+        'compras': sum(exitosas),
+        'rechazadas_sin_stock': sum(rechazadas),
+        'compras_por_segundo': round(sum(exitosas) / duracion, 1),
+        'stock_minimo_final': minimo[0]['minimo'] if minimo else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hilos', type=int, default=8)
+    parser.add_argument('--compras', type=int, default=50, help='Compras por hilo')
+    parser.add_argument('--items', type=int, default=15, help='Productos distintos por compra')
+    parser.add_argument('--productos', type=int, default=40)
+    parser.add_argument('--stock', type=int, default=200, help='Stock inicial de cada producto')
+    args = parser.parse_args()
+
+    db.pool_max = max(db.pool_max, args.hilos)
+    db.connect()
+    resultados = [medir(modo, args.hilos, args.compras, args.items, args.productos, args.stock)
+                  for modo in ('por_fila', 'transaccional')]
+    print(json.dumps(resultados, indent=2, default=str))
+    db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: latencia de /login bajo carga concurrente
+
+Lanza clientes que inician sesión sin parar y, al mismo tiempo, clientes que
+consultan el catálogo (/api/productos). Compara dos modos de contrasenas.py:
+  - en_linea: el hash se calcula en el hilo de la petición (PASSWORD_HILOS=0)
+  - pool: el hash corre en el pool acotado (--pool hilos)
+
+Reporta p50/p95/p99 de ambos tipos de petición: con el pool, el catálogo no
+debería degradarse aunque los logins saturen su cupo.
+
+Crea usuarios de prueba y los borra al terminar. Uso (desde la raíz del proyecto):
+    python benchmarks/login_concurrente.py --logins 16 --catalogo 4 --segundos 10
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as aplicacion  # noqa: E402
+import contrasenas  # noqa: E402
+from conexion import db  # noqa: E402
+
+CONTRASEÑA = 'benchmark-123'
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def resumen(latencias):
+    return {
+        'peticiones': len(latencias),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 1) if latencias else None,
+        'p95_ms': round(percentil(latencias, 95) * 1000, 1) if latencias else None,
+        'p99_ms': round(percentil(latencias, 99) * 1000, 1) if latencias else None,
+    }
+
+
+def sembrar(cantidad):
+    """Crea `cantidad` compradores con la misma contraseña y retorna sus correos"""
+    marca = uuid.uuid4().hex[:8]
+    hash_guardado = contrasenas.hashear(CONTRASEÑA)
+    correos = [f"bench-login-{marca}-{i}@mercadovecino.co" for i in range(cantidad)]
+    db.execute_many("""
+        INSERT INTO usuarios (nombre, apellido, correo, password_hash, rol)
+        VALUES ('bench', 'login', %s, %s, 'COMPRADOR')
+    """, [(correo, hash_guardado) for correo in correos])
+    return correos
+
+
+def limpiar(correos):
+    marcadores = ', '.join(['%s'] * len(correos))
+    db.execute_update(f"DELETE FROM usuarios WHERE correo IN ({marcadores})", correos)
+
+
+def medir(modo, logins, catalogo, segundos, pool, correos):
+    anterior = contrasenas.servicio
+    contrasenas.servicio = contrasenas.ServicioContrasenas(
+        algoritmo=os.environ.get('PASSWORD_ALGORITMO', 'scrypt'), costo=os.environ.get('PASSWORD_COSTO'),
+        hilos=0 if modo == 'en_linea' else pool)
+    metodo = contrasenas.servicio.metodo
+
+    lat_login = [[] for _ in range(logins)]
+    lat_catalogo = [[] for _ in range(catalogo)]
+    fallidos = [0] * logins
+    fin = time.monotonic() + segundos
+
+    def cliente_login(i):
+        n = 0
+        while time.monotonic() < fin:
+            client = aplicacion.app.test_client()
+            correo = correos[(i + n * logins) % len(correos)]
+            n += 1
+            inicio = time.monotonic()
+            resp = client.post('/login', data={'correo': correo, 'contraseña': CONTRASEÑA})
+            lat_login[i].append(time.monotonic() - inicio)
+            if resp.status_code != 302:
+                fallidos[i] += 1
+
+    def cliente_catalogo(i):
+        client = aplicacion.app.test_client()
+        while time.monotonic() < fin:
+            inicio = time.monotonic()
+            client.get('/api/productos?limit=20')
+            lat_catalogo[i].append(time.monotonic() - inicio)
+
+    workers = ([threading.Thread(target=cliente_login, args=(i,)) for i in range(logins)] +
+               [threading.Thread(target=cliente_catalogo, args=(i,)) for i in range(catalogo)])
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    contrasenas.servicio.cerrar()
+    contrasenas.servicio = anterior
+
+    return {
+        'modo': modo,
+        'metodo': metodo,
+        'logins_fallidos': sum(fallidos),
+        'login': resumen([x for lista in lat_login for x in lista]),
+        'catalogo': resumen([x for lista in lat_catalogo for x in lista]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=16, help='Clientes iniciando sesión')
+    parser.add_argument('--catalogo', type=int, default=4, help='Clientes consultando el catálogo')
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--pool', type=int, default=contrasenas.servicio.hilos or 4, help='Hashes simultáneos en modo pool')
+    parser.add_argument('--usuarios', type=int, default=200)
+    args = parser.parse_args()
+
+    db.pool_max = max(db.pool_max, args.logins + args.catalogo)
+    db.connect()
+    correos = sembrar(args.usuarios)
+    try:
+        resultados = [medir(modo, args.logins, args.catalogo, args.segundos, args.pool, correos)
+                      for modo in ('en_linea', 'pool')]
+    finally:
+        limpiar(correos)
+    print(json.dumps(resultados, indent=2))
+    db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
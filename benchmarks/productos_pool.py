@@ -0,0 +1,95 @@
+"""
+Benchmark: peticiones por segundo en /productos (config.py)
+
+Compara dos modos contra la misma base de datos MySQL:
+  - conexion_por_llamada: cada método abre y cierra su propia conexión (comportamiento anterior)
+  - pool: las conexiones se piden prestadas al pool compartido
+
+Uso (desde la raíz del proyecto, con MySQL corriendo):
+    python benchmarks/productos_pool.py --hilos 16 --segundos 10
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from conexion import DatabaseConnection  # noqa: E402
+
+
+class ConexionPorLlamada(DatabaseConnection):
+    """Abre una conexión nueva en cada préstamo, como hacía MercadoVecinoWeb antes del pool"""
+
+    @contextmanager
+    def conexion(self):
+        conn = self._new_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def medir(modo, hilos, segundos, ruta):
+    """Ejecuta `hilos` clientes contra `ruta` durante `segundos` y retorna las métricas"""
+    if modo == 'pool':
+        db = DatabaseConnection(database="mercado_vecino_v3", pooled=True, pool_max=hilos)
+        db.connect()
+    else:
+        db = ConexionPorLlamada(database="mercado_vecino_v3", pooled=False)
+    config.mercado.db = db
+
+    completadas = [0] * hilos
+    errores = [0] * hilos
+    fin = time.monotonic() + segundos
+
+    def cliente(i):
+        client = config.app.test_client()
+        while time.monotonic() < fin:
+            resp = client.get(ruta)
+            if resp.status_code == 200:
+                completadas[i] += 1
+            else:
+                errores[i] += 1
+
+    workers = [threading.Thread(target=cliente, args=(i,)) for i in range(hilos)]
+    inicio = time.monotonic()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    duracion = time.monotonic() - inicio
+    db.disconnect()
+
+    return {
+        'modo': modo,
+        'ruta': ruta,
+        'hilos': hilos,
+        'segundos': round(duracion, 3),
+        'peticiones': sum(completadas),
+        'errores': sum(errores),
+        'req_por_segundo': round(sum(completadas) / duracion, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hilos', type=int, default=8)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--ruta', default='/productos')
+    args = parser.parse_args()
+
+    resultados = [medir(modo, args.hilos, args.segundos, args.ruta)
+                  for modo in ('conexion_por_llamada', 'pool')]
+    antes, despues = resultados
+    if antes['req_por_segundo']:
+        despues['mejora'] = round(despues['req_por_segundo'] / antes['req_por_segundo'], 2)
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+"""
+Benchmark: rutas principales de app.py sobre una base de datos sembrada
+
+Crea (o reutiliza) una base de datos de prueba con el esquema de migraciones/,
+la llena con datos aleatorios reproducibles (--semilla) y ejecuta cada ruta con
+`--hilos` clientes concurrentes durante `--segundos`:
+    GET /  ·  GET /productos  ·  GET /api/productos  ·  POST /login  ·  GET /perfil_vendedor
+    GET /inicio_vendedor
+
+Por ruta reporta peticiones por segundo, p50/p95/p99, errores y consultas y
+milisegundos de base de datos por petición (leídos de la cabecera Server-Timing
+del perfilador). La salida es JSON, pensada para guardarla y compararla entre
+commits:
+
+    python benchmarks/rutas.py --salida antes.json
+    git checkout otra-rama
+    python benchmarks/rutas.py --salida despues.json --comparar antes.json
+
+MySQL local en un contenedor:
+    docker run -d --name mercadovecino-bench -p 3306:3306 \\
+        -e MYSQL_ALLOW_EMPTY_PASSWORD=1 mysql:8.0
+
+Sin servidor MySQL, sobre SQLite (--base es entonces la ruta del archivo):
+    DB_BACKEND=sqlite python benchmarks/rutas.py --base /tmp/mercadovecino_bench.db
+
+La base (--base, por defecto mercadovecino_bench) se siembra solo si está vacía;
+--recrear la borra y la vuelve a crear.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector  # noqa: E402
+
+import app as aplicacion  # noqa: E402
+import contrasenas  # noqa: E402
+import esquema  # noqa: E402
+from conexion import db  # noqa: E402
+from models import Resena, ResumenVendedor  # noqa: E402
+
+CONTRASEÑA = 'benchmark-123'
+CATEGORIAS = ['Frutas', 'Verduras', 'Lácteos', 'Panadería', 'Carnes', 'Granos', 'Bebidas', 'Aseo', None]
+PALABRAS = ['fresco', 'orgánico', 'campesino', 'artesanal', 'integral', 'casero', 'natural',
+            'tomate', 'queso', 'pan', 'café', 'arepa', 'miel', 'papa', 'mango', 'leche', 'huevos']
+
+_SERVER_TIMING_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+)')
+
+
+# ---------- Base de datos de prueba ----------
+
+def preparar_base(host, base, recrear):
+    """Crea la base si no existe (o la recrea) y aplica las migraciones"""
+    if db.dialecto == 'sqlite':
+        db.disconnect()
+        db.ruta = base if base.endswith('.db') else f"{base}.db"
+        if recrear and os.path.exists(db.ruta):
+            os.remove(db.ruta)
+        if not db.connect():
+            raise SystemExit("❌ No se pudo abrir la base de prueba")
+        esquema.migrar()
+        return
+
+    conn = mysql.connector.connect(host=host, user=db.user, password=db.password)
+    cursor = conn.cursor()
+    if recrear:
+        if not base.endswith('_bench'):
+            raise SystemExit(f"❌ --recrear solo borra bases que terminan en _bench, no '{base}'")
+        cursor.execute(f"DROP DATABASE IF EXISTS `{base}`")
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{base}` "
+                   "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    cursor.close()
+    conn.close()
+
+    db.host = host
+    db.database = base
+    if not db.connect():
+        raise SystemExit("❌ No se pudo conectar a la base de prueba")
+    esquema.migrar()
+
+
+def _texto(rnd, palabras):
+    return ' '.join(rnd.choice(PALABRAS) for _ in range(palabras))
+
+
+def sembrar(usuarios, productos, resenas, pedidos, semilla):
+    """Llena la base con datos aleatorios reproducibles"""
+    rnd = random.Random(semilla)
+    hash_guardado = contrasenas.hashear(CONTRASEÑA)
+
+    vendedores = max(1, usuarios // 10)
+    db.execute_many("""
+        INSERT INTO usuarios (nombre, apellido, correo, password_hash, rol, nombre_local, descripcion_local)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, [(f"Usuario{i}", f"Bench{i}", f"bench-{i}@mercadovecino.co", hash_guardado,
+           'VENDEDOR' if i < vendedores else 'COMPRADOR',
+           f"Tienda {i}" if i < vendedores else None,
+           _texto(rnd, 12) if i < vendedores else None)
+          for i in range(usuarios)])
+
+    ids = db.execute_query("SELECT id_usuario, rol FROM usuarios ORDER BY id_usuario")
+    ids_vendedores = [fila['id_usuario'] for fila in ids if fila['rol'] == 'VENDEDOR']
+    ids_compradores = [fila['id_usuario'] for fila in ids if fila['rol'] == 'COMPRADOR'] or ids_vendedores
+
+    db.execute_many("""
+        INSERT INTO productos (id_vendedor, nombre, descripcion, categoria, precio, stock, estado)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, [(rnd.choice(ids_vendedores), _texto(rnd, 3).capitalize(), _texto(rnd, 25),
+           rnd.choice(CATEGORIAS), rnd.randrange(500, 200000, 100), rnd.randint(0, 500),
+           'PUBLICADO' if rnd.random() < 0.9 else 'PAUSADO')
+          for _ in range(productos)])
+
+    filas = db.execute_query("SELECT id_producto, precio, id_vendedor FROM productos")
+    db.execute_many("""
+        INSERT INTO resenas (id_producto, id_comprador, calificacion, comentario)
+        VALUES (%s, %s, %s, %s)
+    """, [(rnd.choice(filas)['id_producto'], rnd.choice(ids_compradores), rnd.randint(1, 5), _texto(rnd, 10))
+          for _ in range(resenas)])
+    if resenas:
+        Resena.reconstruir_ratings()
+
+    for inicio in range(0, pedidos, 1000):
+        with db.transaction():
+            for _ in range(inicio, min(pedidos, inicio + 1000)):
+                items = [rnd.choice(filas) for _ in range(rnd.randint(1, 4))]
+                cantidades = [rnd.randint(1, 3) for _ in items]
+                total = sum(item['precio'] * cantidad for item, cantidad in zip(items, cantidades))
+                pedido_id = db.execute_insert("""
+                    INSERT INTO pedidos (id_comprador, id_vendedor, total, estado)
+                    VALUES (%s, %s, %s, 'ENTREGADO')
+                """, (rnd.choice(ids_compradores), items[0]['id_vendedor'], total))
+                db.execute_many("""
+                    INSERT INTO pedido_items (id_pedido, id_producto, cantidad, precio_unitario)
+                    VALUES (%s, %s, %s, %s)
+                """, [(pedido_id, item['id_producto'], cantidad, item['precio'])
+                      for item, cantidad in zip(items, cantidades)])
+
+    # Los pedidos y reseñas se insertaron directo: el panel del vendedor lee los resúmenes
+    ResumenVendedor.reconstruir()
+
+    print(f"✅ Base sembrada: {usuarios} usuarios ({vendedores} vendedores), {productos} productos, "
+          f"{resenas} reseñas, {pedidos} pedidos", file=sys.stderr)
+
+
+def cuentas_de_prueba():
+    """(correos de compradores, correos de vendedores) sembrados por este script"""
+    filas = db.execute_query("SELECT correo, rol FROM usuarios WHERE correo LIKE %s", ('bench-%',))
+    compradores = [fila['correo'] for fila in filas if fila['rol'] == 'COMPRADOR']
+    vendedores = [fila['correo'] for fila in filas if fila['rol'] == 'VENDEDOR']
+    return compradores or vendedores, vendedores
+
+
+# ---------- Medición ----------
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def resumen(muestras, errores, segundos):
+    """Métricas de una ruta a partir de [(latencia, consultas, db_ms)]"""
+    latencias = [m[0] for m in muestras]
+    consultas = [m[1] for m in muestras if m[1] is not None]
+    db_ms = [m[2] for m in muestras if m[2] is not None]
+    return {
+        'peticiones': len(latencias),
+        'errores': errores,
+        'rps': round(len(latencias) / segundos, 1),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 2) if latencias else None,
+        'p95_ms': round(percentil(latencias, 95) * 1000, 2) if latencias else None,
+        'p99_ms': round(percentil(latencias, 99) * 1000, 2) if latencias else None,
+        'consultas_por_peticion': round(sum(consultas) / len(consultas), 2) if consultas else None,
+        'db_ms_por_peticion': round(sum(db_ms) / len(db_ms), 2) if db_ms else None,
+    }
+
+
+def _server_timing(resp):
+    match = _SERVER_TIMING_RE.search(resp.headers.get('Server-Timing', ''))
+    if not match:
+        return None, None
+    return int(match.group(2)), float(match.group(1))
+
+
+def escenarios(compradores, vendedores, max_id):
+    """{nombre: (preparar(cliente, i) o None, peticion(cliente, rnd) -> respuesta)}"""
+    def iniciar_sesion(correo):
+        def preparar(cliente, i):
+            cliente.post('/login', data={'correo': correo(i), 'contraseña': CONTRASEÑA})
+        return preparar
+
+    def login(cliente, rnd):
+        # Un cliente nuevo por intento: cada login crea su propia sesión
+        cliente = aplicacion.app.test_client()
+        return cliente.post('/login', data={'correo': rnd.choice(compradores), 'contraseña': CONTRASEÑA})
+
+    return {
+        'GET /': (None, lambda cliente, rnd: cliente.get('/')),
+        'GET /productos': (None, lambda cliente, rnd: cliente.get('/productos')),
+        'GET /api/productos': (None, lambda cliente, rnd: cliente.get(
+            f'/api/productos?limit=20&after={rnd.randint(1, max_id + 1)}')),
+        'POST /login': (None, login),
+        'GET /perfil_vendedor': (iniciar_sesion(lambda i: vendedores[i % len(vendedores)]),
+                                 lambda cliente, rnd: cliente.get('/perfil_vendedor')),
+        'GET /inicio_vendedor': (iniciar_sesion(lambda i: vendedores[i % len(vendedores)]),
+                                 lambda cliente, rnd: cliente.get('/inicio_vendedor')),
+    }
+
+
+def medir(preparar, peticion, hilos, segundos, calentamiento, semilla):
+    """Ejecuta `hilos` clientes durante `segundos` y retorna el resumen de la ruta"""
+    muestras = [[] for _ in range(hilos)]
+    errores = [0] * hilos
+    # Todos los clientes calientan y empiezan a medir al mismo tiempo
+    listos = threading.Barrier(hilos)
+
+    def cliente(i):
+        rnd = random.Random(semilla + i)
+        client = aplicacion.app.test_client()
+        if preparar:
+            preparar(client, i)
+        listos.wait()
+        fin_calentamiento = time.monotonic() + calentamiento
+        while time.monotonic() < fin_calentamiento:
+            peticion(client, rnd)
+        listos.wait()
+        fin = time.monotonic() + segundos
+        while time.monotonic() < fin:
+            inicio = time.monotonic()
+            resp = peticion(client, rnd)
+            latencia = time.monotonic() - inicio
+            if resp.status_code >= 400:
+                errores[i] += 1
+            consultas, db_ms = _server_timing(resp)
+            muestras[i].append((latencia, consultas, db_ms))
+            resp.close()
+
+    workers = [threading.Thread(target=cliente, args=(i,)) for i in range(hilos)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    return resumen([m for lista in muestras for m in lista], sum(errores), segundos)
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def comparar(anterior, actual):
+    """Imprime la variación de rps, p95 y consultas por ruta respecto a un resultado anterior"""
+    print(f"{'ruta':<24}{'rps':>18}{'p95_ms':>22}{'consultas':>18}", file=sys.stderr)
+    for ruta, nuevo in actual['rutas'].items():
+        viejo = anterior['rutas'].get(ruta)
+        if not viejo:
+            continue
+        columnas = []
+        for clave in ('rps', 'p95_ms', 'consultas_por_peticion'):
+            a, b = viejo.get(clave), nuevo.get(clave)
+            if a is None or b is None:
+                columnas.append('-')
+            else:
+                cambio = f" ({(b - a) / a * 100:+.0f}%)" if a else ''
+                columnas.append(f"{a} → {b}{cambio}")
+        print(f"{ruta:<24}{columnas[0]:>18}{columnas[1]:>22}{columnas[2]:>18}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=db.host)
+    parser.add_argument('--base', default='mercadovecino_bench', help='Base de datos de prueba')
+    parser.add_argument('--recrear', action='store_true', help='Borra y vuelve a sembrar la base')
+    parser.add_argument('--usuarios', type=int, default=2000)
+    parser.add_argument('--productos', type=int, default=20000)
+    parser.add_argument('--resenas', type=int, default=50000)
+    parser.add_argument('--pedidos', type=int, default=10000)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--hilos', type=int, default=8, help='Clientes concurrentes por ruta')
+    parser.add_argument('--segundos', type=float, default=10, help='Duración de la medición por ruta')
+    parser.add_argument('--calentamiento', type=float, default=2, help='Segundos sin medir antes de cada ruta')
+    parser.add_argument('--rutas', help='Lista separada por comas, p. ej. "GET /,POST /login"')
+    parser.add_argument('--salida', help='Archivo JSON de resultados (por defecto se imprime)')
+    parser.add_argument('--comparar', help='Resultado JSON anterior para mostrar las diferencias')
+    args = parser.parse_args()
+
+    db.pool_max = max(db.pool_max, args.hilos + 2)
+    preparar_base(args.host, args.base, args.recrear)
+    if not db.execute_query("SELECT 1 FROM usuarios LIMIT 1"):
+        sembrar(args.usuarios, args.productos, args.resenas, args.pedidos, args.semilla)
+
+    compradores, vendedores = cuentas_de_prueba()
+    max_id = (db.execute_query("SELECT MAX(id_producto) AS maximo FROM productos") or [{}])[0].get('maximo') or 0
+    totales = {tabla: db.execute_query(f"SELECT COUNT(*) AS total FROM {tabla}")[0]['total']
+               for tabla in ('usuarios', 'productos', 'resenas', 'pedidos')}
+
+    seleccion = set(args.rutas.split(',')) if args.rutas else None
+    resultado = {
+        'commit': _commit(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'parametros': {'hilos': args.hilos, 'segundos': args.segundos, 'semilla': args.semilla,
+                       'pool_max': db.pool_max, 'datos': totales},
+        'rutas': {},
+    }
+    for nombre, (preparar, peticion) in escenarios(compradores, vendedores, max_id).items():
+        if seleccion and nombre not in seleccion:
+            continue
+        if nombre in ('GET /perfil_vendedor', 'GET /inicio_vendedor') and not vendedores:
+            continue
+        print(f"… {nombre}", file=sys.stderr)
+        resultado['rutas'][nombre] = medir(preparar, peticion, args.hilos, args.segundos,
+                                           args.calentamiento, args.semilla)
+
+    salida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(salida + '\n')
+    else:
+        print(salida)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(json.load(f), resultado)
+    db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+import bisect
+import math
+import re
+import threading
+import time
+import unicodedata
+import os
+
+from conexion import db
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Palabras demasiado comunes en español como para ayudar a ordenar resultados
+STOPWORDS = frozenset({
+    'a', 'al', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los',
+    'o', 'para', 'por', 'que', 'se', 'sin', 'su', 'un', 'una', 'y',
+})
+
+# Peso de cada campo al calcular la relevancia
+PESOS_CAMPOS = {'nombre': 3.0, 'categoria': 2.0, 'descripcion': 1.0}
+
+# Factor aplicado cuando el término solo coincide por prefijo
+PESO_PREFIJO = 0.5
+
+
+def normalizar(texto):
+    """Pasa a minúsculas y quita tildes (café -> cafe, ñandú -> nandu)"""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def tokenizar(texto):
+    """Divide un texto en términos normalizados, sin stopwords"""
+    return [t for t in _TOKEN_RE.findall(normalizar(texto)) if t not in STOPWORDS]
+
+
+class IndiceBusqueda:
+    """Índice invertido en memoria sobre nombre, descripción y categoría de los productos
+
+    Se carga desde la base de datos la primera vez que se usa y se mantiene al día
+    con `indexar`/`eliminar` cuando se crean o editan productos. Cada `refresco`
+    segundos se reconstruye completo, en un hilo aparte, para recoger cambios
+    hechos por otros procesos; mientras tanto las búsquedas usan el índice anterior.
+    """
+
+    CONSULTA = """
+        SELECT id_producto, nombre, descripcion, categoria, precio
+        FROM productos
+        WHERE estado = 'PUBLICADO'
+    """
+
+    def __init__(self, db, consulta=None, refresco=None):
+        self.db = db
+        self.consulta = consulta or self.CONSULTA
+        self.refresco = refresco if refresco is not None else float(os.environ.get('BUSQUEDA_REFRESCO', 300))
+
+        self._lock = threading.RLock()
+        self._lock_carga = threading.Lock()
+        self._postings = {}      # término -> {id_producto: peso}
+        self._vocabulario = []   # términos ordenados, para buscar por prefijo
+        self._terminos_doc = {}  # id_producto -> términos indexados
+        self._docs = {}          # id_producto -> datos que devuelve la búsqueda
+        self._cargado_en = None
+        self._pendientes = None  # cambios llegados durante una reconstrucción, para repetirlos
+
+    # ---------- Construcción ----------
+
+    def _agregar(self, producto):
+        """Indexa una fila sin tomar el lock (lo toma quien llama)"""
+        producto_id = producto['id_producto']
+        pesos = {}
+        for campo, peso in PESOS_CAMPOS.items():
+            for termino in tokenizar(producto.get(campo)):
+                pesos[termino] = pesos.get(termino, 0) + peso
+
+        for termino, peso in pesos.items():
+            postings = self._postings.get(termino)
+            if postings is None:
+                postings = self._postings[termino] = {}
+                bisect.insort(self._vocabulario, termino)
+            postings[producto_id] = peso
+
+        self._terminos_doc[producto_id] = tuple(pesos)
+        self._docs[producto_id] = {
+            'id': producto_id,
+            'nombre': producto['nombre'],
+            'categoria': producto.get('categoria'),
+            'precio': float(producto['precio']) if producto.get('precio') else 0,
+        }
+
+    def _quitar(self, producto_id):
+        """Saca un producto del índice sin tomar el lock"""
+        for termino in self._terminos_doc.pop(producto_id, ()):
+            postings = self._postings.get(termino)
+            if postings is None:
+                continue
+            postings.pop(producto_id, None)
+            if not postings:
+                del self._postings[termino]
+                i = bisect.bisect_left(self._vocabulario, termino)
+                if i < len(self._vocabulario) and self._vocabulario[i] == termino:
+                    del self._vocabulario[i]
+        self._docs.pop(producto_id, None)
+
+    def reconstruir(self):
+        """Carga el índice completo desde la base de datos"""
+        nuevo = IndiceBusqueda(self.db, self.consulta, self.refresco)
+        with self._lock:
+            self._pendientes = []
+        try:
+            for producto in self.db.iter_query(self.consulta):
+                nuevo._agregar(producto)
+
+            with self._lock:
+                # indexar()/eliminar() que llegaron mientras se leía la tabla
+                for producto_id, producto in self._pendientes:
+                    nuevo._aplicar(producto_id, producto)
+                self._postings = nuevo._postings
+                self._vocabulario = nuevo._vocabulario
+                self._terminos_doc = nuevo._terminos_doc
+                self._docs = nuevo._docs
+                self._cargado_en = time.monotonic()
+        finally:
+            with self._lock:
+                self._pendientes = None
+
+    def _reconstruir_en_segundo_plano(self):
+        try:
+            self.reconstruir()
+        except Exception as e:
+            print(f"❌ Error al reconstruir el índice de búsqueda: {e}")
+        finally:
+            self._lock_carga.release()
+
+    def _vencido(self):
+        if self._cargado_en is None:
+            return True
+        edad = time.monotonic() - self._cargado_en
+        # marcar_vencido() deja la edad en infinito, aunque no haya refresco periódico
+        return edad == math.inf or bool(self.refresco and edad > self.refresco)
+
+    def vencido(self):
+        """True si la próxima búsqueda va a (re)construir el índice"""
+        return self._vencido()
+
+    def asegurar_cargado(self):
+        """Construye el índice si aún no existe o si ya venció el intervalo de refresco
+
+        La primera carga se espera. Un refresco lo lanza un solo hilo en segundo
+        plano y se retorna ese hilo; el resto sigue respondiendo con el índice anterior.
+        """
+        if not self._vencido():
+            return None
+        if self._cargado_en is None:
+            with self._lock_carga:
+                if self._cargado_en is None:
+                    self.reconstruir()
+            return None
+
+        if not self._lock_carga.acquire(blocking=False):
+            return None
+        if not self._vencido():
+            self._lock_carga.release()
+            return None
+        # El hilo suelta _lock_carga al terminar
+        hilo = threading.Thread(target=self._reconstruir_en_segundo_plano,
+                                name='reconstruir-indice', daemon=True)
+        hilo.start()
+        return hilo
+
+    def marcar_vencido(self):
+        """Hace que la próxima búsqueda reconstruya el índice (p. ej. tras una importación masiva)"""
+        with self._lock:
+            if self._cargado_en is not None:
+                self._cargado_en = float('-inf')
+
+    def _aplicar(self, producto_id, producto):
+        """Reemplaza un producto (o lo quita si `producto` es None) sin tomar el lock"""
+        self._quitar(producto_id)
+        if producto is not None and producto.get('estado', 'PUBLICADO') == 'PUBLICADO':
+            self._agregar(producto)
+
+    def _cambiar(self, producto_id, producto):
+        with self._lock:
+            self._aplicar(producto_id, producto)
+            if self._pendientes is not None:
+                self._pendientes.append((producto_id, producto))
+
+    def indexar(self, producto):
+        """Agrega o reemplaza un producto en el índice"""
+        self._cambiar(producto['id_producto'], producto)
+
+    def eliminar(self, producto_id):
+        """Quita un producto del índice"""
+        self._cambiar(producto_id, None)
+
+    # ---------- Consulta ----------
+
+    def _coincidencias(self, termino):
+        """Productos que contienen `termino` exacto o algún término que empiece con él"""
+        resultado = dict(self._postings.get(termino, {}))
+        i = bisect.bisect_left(self._vocabulario, termino)
+        while i < len(self._vocabulario) and self._vocabulario[i].startswith(termino):
+            candidato = self._vocabulario[i]
+            if candidato != termino:
+                for producto_id, peso in self._postings[candidato].items():
+                    parcial = peso * PESO_PREFIJO
+                    if parcial > resultado.get(producto_id, 0):
+                        resultado[producto_id] = parcial
+            i += 1
+        return resultado
+
+    def buscar_ids(self, texto, limite=None):
+        """Retorna los IDs que coinciden con todos los términos, ordenados por relevancia"""
+        terminos = tokenizar(texto)
+        if not terminos:
+            return []
+
+        self.asegurar_cargado()
+        with self._lock:
+            total_docs = max(len(self._docs), 1)
+            puntajes = None
+            for termino in terminos:
+                coincidencias = self._coincidencias(termino)
+                if not coincidencias:
+                    return []
+                idf = math.log(1 + total_docs / len(coincidencias))
+                if puntajes is None:
+                    puntajes = {pid: peso * idf for pid, peso in coincidencias.items()}
+                else:
+                    puntajes = {pid: puntaje + coincidencias[pid] * idf
+                                for pid, puntaje in puntajes.items() if pid in coincidencias}
+                if not puntajes:
+                    return []
+
+        # Empates: primero los productos más nuevos
+        ordenados = sorted(puntajes, key=lambda pid: (-puntajes[pid], -pid))
+        return ordenados[:limite] if limite else ordenados
+
+    def buscar(self, texto, limite=20):
+        """Busca productos y retorna sus datos básicos ordenados por relevancia"""
+        ids = self.buscar_ids(texto, limite)
+        with self._lock:
+            return [self._docs[pid] for pid in ids if pid in self._docs]
+
+
+# Índice global sobre la conexión principal
+indice = IndiceBusqueda(db)
@@ -0,0 +1,150 @@
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_TABLAS_RE = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+`?(\w+)`?', re.IGNORECASE)
+_ESPACIOS_RE = re.compile(r'\s+')
+
+_MISS = object()
+
+
+def normalizar_sql(query):
+    """Colapsa espacios y saltos de línea para que la misma consulta tenga una sola clave"""
+    return _ESPACIOS_RE.sub(' ', query).strip()
+
+
+def tablas_de(query):
+    """Retorna las tablas que lee o escribe una consulta"""
+    return frozenset(tabla.lower() for tabla in _TABLAS_RE.findall(query))
+
+
+class CacheLRU:
+    """Valores por clave en memoria del proceso, con TTL y expulsión LRU, segura entre hilos
+
+    `ttl=None` no vence por tiempo; `ttl=0` o `max_entries=0` la desactivan. Las
+    subclases que guardan más estado (índices, versiones) lo cambian bajo
+    `self._lock` con _leer/_guardar/_sacar.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()  # clave -> (expira_en, valor)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def activa(self):
+        return bool(self.max_entries) and self.ttl != 0
+
+    def _leer(self, clave, default=None):
+        entrada = self._entradas.get(clave, _MISS)
+        if entrada is _MISS or entrada[0] < time.monotonic():
+            if entrada is not _MISS:
+                self._sacar(clave)
+            self.misses += 1
+            return default
+        self._entradas.move_to_end(clave)
+        self.hits += 1
+        return entrada[1]
+
+    def _guardar(self, clave, valor):
+        if not self.activa():
+            return
+        self._sacar(clave)
+        expira = math.inf if self.ttl is None else time.monotonic() + self.ttl
+        self._entradas[clave] = (expira, valor)
+        while len(self._entradas) > self.max_entries:
+            self._sacar(next(iter(self._entradas)))
+            self.evictions += 1
+
+    def _sacar(self, clave):
+        """Quita una entrada y retorna su valor; las subclases la extienden para limpiar sus índices"""
+        entrada = self._entradas.pop(clave, None)
+        return None if entrada is None else entrada[1]
+
+    def get(self, clave, default=None):
+        """Retorna el valor guardado o `default` si no existe o ya expiró"""
+        with self._lock:
+            return self._leer(clave, default)
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._guardar(clave, valor)
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._sacar(clave)
+            self.invalidations += 1
+
+    def clear(self):
+        """Vacía la caché completa"""
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def stats(self):
+        """Contadores de la caché"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entradas),
+            }
+
+
+class QueryCache(CacheLRU):
+    """Caché en memoria de resultados de consultas, con TTL por entrada y expulsión LRU
+
+    Cada entrada guarda las tablas que leyó la consulta; cualquier escritura sobre
+    una de esas tablas la invalida.
+    """
+
+    def __init__(self, max_entries=256, ttl=30.0):
+        super().__init__(max_entries, ttl)
+        self._generaciones = {}  # tabla -> número de invalidaciones
+
+    def key(self, query, params=None):
+        """Clave normalizada de una consulta con sus parámetros"""
+        return (normalizar_sql(query), tuple(params) if params else ())
+
+    def generation(self, tablas):
+        """Foto de las generaciones de `tablas`, para detectar escrituras durante una lectura"""
+        with self._lock:
+            return tuple(self._generaciones.get(tabla, 0) for tabla in sorted(tablas))
+
+    def get(self, key, default=None):
+        """Retorna el valor guardado o `default` si no existe o ya expiró"""
+        with self._lock:
+            entrada = self._leer(key, _MISS)
+        return default if entrada is _MISS else entrada[1]
+
+    def set(self, key, value, tablas, generacion=None):
+        """Guarda un resultado, salvo que sus tablas hayan cambiado mientras se consultaba"""
+        with self._lock:
+            actual = tuple(self._generaciones.get(tabla, 0) for tabla in sorted(tablas))
+            if generacion is not None and generacion != actual:
+                return
+            self._guardar(key, (tablas, value))
+
+    def invalidate(self, tablas):
+        """Elimina las entradas que dependen de alguna de `tablas`"""
+        if not tablas:
+            return
+        with self._lock:
+            for tabla in tablas:
+                self._generaciones[tabla] = self._generaciones.get(tabla, 0) + 1
+            afectadas = [key for key, (_, (deps, _)) in self._entradas.items() if deps & tablas]
+            for key in afectadas:
+                self._sacar(key)
+            self.invalidations += len(afectadas)
@@ -0,0 +1,182 @@
+"""
+Carrito de compras guardado en el servidor
+
+Por usuario se guarda solo {id_producto: cantidad} en un almacén con TTL, el
+mismo tipo que usan las sesiones (sesiones.py). Nombre, precio y stock de cada
+línea salen de una foto de los productos que se lee con un solo
+`WHERE id_producto IN (...)` y se cachea unos segundos por producto; así
+mostrar el carrito cuesta a lo sumo una consulta, y ninguna si la foto está
+al día. La foto puede atrasarse hasta CARRITO_FOTO_TTL segundos: al comprar,
+Pedido.crear_pedido_completo vuelve a leer precio y stock con los productos
+bloqueados. Los cambios a un mismo carrito se serializan dentro del proceso;
+entre procesos que comparten el almacén SQLite gana la última escritura.
+
+Variables de entorno:
+  - CARRITO_STORE: memoria (por defecto, propio de cada proceso) o sqlite
+    (CARRITO_SQLITE, instance/carritos.db por defecto)
+  - CARRITO_TTL: segundos sin uso antes de descartar un carrito (7 días)
+  - CARRITO_MAX: carritos en memoria antes de expulsar los más viejos (10000)
+  - CARRITO_FOTO_TTL: segundos que se reutiliza la foto de un producto (10)
+"""
+import os
+import threading
+
+from cache import CacheLRU
+from models import Producto
+from sesiones import AlmacenMemoria, AlmacenSQLite
+
+CANTIDAD_MAX = 99  # unidades de un mismo producto por línea
+
+_FALTA = object()
+
+
+class FotosProductos(CacheLRU):
+    """Precio, stock y estado de los productos por ID, con TTL corto y expulsión LRU"""
+
+    def __init__(self, ttl=10.0, max_entries=4096):
+        super().__init__(max_entries, ttl)
+
+    def obtener(self, producto_ids):
+        """Retorna {id: fila}; los productos que falten se leen en una sola consulta"""
+        fotos = {}
+        faltan = []
+        with self._lock:
+            for producto_id in producto_ids:
+                fila = self._leer(producto_id, _FALTA)
+                if fila is _FALTA:
+                    faltan.append(producto_id)
+                else:
+                    fotos[producto_id] = fila
+
+        if faltan:
+            filas = Producto.obtener_por_ids(faltan)
+            with self._lock:
+                for producto_id in faltan:
+                    # También se recuerda que un producto no existe
+                    fotos[producto_id] = filas.get(producto_id)
+                    self._guardar(producto_id, fotos[producto_id])
+
+        return {producto_id: fila for producto_id, fila in fotos.items() if fila is not None}
+
+
+def _disponible(fila):
+    return fila['stock'] if fila['estado'] == 'PUBLICADO' else 0
+
+
+class Carritos:
+    """Carritos por usuario: {id_producto: cantidad} en `almacen`, enriquecidos con `fotos`"""
+
+    def __init__(self, almacen, fotos, franjas=64):
+        self.almacen = almacen
+        self.fotos = fotos
+        # Cada cambio lee y reescribe el carrito entero: se serializa por usuario
+        # (dentro del proceso) con un cerrojo de un juego fijo, elegido por user_id
+        self._cerrojos = [threading.RLock() for _ in range(franjas)]
+
+    def _clave(self, user_id):
+        return f"carrito:{user_id}"
+
+    def _cerrojo(self, user_id):
+        return self._cerrojos[hash(user_id) % len(self._cerrojos)]
+
+    def contenido(self, user_id):
+        """{id_producto: cantidad} del carrito de `user_id`"""
+        # El almacén guarda JSON: las claves vuelven como texto
+        datos = self.almacen.get(self._clave(user_id)) or {}
+        return {int(producto_id): cantidad for producto_id, cantidad in datos.items()}
+
+    def _guardar(self, user_id, contenido):
+        if contenido:
+            self.almacen.set(self._clave(user_id), {str(pid): cantidad for pid, cantidad in contenido.items()})
+        else:
+            self.almacen.delete(self._clave(user_id))
+
+    def fijar(self, user_id, producto_id, cantidad):
+        """Deja `cantidad` unidades de un producto (0 lo quita); retorna la cantidad guardada
+
+        Retorna None si el producto no existe o no está publicado. La cantidad se
+        recorta al stock de la foto.
+        """
+        with self._cerrojo(user_id):
+            contenido = self.contenido(user_id)
+            if cantidad <= 0:
+                contenido.pop(producto_id, None)
+                self._guardar(user_id, contenido)
+                return 0
+
+            fila = self.fotos.obtener([producto_id]).get(producto_id)
+            if fila is None or fila['estado'] != 'PUBLICADO':
+                return None
+            cantidad = min(cantidad, _disponible(fila), CANTIDAD_MAX)
+            if cantidad <= 0:
+                contenido.pop(producto_id, None)
+            else:
+                contenido[producto_id] = cantidad
+            self._guardar(user_id, contenido)
+            return cantidad
+
+    def agregar(self, user_id, producto_id, cantidad=1):
+        """Suma unidades a la línea del producto; retorna la cantidad resultante o None"""
+        with self._cerrojo(user_id):
+            return self.fijar(user_id, producto_id, self.contenido(user_id).get(producto_id, 0) + cantidad)
+
+    def quitar(self, user_id, producto_id):
+        self.fijar(user_id, producto_id, 0)
+
+    def vaciar(self, user_id):
+        with self._cerrojo(user_id):
+            self.almacen.delete(self._clave(user_id))
+
+    def detalle(self, user_id):
+        """Líneas del carrito con nombre, precio y stock, y el resumen de la compra"""
+        contenido = self.contenido(user_id)
+        fotos = self.fotos.obtener(list(contenido)) if contenido else {}
+
+        lineas = []
+        subtotal = 0
+        articulos = 0
+        for producto_id, cantidad in contenido.items():
+            fila = fotos.get(producto_id)
+            if fila is None:
+                # Producto eliminado: la línea desaparece del carrito al mostrarlo
+                continue
+            disponible = _disponible(fila)
+            precio = float(fila['precio'] or 0)
+            lineas.append({
+                'id': producto_id,
+                'nombre': fila['nombre'],
+                'vendedor': fila['vendedor_nombre'],
+                'precio': precio,
+                'cantidad': cantidad,
+                'disponible': disponible,
+                'total': precio * cantidad,
+            })
+            if cantidad <= disponible:
+                subtotal += precio * cantidad
+                articulos += cantidad
+
+        if len(lineas) != len(contenido):
+            # Se relee bajo el cerrojo para no pisar un cambio hecho mientras tanto
+            with self._cerrojo(user_id):
+                vigente = self.contenido(user_id)
+                for producto_id in contenido.keys() - fotos.keys():
+                    vigente.pop(producto_id, None)
+                self._guardar(user_id, vigente)
+
+        return {'items': lineas, 'resumen': {'subtotal': subtotal, 'articulos': articulos}}
+
+
+carritos = Carritos(
+    AlmacenMemoria(float(os.environ.get('CARRITO_TTL', 7 * 24 * 3600)),
+                   max_entries=int(os.environ.get('CARRITO_MAX', 10000))),
+    FotosProductos(ttl=float(os.environ.get('CARRITO_FOTO_TTL', 10))),
+)
+
+
+def iniciar(app):
+    """Cambia al almacén SQLite si CARRITO_STORE=sqlite; la ruta por defecto vive en instance/"""
+    if os.environ.get('CARRITO_STORE', 'memoria') == 'sqlite':
+        ruta = os.environ.get('CARRITO_SQLITE', os.path.join(app.instance_path, 'carritos.db'))
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        carritos.almacen = AlmacenSQLite(ruta, carritos.almacen.ttl)
+    return carritos
@@ -0,0 +1,56 @@
+"""
+Versión del catálogo
+
+Un valor corto que cambia cada vez que cambia un producto (o un vendedor), para
+usar como ETag o como clave de cachés de HTML. Combina dos fuentes:
+  - la marca de la base de datos, MAX(actualizado_en) y COUNT(*) de productos,
+    leída como mucho cada CATALOGO_VERSION_TTL segundos: recoge los cambios
+    hechos por otros procesos
+  - las generaciones de la caché de consultas de este proceso para productos y
+    usuarios, que cambian en el mismo momento en que se escribe aquí
+"""
+import hashlib
+import os
+import threading
+import time
+
+from conexion import db
+
+TABLAS = frozenset({'productos', 'usuarios'})
+
+
+class VersionCatalogo:
+    """Calcula la versión del catálogo, consultando la base de datos solo cada `ttl` segundos"""
+
+    CONSULTA = "SELECT MAX(actualizado_en) AS ultimo, COUNT(*) AS total FROM productos"
+
+    def __init__(self, db, ttl=None):
+        self.db = db
+        self.ttl = ttl if ttl is not None else float(os.environ.get('CATALOGO_VERSION_TTL', 2))
+        self._lock = threading.Lock()
+        self._marca = None
+        self._leida_en = float('-inf')
+
+    def _marca_bd(self):
+        with self._lock:
+            if time.monotonic() - self._leida_en <= self.ttl:
+                return self._marca
+        filas = self.db.execute_query(self.CONSULTA)
+        marca = (str(filas[0]['ultimo']), filas[0]['total']) if filas else None
+        with self._lock:
+            self._marca = marca
+            self._leida_en = time.monotonic()
+        return marca
+
+    def actual(self):
+        """Versión actual como texto hexadecimal corto"""
+        generacion = self.db.cache.generation(TABLAS) if self.db.cache is not None else ()
+        return hashlib.sha1(repr((self._marca_bd(), generacion)).encode()).hexdigest()[:16]
+
+    def invalidar(self):
+        """Fuerza a releer la marca de la base de datos en la próxima consulta"""
+        with self._lock:
+            self._leida_en = float('-inf')
+
+
+version_catalogo = VersionCatalogo(db)
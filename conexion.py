@@ -1,86 +1,772 @@
+"""
+Conexión a la base de datos
+
+`db` es la conexión global. DB_BACKEND elige el motor:
+  - mysql (por defecto): DatabaseConnection, con pool de conexiones
+  - sqlite: SQLiteConnection sobre el archivo DB_SQLITE (mercado_vecino.db),
+    para instalaciones pequeñas, pruebas y benchmarks sin servidor MySQL
+
+Ambas tienen la misma interfaz (execute_query, execute_insert, transaction, ...)
+y aceptan el SQL de models.py escrito para MySQL.
+"""
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
+from mysql.connector.errors import PoolError
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+import itertools
+import re
+import sqlite3
+import threading
+import time
 import os
+import weakref
+
+from cache import QueryCache, tablas_de
+
+_VALUES_RE = re.compile(r'\bVALUES\s*\(', re.IGNORECASE)
+
+# Errores de cualquiera de los motores, para los `except` fuera de este módulo
+ErrorBD = (Error, sqlite3.Error)
+
+RUTA_SQLITE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mercado_vecino.db')
+
+
+def es_duplicado(error):
+    """True si el error es por una clave única repetida (p. ej. un correo ya registrado)"""
+    if isinstance(error, sqlite3.IntegrityError):
+        return 'UNIQUE' in str(error)
+    return getattr(error, 'errno', None) == errorcode.ER_DUP_ENTRY
+
+
+class ConnectionPool:
+    """Pool de conexiones MySQL seguro para varios hilos"""
+
+    def __init__(self, factory, min_size=1, max_size=10, timeout=5.0,
+                 idle_check=30.0, recycle=3600.0):
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self.recycle = recycle
+
+        self._lock = threading.Condition()
+        self._idle = []        # [(conexion, creada_en, ultimo_uso)]
+        self._created = {}     # id(conexion) -> creada_en
+        self._opening = 0      # conexiones abriéndose fuera del lock
+        self._closed = False
+
+    def _open(self):
+        """Abre una conexión en un cupo ya reservado (`_opening`); se llama sin el lock"""
+        try:
+            conn = self.factory()
+        except BaseException:
+            with self._lock:
+                self._opening -= 1
+                # El cupo quedó libre: que lo aproveche quien esté esperando
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._opening -= 1
+            self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        """Saca una conexión del conteo del pool y la cierra; se llama sin el lock"""
+        with self._lock:
+            self._created.pop(id(conn), None)
+            self._lock.notify()
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def _healthy(self, conn, creada_en, ultimo_uso):
+        """Decide si una conexión inactiva se puede reutilizar"""
+        now = time.monotonic()
+        if self.recycle and now - creada_en > self.recycle:
+            return False
+        if self.idle_check and now - ultimo_uso > self.idle_check:
+            # Solo se hace ping a las conexiones que llevan tiempo inactivas
+            try:
+                conn.ping(reconnect=False)
+            except Error:
+                return False
+        return True
+
+    def fill(self):
+        """Abre conexiones hasta alcanzar el tamaño mínimo"""
+        with self._lock:
+            faltan = max(self.min_size - len(self._created) - self._opening, 0)
+            self._opening += faltan
+        for _ in range(faltan):
+            conn = self._open()
+            now = time.monotonic()
+            with self._lock:
+                self._idle.append((conn, now, now))
+                self._lock.notify()
+
+    def _tomar(self, deadline):
+        """Bajo el lock: saca una conexión inactiva, o reserva un cupo y retorna None"""
+        while True:
+            if self._closed:
+                raise PoolError("El pool de conexiones está cerrado")
+            if self._idle:
+                return self._idle.pop()
+            if len(self._created) + self._opening < self.max_size:
+                self._opening += 1
+                return None
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise PoolError(
+                    f"No hay conexiones disponibles después de {self.timeout}s "
+                    f"(máximo {self.max_size})"
+                )
+            self._lock.wait(remaining)
+
+    def acquire(self):
+        """Toma una conexión del pool, esperando como máximo `timeout` segundos
+
+        El lock solo protege la contabilidad: el ping, la apertura y el cierre de
+        conexiones (E/S de red) se hacen sin él, para que una conexión lenta no
+        frene al resto de los hilos.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._lock:
+                inactiva = self._tomar(deadline)
+            if inactiva is None:
+                return self._open()
+            conn, creada_en, ultimo_uso = inactiva
+            # Mientras se revisa sigue contada en _created, así no se supera max_size
+            if self._healthy(conn, creada_en, ultimo_uso):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn, broken=False):
+        """Devuelve una conexión al pool"""
+        with self._lock:
+            creada_en = self._created.get(id(conn))
+            if creada_en is None:
+                return
+            descartar = broken or self._closed
+        if not descartar:
+            try:
+                # Descarta cualquier transacción que haya quedado abierta
+                if conn.in_transaction:
+                    conn.rollback()
+            except Error:
+                descartar = True
+        if not descartar:
+            with self._lock:
+                # El pool pudo cerrarse mientras se hacía el rollback
+                if not self._closed:
+                    self._idle.append((conn, creada_en, time.monotonic()))
+                    self._lock.notify()
+                    return
+        self._discard(conn)
+
+    def close(self):
+        """Cierra todas las conexiones inactivas y marca el pool como cerrado"""
+        with self._lock:
+            self._closed = True
+            inactivas = [conn for conn, _, _ in self._idle]
+            self._idle = []
+            self._lock.notify_all()
+        for conn in inactivas:
+            self._discard(conn)
+
+    def soltar(self):
+        """Vacía el pool sin cerrar las conexiones y las retorna (ver despues_de_fork)"""
+        # Se llama en un hijo recién creado: no hay otros hilos, y el lock pudo
+        # quedar tomado por un hilo del padre que aquí no existe
+        conexiones = [conn for conn, _, _ in self._idle]
+        self._idle = []
+        self._created = {}
+        self._closed = True
+        return conexiones
+
+    def stats(self):
+        """Retorna el estado actual del pool"""
+        with self._lock:
+            return {
+                'abiertas': len(self._created),
+                'inactivas': len(self._idle),
+                'en_uso': len(self._created) - len(self._idle),
+                'max': self.max_size,
+            }
+
+
+# Conexiones que un proceso hijo heredó al hacer fork. No se cierran ni se dejan
+# recolectar: mysql-connector hace shutdown() del socket, que es el mismo del padre
+_heredadas = []
+_instancias = weakref.WeakSet()
+
+
+def _despues_de_fork():
+    for instancia in list(_instancias):
+        instancia.despues_de_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_despues_de_fork)
+
 
 class DatabaseConnection:
-    def __init__(self):
-        self.host = 'localhost'
-        self.database = 'mercadovecino'
-        self.user = 'root'  # Cambia según tu configuración
-        self.password = ''  # Cambia según tu configuración
+    """Conexión a MySQL; SQLiteConnection reemplaza los métodos propios del motor"""
+
+    dialecto = 'mysql'
+    errores = (Error,)
+
+    def __init__(self, host='localhost', database='mercadovecino', user='root', password='',
+                 pooled=None, pool_min=None, pool_max=None, pool_timeout=None,
+                 pool_idle_check=None, pool_recycle=None):
+        self.host = host
+        self.database = database
+        self.user = user  # Cambia según tu configuración
+        self.password = password  # Cambia según tu configuración
         self.connection = None
-        
+
+        # Configuración del pool (se puede sobreescribir con variables de entorno)
+        if pooled is None:
+            pooled = os.environ.get('DB_POOL', '1') != '0'
+        self.pooled = pooled
+        self.pool_min = pool_min if pool_min is not None else int(os.environ.get('DB_POOL_MIN', 2))
+        self.pool_max = pool_max if pool_max is not None else int(os.environ.get('DB_POOL_MAX', 10))
+        self.pool_timeout = pool_timeout if pool_timeout is not None else float(os.environ.get('DB_POOL_TIMEOUT', 5))
+        self.pool_idle_check = pool_idle_check if pool_idle_check is not None else float(os.environ.get('DB_POOL_IDLE_CHECK', 30))
+        self.pool_recycle = pool_recycle if pool_recycle is not None else float(os.environ.get('DB_POOL_RECYCLE', 3600))
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()  # transacción en curso de cada hilo
+        _instancias.add(self)
+
+        # Recibe cada consulta ejecutada (ver perfilador.py); None = sin perfilar
+        self.perfilador = None
+
+        # Caché de resultados para las consultas que la piden (execute_query(cache=True))
+        if os.environ.get('DB_CACHE', '1') != '0':
+            self.cache = QueryCache(
+                max_entries=int(os.environ.get('DB_CACHE_MAX', 256)),
+                ttl=float(os.environ.get('DB_CACHE_TTL', 30)),
+            )
+        else:
+            self.cache = None
+
+    def _new_connection(self):
+        """Abre una conexión nueva a MySQL"""
+        return mysql.connector.connect(
+            host=self.host,
+            database=self.database,
+            user=self.user,
+            password=self.password,
+            charset='utf8mb4',
+            collation='utf8mb4_unicode_ci'
+        )
+
+    def _get_pool(self):
+        """Crea el pool la primera vez que se necesita"""
+        with self._pool_lock:
+            if self.pool is None:
+                self.pool = ConnectionPool(
+                    self._new_connection,
+                    min_size=self.pool_min,
+                    max_size=self.pool_max,
+                    timeout=self.pool_timeout,
+                    idle_check=self.pool_idle_check,
+                    recycle=self.pool_recycle,
+                )
+            return self.pool
+
     def connect(self):
         """Establece la conexión con la base de datos"""
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                charset='utf8mb4',
-                collation='utf8mb4_unicode_ci'
-            )
-            
+            if self.pooled:
+                self._get_pool().fill()
+                print("✅ Pool de conexiones MySQL listo")
+                return True
+
+            self.connection = self._new_connection()
+
             if self.connection.is_connected():
                 print("✅ Conexión exitosa a la base de datos MySQL")
                 return True
-                
+
         except Error as e:
             print(f"❌ Error al conectar a MySQL: {e}")
             return False
-    
+
     def disconnect(self):
         """Cierra la conexión con la base de datos"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+            print("🔌 Pool de conexiones cerrado")
         if self.connection and self.connection.is_connected():
             self.connection.close()
             print("🔌 Conexión cerrada")
-    
+
+    def despues_de_fork(self):
+        """Olvida el pool y la conexión del proceso padre; el hijo abre los suyos al usarlos"""
+        if self.pool is not None:
+            _heredadas.extend(self.pool.soltar())
+            self.pool = None
+        if self.connection is not None:
+            _heredadas.append(self.connection)
+            self.connection = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+
     def get_connection(self):
         """Retorna la conexión activa"""
         if not self.connection or not self.connection.is_connected():
             self.connect()
         return self.connection
-    
-    def execute_query(self, query, params=None):
-        """Ejecuta una consulta SELECT y retorna los resultados"""
+
+    def _cursor(self, conn, dictionary=False):
+        return conn.cursor(dictionary=dictionary)
+
+    def _resultados_pendientes(self, conn):
+        """True si quedaron filas sin leer en la conexión (p. ej. un stream cortado)"""
+        return conn.unread_result
+
+    def _iniciar_transaccion(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        conn.start_transaction()
+
+    @contextmanager
+    def conexion(self):
+        """Presta una conexión durante el bloque `with` y la devuelve al terminar"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            # Dentro de transaction() todo usa la conexión de la transacción
+            yield conn
+            return
+
+        if not self.pooled:
+            conn = self.get_connection()
+            try:
+                yield conn
+            finally:
+                if conn.unread_result:
+                    try:
+                        conn.close()
+                    except Error:
+                        pass
+                    self.connection = None
+            return
+
+        pool = self._get_pool()
+        conn = pool.acquire()
+        broken = False
         try:
-            cursor = self.get_connection().cursor(dictionary=True)
-            cursor.execute(query, params or ())
-            result = cursor.fetchall()
-            cursor.close()
-            return result
-        except Error as e:
+            yield conn
+        except Error:
+            broken = not conn.is_connected()
+            raise
+        finally:
+            # Con resultados sin leer (p. ej. un stream cortado) la conexión no se reutiliza
+            if conn.unread_result:
+                broken = True
+            pool.release(conn, broken=broken)
+
+    def execute_query(self, query, params=None, cache=False):
+        """Ejecuta una consulta SELECT y retorna los resultados
+
+        Con cache=True el resultado se guarda en la caché de consultas hasta que
+        expire o se escriba en alguna de sus tablas. Las filas cacheadas se
+        comparten entre peticiones y no deben modificarse.
+        """
+        # Dentro de una transacción se pueden ver datos sin confirmar: no se cachean
+        cache = cache and self.cache is not None and not self.in_transaction()
+        if cache:
+            key = self.cache.key(query, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return list(cached)
+            tablas = tablas_de(query)
+            generacion = self.cache.generation(tablas)
+
+        try:
+            with self.conexion() as conn:
+                inicio = time.perf_counter()
+                cursor = self._cursor(conn, dictionary=True)
+                cursor.execute(query, params or ())
+                result = cursor.fetchall()
+                cursor.close()
+                self._perfilar(query, inicio, len(result))
+        except self.errores as e:
+            if self.in_transaction():
+                raise
             print(f"❌ Error ejecutando consulta: {e}")
             return []
-    
+
+        if cache:
+            self.cache.set(key, result, tablas, generacion)
+            return list(result)
+        return result
+
+    def _perfilar(self, query, inicio, filas):
+        """Informa al perfilador una consulta que empezó en `inicio` (time.perf_counter)"""
+        if self.perfilador is not None:
+            self.perfilador.registrar(query, time.perf_counter() - inicio, filas)
+
+    def _invalidate(self, query):
+        """Invalida la caché de las tablas que modifica una escritura"""
+        if self.cache is not None:
+            self.cache.invalidate(tablas_de(query))
+
+    def invalidate(self, *tablas):
+        """Invalida la caché de `tablas` tras escrituras hechas fuera de execute_*"""
+        if self.cache is not None:
+            self.cache.invalidate(frozenset(tablas))
+
+    def iter_query(self, query, params=None, batch_size=500):
+        """Ejecuta un SELECT con cursor del servidor y entrega las filas de a una
+
+        Las filas se leen por lotes de `batch_size`, así la memoria no depende
+        del tamaño del resultado. La conexión queda ocupada hasta agotar el generador.
+        """
+        try:
+            with self.conexion() as conn:
+                cursor = self._cursor(conn, dictionary=True)
+                # Se mide solo el tiempo de la base de datos, no el de quien consume las filas
+                segundos = 0.0
+                filas = 0
+                try:
+                    inicio = time.perf_counter()
+                    cursor.execute(query, params or ())
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        segundos += time.perf_counter() - inicio
+                        if not rows:
+                            break
+                        filas += len(rows)
+                        yield from rows
+                        inicio = time.perf_counter()
+                finally:
+                    if self.perfilador is not None:
+                        self.perfilador.registrar(query, segundos, filas)
+                    if not self._resultados_pendientes(conn):
+                        cursor.close()
+        except self.errores as e:
+            print(f"❌ Error ejecutando consulta: {e}")
+
+    def _write(self, query, run):
+        """Ejecuta una escritura con `run(cursor)`
+
+        Fuera de una transacción confirma e invalida la caché enseguida; dentro de
+        transaction() solo anota las tablas para invalidarlas al confirmar.
+        """
+        tablas = getattr(self._local, 'tablas', None)
+        with self.conexion() as conn:
+            cursor = self._cursor(conn)
+            try:
+                inicio = time.perf_counter()
+                resultado = run(cursor)
+                self._perfilar(query, inicio, cursor.rowcount)
+                if tablas is None:
+                    conn.commit()
+                    self._invalidate(query)
+                else:
+                    tablas.update(tablas_de(query))
+                return resultado
+            except self.errores:
+                if tablas is None:
+                    conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
     def execute_insert(self, query, params=None):
         """Ejecuta una consulta INSERT y retorna el ID insertado"""
-        try:
-            cursor = self.get_connection().cursor()
+        def run(cursor):
             cursor.execute(query, params or ())
-            self.connection.commit()
-            last_id = cursor.lastrowid
-            cursor.close()
-            return last_id
-        except Error as e:
+            return cursor.lastrowid
+
+        try:
+            return self._write(query, run)
+        except self.errores as e:
+            if self.in_transaction():
+                raise
             print(f"❌ Error en INSERT: {e}")
-            self.connection.rollback()
             return None
-    
+
     def execute_update(self, query, params=None):
         """Ejecuta una consulta UPDATE/DELETE y retorna filas afectadas"""
-        try:
-            cursor = self.get_connection().cursor()
+        def run(cursor):
             cursor.execute(query, params or ())
-            self.connection.commit()
-            affected_rows = cursor.rowcount
-            cursor.close()
-            return affected_rows
-        except Error as e:
+            return cursor.rowcount
+
+        try:
+            return self._write(query, run)
+        except self.errores as e:
+            if self.in_transaction():
+                raise
             print(f"❌ Error en UPDATE/DELETE: {e}")
-            self.connection.rollback()
             return 0
 
+    def execute_many(self, query, seq_params, batch_size=1000):
+        """Ejecuta la misma escritura para muchas filas y retorna las filas afectadas
+
+        Los INSERT ... VALUES (...) se envían como un solo INSERT de varias filas
+        por cada lote de `batch_size`; el resto de sentencias usa executemany.
+        `seq_params` puede ser cualquier iterable, se consume por lotes.
+        """
+        def run(cursor):
+            total = 0
+            filas = iter(seq_params)
+            while True:
+                lote = list(itertools.islice(filas, batch_size))
+                if not lote:
+                    return total
+                multi = _multi_row(query, len(lote))
+                if multi:
+                    cursor.execute(multi, [valor for fila in lote for valor in fila])
+                else:
+                    cursor.executemany(query, lote)
+                total += cursor.rowcount
+
+        try:
+            return self._write(query, run)
+        except self.errores as e:
+            if self.in_transaction():
+                raise
+            print(f"❌ Error en escritura por lotes: {e}")
+            return 0
+
+    def in_transaction(self):
+        """Indica si el hilo actual está dentro de transaction()"""
+        return getattr(self._local, 'conn', None) is not None
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa varias escrituras del hilo actual en un solo commit
+
+        Dentro del bloque, execute_query/execute_insert/execute_update/execute_many
+        usan la misma conexión, no confirman y propagan los errores en vez de
+        tragárselos, para que todo se deshaga junto. Las transacciones anidadas
+        se unen a la exterior.
+        """
+        if self.in_transaction():
+            yield self._local.conn
+            return
+
+        with self.conexion() as conn:
+            self._iniciar_transaccion(conn)
+            self._local.conn = conn
+            self._local.tablas = set()
+            try:
+                yield conn
+                conn.commit()
+                tablas = self._local.tablas
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._local.conn = None
+                self._local.tablas = None
+
+        if self.cache is not None:
+            self.cache.invalidate(frozenset(tablas))
+
+
+def _multi_row(query, filas):
+    """Convierte `INSERT ... VALUES (%s, ...)` en un INSERT de `filas` filas
+
+    Retorna None si la consulta no tiene esa forma.
+    """
+    match = _VALUES_RE.search(query)
+    if not match or not query.lstrip().upper().startswith(('INSERT', 'REPLACE')):
+        return None
+    inicio = match.end() - 1
+    profundidad = 0
+    for i in range(inicio, len(query)):
+        if query[i] == '(':
+            profundidad += 1
+        elif query[i] == ')':
+            profundidad -= 1
+            if profundidad == 0:
+                grupo = query[inicio:i + 1]
+                return query[:inicio] + ', '.join([grupo] * filas) + query[i + 1:]
+    return None
+
+# ---------- SQLite ----------
+
+_FOR_UPDATE_RE = re.compile(r'\s+FOR\s+UPDATE\b', re.IGNORECASE)
+_INSERT_IGNORE_RE = re.compile(r'\bINSERT\s+IGNORE\b', re.IGNORECASE)
+_DUPLICATE_RE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_VALUES_COLUMNA_RE = re.compile(r'\bVALUES\s*\(\s*(\w+)\s*\)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def traducir_sqlite(query):
+    """Adapta el SQL escrito para MySQL a SQLite
+
+    %s pasa a ?, INSERT IGNORE a INSERT OR IGNORE, ON DUPLICATE KEY UPDATE
+    col = VALUES(col) a ON CONFLICT DO UPDATE SET col = excluded.col, y se quita
+    FOR UPDATE (las transacciones de SQLite ya bloquean la escritura al empezar).
+    """
+    sql = query.replace('%s', '?')
+    sql = _FOR_UPDATE_RE.sub('', sql)
+    sql = _INSERT_IGNORE_RE.sub('INSERT OR IGNORE', sql)
+    match = _DUPLICATE_RE.search(sql)
+    if match:
+        sql = (sql[:match.start()] + 'ON CONFLICT DO UPDATE SET'
+               + _VALUES_COLUMNA_RE.sub(r'excluded.\1', sql[match.end():]))
+    return sql
+
+
+def _fila_dict(cursor, fila):
+    return {columna[0]: valor for columna, valor in zip(cursor.description, fila)}
+
+
+# Mismos tipos de Python que con MySQL: DECIMAL -> Decimal, DATE -> date, DATETIME/TIMESTAMP -> datetime
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, lambda valor: valor.isoformat())
+sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(' '))
+sqlite3.register_converter('DECIMAL', lambda valor: Decimal(valor.decode()))
+sqlite3.register_converter('DATE', lambda valor: date.fromisoformat(valor.decode()))
+sqlite3.register_converter('DATETIME', lambda valor: datetime.fromisoformat(valor.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda valor: datetime.fromisoformat(valor.decode()))
+
+
+class _ConexionSQLite(sqlite3.Connection):
+    """Conexión de sqlite3 que admite referencias débiles"""
+
+
+class _CursorSQLite:
+    """Cursor de sqlite3 que acepta el SQL escrito para MySQL"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        return self._cursor.execute(traducir_sqlite(query), params)
+
+    def executemany(self, query, seq_params):
+        return self._cursor.executemany(traducir_sqlite(query), seq_params)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class SQLiteConnection(DatabaseConnection):
+    """Base de datos SQLite embebida: una conexión por hilo, en modo WAL y leída por mmap
+
+    Las lecturas no esperan a las escrituras (WAL) y no salen del proceso, así que
+    una consulta por clave tarda microsegundos. sqlite3 guarda las sentencias
+    preparadas de cada conexión (DB_SQLITE_SENTENCIAS), así que el SQL repetido
+    no se vuelve a compilar. Solo un proceso escribe a la vez: sirve para
+    instalaciones pequeñas, pruebas y benchmarks.
+    """
+
+    dialecto = 'sqlite'
+    errores = (sqlite3.Error,)
+
+    def __init__(self, ruta=RUTA_SQLITE, mmap_mb=None, cache_mb=None, timeout=None):
+        super().__init__(database=ruta, pooled=False)
+        self.ruta = ruta
+        self.mmap_mb = mmap_mb if mmap_mb is not None else int(os.environ.get('DB_SQLITE_MMAP_MB', 256))
+        self.cache_mb = cache_mb if cache_mb is not None else int(os.environ.get('DB_SQLITE_CACHE_MB', 64))
+        self.timeout = timeout if timeout is not None else float(os.environ.get('DB_POOL_TIMEOUT', 5))
+        self.sentencias = int(os.environ.get('DB_SQLITE_SENTENCIAS', 256))
+        # Las abiertas, para cerrarlas desde disconnect(); la de un hilo que termina se libera sola
+        self._conexiones = weakref.WeakSet()
+        self._conexiones_lock = threading.Lock()
+        self._epoca = 0        # cambia en cada disconnect(): las conexiones de los hilos quedan viejas
+
+    def _new_connection(self):
+        """Abre una conexión nueva al archivo SQLite"""
+        conn = sqlite3.connect(
+            self.ruta,
+            timeout=self.timeout,
+            isolation_level=None,  # autocommit; transaction() abre BEGIN IMMEDIATE
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=self.sentencias,
+            check_same_thread=False,  # se usa desde un solo hilo, pero disconnect() la cierra desde otro
+            factory=_ConexionSQLite,
+        )
+        conn.row_factory = _fila_dict
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute(f'PRAGMA mmap_size={self.mmap_mb * 1024 * 1024}')
+        conn.execute(f'PRAGMA cache_size=-{self.cache_mb * 1024}')
+        return conn
+
+    def _conexion_hilo(self):
+        conn = getattr(self._local, 'sqlite', None)
+        if conn is None or self._local.epoca != self._epoca:
+            conn = self._new_connection()
+            self._local.sqlite = conn
+            self._local.epoca = self._epoca
+            with self._conexiones_lock:
+                self._conexiones.add(conn)
+        return conn
+
+    def connect(self):
+        """Abre la conexión del hilo actual y crea el archivo si no existe"""
+        try:
+            self._conexion_hilo()
+            print(f"✅ Base de datos SQLite lista ({self.ruta})")
+            return True
+        except sqlite3.Error as e:
+            print(f"❌ Error al abrir la base de datos SQLite: {e}")
+            return False
+
+    def disconnect(self):
+        """Cierra las conexiones de todos los hilos"""
+        with self._conexiones_lock:
+            conexiones, self._conexiones = list(self._conexiones), weakref.WeakSet()
+            self._epoca += 1
+        for conn in conexiones:
+            conn.close()
+        if conexiones:
+            print("🔌 Conexiones SQLite cerradas")
+
+    def despues_de_fork(self):
+        """Olvida las conexiones del padre sin cerrarlas: cerrarlas liberaría sus bloqueos"""
+        _heredadas.extend(self._conexiones)
+        self._conexiones = weakref.WeakSet()
+        self._conexiones_lock = threading.Lock()
+        super().despues_de_fork()
+
+    def get_connection(self):
+        """Retorna la conexión del hilo actual"""
+        return self._conexion_hilo()
+
+    @contextmanager
+    def conexion(self):
+        """Entrega la conexión del hilo (o la de la transacción en curso)"""
+        conn = getattr(self._local, 'conn', None)
+        yield conn if conn is not None else self._conexion_hilo()
+
+    def _cursor(self, conn, dictionary=False):
+        return _CursorSQLite(conn.cursor())
+
+    def _resultados_pendientes(self, conn):
+        return False
+
+    def _iniciar_transaccion(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        # Toma el bloqueo de escritura al empezar, como los SELECT ... FOR UPDATE en MySQL
+        conn.execute('BEGIN IMMEDIATE')
+
+
+def crear_conexion():
+    """Conexión según DB_BACKEND: mysql (por defecto) o sqlite"""
+    if os.environ.get('DB_BACKEND', 'mysql') == 'sqlite':
+        return SQLiteConnection(os.environ.get('DB_SQLITE', RUTA_SQLITE))
+    return DatabaseConnection()
+
+
 # Instancia global de la conexión
-db = DatabaseConnection()
\ No newline at end of file
+db = crear_conexion()
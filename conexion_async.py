@@ -0,0 +1,130 @@
+"""
+Conexión asíncrona a MySQL para el modo ASGI (asgi.py)
+
+Usa un pool de aiomysql para las lecturas de las rutas asíncronas; mientras una
+consulta espera a MySQL el proceso sigue atendiendo otras peticiones. Las
+escrituras siguen pasando por `conexion.db`.
+
+Comparte la caché de consultas con `conexion.db`, así que las escrituras
+síncronas invalidan también lo que leyó este pool.
+"""
+import os
+import time
+
+try:
+    import aiomysql
+    ErrorAsync = (aiomysql.Error, OSError)
+except ImportError:  # aiomysql solo hace falta para el modo ASGI
+    aiomysql = None
+    ErrorAsync = OSError
+
+from cache import tablas_de
+
+
+class AsyncDatabaseConnection:
+    """Pool asíncrono de conexiones MySQL con la misma interfaz de lectura que DatabaseConnection"""
+
+    def __init__(self, host='localhost', database='mercadovecino', user='root', password='',
+                 pool_min=None, pool_max=None, pool_recycle=None, cache=None, perfilador=None):
+        self.host = host
+        self.database = database
+        self.user = user
+        self.password = password
+        self.pool_min = pool_min if pool_min is not None else int(os.environ.get('DB_ASYNC_POOL_MIN', 2))
+        self.pool_max = pool_max if pool_max is not None else int(os.environ.get('DB_ASYNC_POOL_MAX', 50))
+        self.pool_recycle = pool_recycle if pool_recycle is not None else int(os.environ.get('DB_POOL_RECYCLE', 3600))
+        self.cache = cache
+        self.perfilador = perfilador
+        self.pool = None
+
+    @classmethod
+    def desde(cls, db):
+        """Crea un pool asíncrono hacia la misma base de datos, con la misma caché y perfilador que `db`"""
+        return cls(host=db.host, database=db.database, user=db.user, password=db.password,
+                   cache=db.cache, perfilador=db.perfilador)
+
+    async def connect(self):
+        """Abre el pool; retorna True si se pudo conectar"""
+        if aiomysql is None:
+            print("❌ El modo ASGI necesita aiomysql (pip install aiomysql)")
+            return False
+        try:
+            self.pool = await aiomysql.create_pool(
+                host=self.host, db=self.database, user=self.user, password=self.password,
+                minsize=self.pool_min, maxsize=self.pool_max, pool_recycle=self.pool_recycle,
+                charset='utf8mb4', autocommit=True, cursorclass=aiomysql.DictCursor,
+            )
+            print("✅ Pool asíncrono de conexiones MySQL listo")
+            return True
+        except ErrorAsync as e:
+            print(f"❌ Error al conectar a MySQL: {e}")
+            return False
+
+    async def disconnect(self):
+        """Cierra el pool esperando a que se devuelvan las conexiones"""
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+            print("🔌 Pool asíncrono de conexiones cerrado")
+
+    async def execute_query(self, query, params=None, cache=False):
+        """Ejecuta un SELECT y retorna las filas; con cache=True usa la caché compartida"""
+        cache = cache and self.cache is not None
+        if cache:
+            key = self.cache.key(query, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return list(cached)
+            tablas = tablas_de(query)
+            generacion = self.cache.generation(tablas)
+
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    inicio = time.perf_counter()
+                    await cursor.execute(query, params or ())
+                    result = list(await cursor.fetchall())
+                    if self.perfilador is not None:
+                        self.perfilador.registrar(query, time.perf_counter() - inicio, len(result))
+        except ErrorAsync as e:
+            print(f"❌ Error ejecutando consulta: {e}")
+            return []
+
+        if cache:
+            self.cache.set(key, result, tablas, generacion)
+            return list(result)
+        return result
+
+    async def iter_query(self, query, params=None, batch_size=500):
+        """Entrega las filas de a una leyendo con un cursor del servidor por lotes
+
+        A diferencia de execute_query, los errores se propagan: quien consume ya
+        pudo haber enviado parte de las filas y tiene que saber que quedaron
+        incompletas. Conviene consumirlo con contextlib.aclosing() para soltar la
+        conexión enseguida si se deja de leer a mitad.
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor(aiomysql.SSDictCursor) as cursor:
+                    # Se mide solo el tiempo de la base de datos, no el de quien consume las filas
+                    segundos = 0.0
+                    filas = 0
+                    try:
+                        inicio = time.perf_counter()
+                        await cursor.execute(query, params or ())
+                        while True:
+                            rows = await cursor.fetchmany(batch_size)
+                            segundos += time.perf_counter() - inicio
+                            if not rows:
+                                break
+                            filas += len(rows)
+                            for row in rows:
+                                yield row
+                            inicio = time.perf_counter()
+                    finally:
+                        if self.perfilador is not None:
+                            self.perfilador.registrar(query, segundos, filas)
+        except ErrorAsync as e:
+            print(f"❌ Error ejecutando consulta: {e}")
+            raise
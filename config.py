@@ -1,107 +1,104 @@
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
-import hashlib
 import os
 
+from conexion import DatabaseConnection
+from busqueda import IndiceBusqueda
+import contrasenas
+
 # Mantener tu configuración original que funciona
 app = Flask(__name__, template_folder='../vistas')
 app.secret_key = 'tu_clave_secreta_aqui_muy_segura_2024'
 
 class MercadoVecinoWeb:
-    def __init__(self):
-        self.conexion = None
-        self.cursor = None
+    def __init__(self, db=None):
+        # Pool compartido: cada método pide prestada una conexión y usa su propio cursor
+        self.db = db or DatabaseConnection(database="mercado_vecino_v3")
+        self.indice = IndiceBusqueda(self.db, consulta="""
+            SELECT id_producto, nombre, descripcion, categoria, precio
+            FROM productos
+            WHERE estado = 'activo'
+        """)
     
     def conectar(self):
-        """Establece conexión con la base de datos"""
+        """Verifica que el pool pueda entregar una conexión"""
         try:
-            self.conexion = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="",
-                database="mercado_vecino_v3",
-                charset='utf8mb4'
-            )
-            if self.conexion.is_connected():
-                self.cursor = self.conexion.cursor(dictionary=True)
-                return True
+            with self.db.conexion() as conexion:
+                return conexion.is_connected()
         except Error as e:
             print(f"Error de conexión: {e}")
             return False
     
     def _encriptar_contraseña(self, contraseña):
-        return hashlib.sha256(contraseña.encode()).hexdigest()
+        return contrasenas.hashear(contraseña)
     
-    def _verificar_contraseña(self, contraseña, hash_almacenado):
-        return self._encriptar_contraseña(contraseña) == hash_almacenado
+    def _verificar_contraseña(self, contraseña, usuario):
+        """Verifica la contraseña y reemplaza el hash si era del formato antiguo"""
+        correcta, hash_nuevo = contrasenas.verificar(usuario['password_hash'], contraseña)
+        if correcta and hash_nuevo:
+            self.db.execute_update("UPDATE usuarios SET password_hash = %s WHERE id_usuario = %s",
+                                   (hash_nuevo, usuario['id_usuario']))
+        return correcta
     
     def registrar_usuario(self, nombre, apellido, correo, telefono, direccion, contraseña, rol="cliente"):
         """Registra un nuevo usuario - CORREGIDO para coincidir con tu BD"""
         try:
-            if not self.conectar():
-                return None
-                
-            # Verificar si el correo ya existe
-            consulta_verificar = "SELECT correo FROM usuarios WHERE correo = %s"
-            self.cursor.execute(consulta_verificar, (correo,))
-            if self.cursor.fetchone():
-                self.cerrar_conexion()
-                return None
-            
-            # Encriptar contraseña
-            contraseña_encriptada = self._encriptar_contraseña(contraseña)
-            
-            # Insertar nuevo usuario
-            consulta = """
-            INSERT INTO usuarios (nombre, apellido, correo, telefono, password_hash, direccion, rol, fecha_registro)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            parametros = (nombre, apellido, correo, telefono, contraseña_encriptada, direccion, rol, datetime.now())
-            
-            self.cursor.execute(consulta, parametros)
-            self.conexion.commit()
-            usuario_id = self.cursor.lastrowid
-            
-            self.cerrar_conexion()
-            return usuario_id
+            with self.db.conexion() as conexion:
+                cursor = conexion.cursor(dictionary=True, buffered=True)
+                try:
+                    # Verificar si el correo ya existe
+                    consulta_verificar = "SELECT correo FROM usuarios WHERE correo = %s"
+                    cursor.execute(consulta_verificar, (correo,))
+                    if cursor.fetchone():
+                        return None
+                    
+                    # Encriptar contraseña
+                    contraseña_encriptada = self._encriptar_contraseña(contraseña)
+                    
+                    # Insertar nuevo usuario
+                    consulta = """
+                    INSERT INTO usuarios (nombre, apellido, correo, telefono, password_hash, direccion, rol, fecha_registro)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    """
+                    parametros = (nombre, apellido, correo, telefono, contraseña_encriptada, direccion, rol, datetime.now())
+                    
+                    cursor.execute(consulta, parametros)
+                    conexion.commit()
+                    return cursor.lastrowid
+                except Error:
+                    conexion.rollback()
+                    raise
+                finally:
+                    cursor.close()
             
         except Error as e:
             print(f"Error al registrar usuario: {e}")
-            if self.conexion:
-                self.conexion.rollback()
-            self.cerrar_conexion()
             return None
     
     def iniciar_sesion(self, correo, contraseña):
         """Inicia sesión verificando credenciales"""
         try:
-            if not self.conectar():
-                return None
-                
-            consulta = "SELECT * FROM usuarios WHERE correo = %s"
-            self.cursor.execute(consulta, (correo,))
-            usuario = self.cursor.fetchone()
-            
-            resultado = None
-            if usuario and self._verificar_contraseña(contraseña, usuario['password_hash']):
-                resultado = usuario
+            with self.db.conexion() as conexion:
+                cursor = conexion.cursor(dictionary=True, buffered=True)
+                try:
+                    consulta = "SELECT * FROM usuarios WHERE correo = %s"
+                    cursor.execute(consulta, (correo,))
+                    usuario = cursor.fetchone()
+                finally:
+                    cursor.close()
             
-            self.cerrar_conexion()
-            return resultado
+            if usuario and self._verificar_contraseña(contraseña, usuario):
+                return usuario
+            return None
                 
         except Error as e:
             print(f"Error al iniciar sesión: {e}")
-            self.cerrar_conexion()
             return None
     
     def obtener_productos(self, categoria=None, busqueda=None, limite=20):
         """Obtiene productos con filtros opcionales"""
         try:
-            if not self.conectar():
-                return []
-            
             consulta = "SELECT * FROM productos WHERE estado = 'activo'"
             parametros = []
             
@@ -109,69 +106,61 @@ class MercadoVecinoWeb:
                 consulta += " AND categoria = %s"
                 parametros.append(categoria)
             
+            orden = None
             if busqueda:
-                consulta += " AND (nombre LIKE %s OR descripcion LIKE %s)"
-                parametros.extend([f"%{busqueda}%", f"%{busqueda}%"])
-            
-            consulta += " ORDER BY id_producto DESC LIMIT %s"
-            parametros.append(limite)
+                ids = self.indice.buscar_ids(busqueda)
+                if not ids:
+                    return []
+                consulta += f" AND id_producto IN ({', '.join(['%s'] * len(ids))})"
+                parametros.extend(ids)
+                orden = {producto_id: i for i, producto_id in enumerate(ids)}
+            else:
+                consulta += " ORDER BY id_producto DESC LIMIT %s"
+                parametros.append(limite)
             
-            self.cursor.execute(consulta, parametros)
-            productos = self.cursor.fetchall()
+            with self.db.conexion() as conexion:
+                cursor = conexion.cursor(dictionary=True)
+                try:
+                    cursor.execute(consulta, parametros)
+                    productos = cursor.fetchall()
+                finally:
+                    cursor.close()
             
-            self.cerrar_conexion()
+            if orden is not None:
+                # Resultados de búsqueda: se respeta el orden por relevancia
+                productos.sort(key=lambda producto: orden[producto['id_producto']])
+                productos = productos[:limite]
             return productos
             
         except Error as e:
             print(f"Error al obtener productos: {e}")
-            self.cerrar_conexion()
             return []
     
     def obtener_producto_por_id(self, producto_id):
         """Obtiene un producto específico por ID"""
         try:
-            if not self.conectar():
-                return None
-                
-            consulta = "SELECT * FROM productos WHERE id_producto = %s AND estado = 'activo'"
-            self.cursor.execute(consulta, (producto_id,))
-            producto = self.cursor.fetchone()
-            
-            self.cerrar_conexion()
-            return producto
+            with self.db.conexion() as conexion:
+                cursor = conexion.cursor(dictionary=True, buffered=True)
+                try:
+                    consulta = "SELECT * FROM productos WHERE id_producto = %s AND estado = 'activo'"
+                    cursor.execute(consulta, (producto_id,))
+                    return cursor.fetchone()
+                finally:
+                    cursor.close()
             
         except Error as e:
             print(f"Error al obtener producto: {e}")
-            self.cerrar_conexion()
             return None
     
     def obtener_categorias(self):
-        """Obtiene las categorías disponibles"""
-        try:
-            if not self.conectar():
-                return []
-                
-            consulta = "SELECT DISTINCT categoria FROM productos WHERE estado = 'activo' ORDER BY categoria"
-            self.cursor.execute(consulta)
-            categorias = [row['categoria'] for row in self.cursor.fetchall()]
-            
-            self.cerrar_conexion()
-            return categorias
-            
-        except Error as e:
-            print(f"Error al obtener categorías: {e}")
-            self.cerrar_conexion()
-            return []
+        """Obtiene las categorías disponibles (cacheadas hasta que cambie productos)"""
+        consulta = "SELECT DISTINCT categoria FROM productos WHERE estado = 'activo' ORDER BY categoria"
+        return [row['categoria'] for row in self.db.execute_query(consulta, cache=True)]
     
     def cerrar_conexion(self):
-        """Cierra la conexión a la base de datos"""
+        """Cierra todas las conexiones del pool (por ejemplo al apagar el servidor)"""
         try:
-            if self.cursor:
-                self.cursor.close()
-                self.cursor = None
-            if self.conexion and self.conexion.is_connected():
-                self.conexion.close()
-                self.conexion = None
+            self.db.disconnect()
         except Error as e:
             print(f"Error al cerrar conexión: {e}")
 
@@ -356,7 +345,6 @@ def perfil():
 def test_db():
     """Test de conexión a base de datos"""
     if mercado.conectar():
-        mercado.cerrar_conexion()
         return jsonify({"status": "success", "message": "Conexión a BD exitosa"})
     else:
         return jsonify({"status": "error", "message": "Error de conexión a BD"})
@@ -0,0 +1,112 @@
+"""
+Hash y verificación de contraseñas
+
+Un solo algoritmo y costo configurables para toda la aplicación:
+  PASSWORD_ALGORITMO  scrypt (por defecto) o pbkdf2
+  PASSWORD_COSTO      N de scrypt (32768) o iteraciones de pbkdf2 (600000)
+  PASSWORD_HILOS      hashes simultáneos como máximo (0 = en el hilo de la petición)
+  PASSWORD_EJECUTOR   hilos (por defecto) o procesos
+
+El cálculo corre en un pool acotado: en un pico de registros o logins solo
+PASSWORD_HILOS núcleos quedan ocupados con hashes y el resto de las peticiones
+sigue atendiéndose. Los hashes SHA-256 sin sal del sistema anterior se aceptan
+y se reemplazan por uno nuevo en el primer login correcto.
+"""
+import hashlib
+import hmac
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+COSTOS = {'scrypt': 32768, 'pbkdf2': 600000}
+
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def metodo_werkzeug(algoritmo, costo=None):
+    """Arma el método de werkzeug para el algoritmo y costo dados"""
+    if algoritmo not in COSTOS:
+        raise ValueError(f"Algoritmo de contraseñas no soportado: {algoritmo}")
+    costo = int(costo or COSTOS[algoritmo])
+    if algoritmo == 'scrypt':
+        return f'scrypt:{costo}:8:1'
+    return f'pbkdf2:sha256:{costo}'
+
+
+def es_sha256_antiguo(hash_guardado):
+    """True si el hash es un SHA-256 sin sal del sistema anterior"""
+    return bool(_SHA256_RE.match(hash_guardado or ''))
+
+
+class ServicioContrasenas:
+    """Calcula y verifica hashes en un pool acotado de hilos o procesos"""
+
+    def __init__(self, algoritmo='scrypt', costo=None, hilos=4, procesos=False):
+        self.metodo = metodo_werkzeug(algoritmo, costo)
+        self.hilos = hilos
+        self._pool = None
+        if hilos:
+            if procesos:
+                self._pool = ProcessPoolExecutor(max_workers=hilos)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='contrasenas')
+
+    def _ejecutar(self, funcion, *args):
+        if self._pool is None:
+            return funcion(*args)
+        return self._pool.submit(funcion, *args).result()
+
+    def hashear(self, contraseña):
+        """Retorna el hash de la contraseña con el algoritmo y costo configurados"""
+        return self._ejecutar(generate_password_hash, contraseña, self.metodo)
+
+    def necesita_rehash(self, hash_guardado):
+        """True si el hash fue hecho con otro algoritmo o costo que el actual"""
+        return hash_guardado.split('$', 1)[0] != self.metodo
+
+    def verificar(self, hash_guardado, contraseña):
+        """Verifica la contraseña y retorna (correcta, hash_nuevo)
+
+        `hash_nuevo` no es None cuando la contraseña es correcta pero el hash guardado
+        es antiguo (SHA-256 o costo distinto): quien llama debe guardarlo.
+        """
+        if not hash_guardado or contraseña is None:
+            return False, None
+
+        if es_sha256_antiguo(hash_guardado):
+            calculado = hashlib.sha256(contraseña.encode()).hexdigest()
+            correcta = hmac.compare_digest(calculado, hash_guardado)
+        else:
+            try:
+                correcta = self._ejecutar(check_password_hash, hash_guardado, contraseña)
+            except ValueError:
+                # Método desconocido en el hash guardado
+                return False, None
+
+        if correcta and self.necesita_rehash(hash_guardado):
+            return True, self.hashear(contraseña)
+        return correcta, None
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+
+servicio = ServicioContrasenas(
+    algoritmo=os.environ.get('PASSWORD_ALGORITMO', 'scrypt'),
+    costo=os.environ.get('PASSWORD_COSTO'),
+    hilos=int(os.environ.get('PASSWORD_HILOS', min(4, os.cpu_count() or 1))),
+    procesos=os.environ.get('PASSWORD_EJECUTOR', 'hilos') == 'procesos',
+)
+
+
+def hashear(contraseña):
+    """Hash de la contraseña con el servicio global"""
+    return servicio.hashear(contraseña)
+
+
+def verificar(hash_guardado, contraseña):
+    """Verifica con el servicio global; ver ServicioContrasenas.verificar"""
+    return servicio.verificar(hash_guardado, contraseña)
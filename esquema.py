@@ -0,0 +1,257 @@
+"""
+Migraciones versionadas del esquema y verificación de índices
+
+Las migraciones son archivos `migraciones/NNN_descripcion.sql` que se aplican en
+orden una sola vez; las versiones aplicadas quedan en la tabla schema_migraciones.
+Con DB_BACKEND=sqlite se usan las de `migraciones/sqlite/`, con la misma
+numeración: cada migración nueva va en las dos carpetas.
+
+Uso:
+    flask --app app migrar
+    flask --app app verificar-indices   (sale con 1 si hay escaneos completos, 2 si no es MySQL)
+"""
+import inspect
+from contextlib import contextmanager
+import os
+import re
+import sys
+
+from conexion import db, ErrorBD
+
+MIGRACIONES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migraciones')
+
+_ARCHIVO_RE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def listar_migraciones():
+    """Retorna [(version, nombre, ruta)] ordenadas por versión, para el motor de `db`"""
+    carpeta = os.path.join(MIGRACIONES_DIR, 'sqlite') if db.dialecto == 'sqlite' else MIGRACIONES_DIR
+    migraciones = []
+    for archivo in os.listdir(carpeta):
+        match = _ARCHIVO_RE.match(archivo)
+        if match:
+            migraciones.append((int(match.group(1)), match.group(2),
+                                os.path.join(carpeta, archivo)))
+    return sorted(migraciones)
+
+
+def _sentencias(sql):
+    """Separa un archivo SQL en sentencias, ignorando comentarios de línea
+
+    Los `;` dentro de un CREATE TRIGGER ... BEGIN ... END no cortan la sentencia.
+    """
+    lineas = [linea for linea in sql.splitlines() if not linea.strip().startswith('--')]
+    sentencias = []
+    actual = ''
+    for parte in '\n'.join(lineas).split(';'):
+        actual = f"{actual};{parte}" if actual else parte
+        if re.match(r'\s*CREATE\s+TRIGGER\b', actual, re.IGNORECASE) and \
+                not re.search(r'\bEND\s*$', actual, re.IGNORECASE):
+            continue
+        if actual.strip():
+            sentencias.append(actual.strip())
+        actual = ''
+    return sentencias
+
+
+def migrar(destino=None):
+    """Aplica las migraciones pendientes hasta `destino` (o todas) y retorna las versiones aplicadas"""
+    aplicadas = []
+    with db.transaction():
+        db.execute_update("""
+            CREATE TABLE IF NOT EXISTS schema_migraciones (
+                version INT PRIMARY KEY,
+                nombre VARCHAR(150) NOT NULL,
+                aplicada_en DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    hechas = {fila['version'] for fila in db.execute_query("SELECT version FROM schema_migraciones")}
+
+    for version, nombre, ruta in listar_migraciones():
+        if version in hechas or (destino is not None and version > destino):
+            continue
+
+        with open(ruta, encoding='utf-8') as f:
+            sentencias = _sentencias(f.read())
+
+        # En MySQL el DDL confirma solo: si una sentencia falla, la migración
+        # queda a medias y hay que corregirla a mano antes de reintentar.
+        # En SQLite la migración completa se deshace.
+        try:
+            with db.transaction():
+                for sentencia in sentencias:
+                    db.execute_update(sentencia)
+                db.execute_insert(
+                    "INSERT INTO schema_migraciones (version, nombre) VALUES (%s, %s)",
+                    (version, nombre))
+        except ErrorBD as e:
+            print(f"❌ Error en la migración {version:03d}_{nombre}: {e}")
+            raise
+
+        print(f"✅ Migración {version:03d}_{nombre} aplicada")
+        aplicadas.append(version)
+
+    # El esquema cambió: lo cacheado puede tener columnas viejas
+    if db.cache is not None:
+        db.cache.clear()
+    return aplicadas
+
+
+# ---------- Verificación de índices ----------
+
+# Valores de ejemplo por nombre de parámetro para llamar a los métodos de models.py
+VALORES_EJEMPLO = {
+    'user_id': 1, 'producto_id': 1, 'vendedor_id': 1, 'comprador_id': 1, 'pedido_id': 1,
+    'correo': 'ejemplo@mercadovecino.co', 'nombre': 'Ejemplo', 'apellido': 'Ejemplo',
+    'telefono': '3000000000', 'password_hash': 'x', 'direccion': 'Calle 1',
+    'descripcion': 'Ejemplo', 'categoria': 'Frutas', 'precio': 1000, 'stock': 1,
+    'cantidad': 1, 'precio_unitario': 1000, 'total': 1000, 'calificacion': 5,
+    'comentario': 'Ejemplo', 'datos': {'nombre': 'Ejemplo'}, 'limit': 10,
+    'items': [{'id_producto': 1, 'cantidad': 1}, {'id_producto': 2, 'cantidad': 1}],
+    'producto_ids': [1, 2],
+}
+
+# Llamadas adicionales para cubrir los filtros opcionales
+VARIANTES = {
+    'Producto.obtener_productos': [{}, {'categoria': 'Frutas'}],
+}
+
+# Consultas que recorren la tabla completa a propósito
+PERMITIDOS = {'Resena.reconstruir_ratings', 'ResumenVendedor.reconstruir'}
+
+
+class _Grabadora:
+    """Reemplaza a `db` en models.py y anota las consultas en vez de ejecutarlas"""
+
+    cache = None
+    dialecto = 'mysql'
+
+    def __init__(self):
+        self.consultas = []
+
+    def execute_query(self, query, params=None, cache=False):
+        self.consultas.append((query, params))
+        return []
+
+    def execute_insert(self, query, params=None):
+        self.consultas.append((query, params))
+        return 1
+
+    def execute_update(self, query, params=None):
+        self.consultas.append((query, params))
+        return 1
+
+    def execute_many(self, query, seq_params, batch_size=1000):
+        filas = list(seq_params)
+        self.consultas.append((query, filas[0] if filas else None))
+        return len(filas)
+
+    @contextmanager
+    def transaction(self):
+        yield None
+
+
+def consultas_models():
+    """Llama a cada método público de models.py con valores de ejemplo y retorna sus consultas
+
+    Retorna [(metodo, query, params)].
+    """
+    import models
+
+    grabadora = _Grabadora()
+    original = models.db
+    models.db = grabadora
+    resultado = []
+    try:
+        for nombre_clase, clase in inspect.getmembers(models, inspect.isclass):
+            if clase.__module__ != models.__name__:
+                continue
+            for nombre_metodo, metodo in inspect.getmembers(clase, inspect.isfunction):
+                if nombre_metodo.startswith('_'):
+                    continue
+                clave = f"{nombre_clase}.{nombre_metodo}"
+                for extra in VARIANTES.get(clave, [{}]):
+                    kwargs = {}
+                    for param in inspect.signature(metodo).parameters.values():
+                        if param.name in extra:
+                            kwargs[param.name] = extra[param.name]
+                        elif param.default is inspect.Parameter.empty:
+                            kwargs[param.name] = VALORES_EJEMPLO[param.name]
+                    grabadora.consultas = []
+                    try:
+                        metodo(**kwargs)
+                    except Exception:
+                        # Sin datos reales el método puede cortar antes (p. ej. sin stock);
+                        # basta con las consultas que alcanzó a hacer
+                        pass
+                    resultado.extend((clave, query, params) for query, params in grabadora.consultas)
+    finally:
+        models.db = original
+    return resultado
+
+
+def verificar_indices():
+    """Ejecuta EXPLAIN sobre cada consulta de models.py y retorna las que hacen escaneo completo
+
+    Conviene correrlo sobre una base con datos: con tablas vacías el optimizador
+    puede preferir un escaneo aunque exista el índice.
+    """
+    problemas = []
+    vistas = set()
+    with db.conexion() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for metodo, query, params in consultas_models():
+                if metodo in PERMITIDOS or not query.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                    continue
+                clave = (query, tuple(params or ()))
+                if clave in vistas:
+                    continue
+                vistas.add(clave)
+
+                cursor.execute('EXPLAIN ' + query, params or ())
+                for fila in cursor.fetchall():
+                    if fila.get('type') == 'ALL':
+                        problemas.append((metodo, fila.get('table'), ' '.join(query.split())))
+        finally:
+            cursor.close()
+    return problemas
+
+
+def reportar_indices():
+    """Imprime el resultado de verificar_indices() y retorna los problemas encontrados
+
+    Retorna None si no se pudo verificar (la base no es MySQL).
+    """
+    if db.dialecto != 'mysql':
+        # Lee la salida de EXPLAIN de MySQL
+        print("❌ Verificación de índices omitida: solo está disponible con MySQL")
+        return None
+    problemas = verificar_indices()
+    for metodo, tabla, query in problemas:
+        print(f"❌ {metodo}: escaneo completo de {tabla}\n   {query}")
+    if not problemas:
+        print("✅ Ninguna consulta de models.py hace escaneo completo")
+    return problemas
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('accion', choices=['migrar', 'verificar'])
+    parser.add_argument('--hasta', type=int, help='Versión máxima a aplicar')
+    args = parser.parse_args()
+
+    if args.accion == 'migrar':
+        migrar(args.hasta)
+        return 0
+
+    problemas = reportar_indices()
+    if problemas is None:
+        return 2
+    return 1 if problemas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Archivos estáticos versionados y comprimidos, sin paso de build
+
+Al arrancar se recorre static/ y a cada CSS, JS e imagen se le calcula un hash
+de contenido. `url_for('static', filename='css/index.css')` pasa a generar
+`/static/css/index.3fa9c1e2b4.css`, que se sirve desde memoria con
+`Cache-Control: immutable` y, si el navegador lo acepta, ya comprimido en
+brotli o gzip. Si el archivo cambia, cambia su URL: no hace falta revalidar.
+
+Las carpetas con archivos subidos por usuarios (EXCLUIR) no entran al manifiesto
+y se sirven como siempre.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+
+from flask import request, Response
+
+try:
+    import brotli
+except ImportError:  # sin brotli solo se sirve gzip
+    brotli = None
+
+EXTENSIONES = {'.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico', '.woff', '.woff2'}
+COMPRIMIBLES = {'.css', '.js', '.svg'}
+EXCLUIR = ('imagenes/perfiles', 'imagenes/productos')
+MAX_EN_MEMORIA = 2 * 1024 * 1024
+UN_AÑO = 365 * 24 * 3600
+
+
+class Activo:
+    """Un archivo versionado con sus variantes comprimidas"""
+
+    def __init__(self, datos, mimetype, etag):
+        self.datos = datos
+        self.mimetype = mimetype
+        self.etag = etag
+        self.variantes = {}  # codificación -> bytes
+
+    def comprimir(self):
+        comprimido = gzip.compress(self.datos, compresslevel=9, mtime=0)
+        if len(comprimido) < len(self.datos):
+            self.variantes['gzip'] = comprimido
+        if brotli is not None:
+            comprimido = brotli.compress(self.datos, quality=11)
+            if len(comprimido) < len(self.datos):
+                self.variantes['br'] = comprimido
+
+
+class ManifiestoEstaticos:
+    """Mapa nombre original -> nombre con hash, y nombre con hash -> Activo"""
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.urls = {}
+        self.activos = {}
+
+    def construir(self):
+        urls, activos = {}, {}
+        for raiz, _, archivos in os.walk(self.carpeta):
+            relativa = os.path.relpath(raiz, self.carpeta).replace(os.sep, '/')
+            if relativa.startswith(EXCLUIR):
+                continue
+            for archivo in archivos:
+                base, ext = os.path.splitext(archivo)
+                ruta = os.path.join(raiz, archivo)
+                if ext.lower() not in EXTENSIONES or os.path.getsize(ruta) > MAX_EN_MEMORIA:
+                    continue
+                with open(ruta, 'rb') as f:
+                    datos = f.read()
+                huella = hashlib.sha256(datos).hexdigest()[:10]
+                nombre = posixpath.normpath(posixpath.join(relativa, archivo))
+                versionado = posixpath.normpath(posixpath.join(relativa, f"{base}.{huella}{ext}"))
+
+                activo = Activo(datos, mimetypes.guess_type(archivo)[0] or 'application/octet-stream', huella)
+                if ext.lower() in COMPRIMIBLES:
+                    activo.comprimir()
+                urls[nombre] = versionado
+                activos[versionado] = activo
+
+        self.urls, self.activos = urls, activos
+        return self
+
+    def url(self, nombre):
+        """Nombre versionado de `nombre`, o el mismo si no está en el manifiesto"""
+        return self.urls.get(nombre, nombre)
+
+    def respuesta(self, nombre):
+        """Response para un nombre versionado, o None si no es uno"""
+        activo = self.activos.get(nombre)
+        if activo is None:
+            return None
+
+        codificacion = None
+        for candidata in ('br', 'gzip'):
+            if candidata in activo.variantes and request.accept_encodings[candidata]:
+                codificacion = candidata
+                break
+
+        # ETag fuerte por representación: los cuerpos gzip, br y sin comprimir son distintos
+        etag = f"{activo.etag}-{codificacion}" if codificacion else activo.etag
+        if request.if_none_match.contains(etag):
+            resp = Response(status=304)
+        else:
+            resp = Response(activo.variantes.get(codificacion, activo.datos), mimetype=activo.mimetype)
+            if codificacion:
+                resp.headers['Content-Encoding'] = codificacion
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = f'public, max-age={UN_AÑO}, immutable'
+        if activo.variantes:
+            resp.vary.add('Accept-Encoding')
+        return resp
+
+
+def iniciar(app):
+    """Construye el manifiesto y conecta url_for('static') y la ruta /static con él"""
+    manifiesto = ManifiestoEstaticos(app.static_folder).construir()
+    servir_original = app.view_functions['static']
+
+    @app.url_defaults
+    def versionar_estaticos(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = manifiesto.url(values['filename'])
+
+    def servir_estatico(filename):
+        return manifiesto.respuesta(filename) or servir_original(filename=filename)
+
+    app.view_functions['static'] = servir_estatico
+    app.extensions['estaticos'] = manifiesto
+    return manifiesto
@@ -0,0 +1,42 @@
+"""
+Favoritos cacheados por usuario
+
+Por cada usuario se guarda el conjunto de IDs de sus productos favoritos. Con
+él, saber cuáles de los N productos de un listado son favoritos no hace ninguna
+consulta (Favorito.estados en models.py); el conjunto se lee con una sola
+consulta cuando falta o venció. Favorito.agregar_favorito y quitar_favorito lo
+invalidan. Cada proceso tiene su propia caché: lo que cambie otro proceso se ve
+cuando vence el TTL (FAVORITOS_CACHE_TTL, en segundos; 0 la desactiva).
+"""
+import os
+
+from cache import CacheLRU
+
+
+class CacheFavoritos(CacheLRU):
+    """frozenset de IDs de producto favoritos por usuario, con TTL y expulsión LRU"""
+
+    def __init__(self, max_entries=4096, ttl=300.0):
+        super().__init__(max_entries, ttl)
+        self._generacion = 0  # invalidaciones, para no guardar lecturas viejas
+
+    def generacion(self):
+        """Se toma antes de leer de la base de datos y se pasa a set()"""
+        with self._lock:
+            return self._generacion
+
+    def set(self, user_id, producto_ids, generacion=None):
+        """Guarda el conjunto, salvo que haya habido una invalidación mientras se leía"""
+        with self._lock:
+            if generacion is None or generacion == self._generacion:
+                self._guardar(user_id, frozenset(producto_ids))
+
+    def invalidar(self, user_id):
+        with self._lock:
+            self._sacar(user_id)
+            self._generacion += 1
+            self.invalidations += 1
+
+
+cache_favoritos = CacheFavoritos(max_entries=int(os.environ.get('FAVORITOS_CACHE_MAX', 4096)),
+                                 ttl=float(os.environ.get('FAVORITOS_CACHE_TTL', 300)))
@@ -0,0 +1,112 @@
+"""
+Caché de HTML renderizado, atada a la versión del catálogo
+
+- `fragmento(nombre, *clave)`: bloque de plantilla que se renderiza una vez por
+  versión del catálogo, p. ej. el listado de productos. En la plantilla:
+
+      {% call fragmento('destacados') %} ... {% endcall %}
+
+- `pagina_anonima`: decorador que guarda la página completa para visitantes sin
+  sesión; los usuarios conectados la renderizan (con su encabezado) pero reusan
+  los fragmentos. La clave solo lleva los parámetros que la vista declara en
+  `argumentos=`; las búsquedas de texto libre (?q=) no se guardan.
+
+Cuando cambia la versión del catálogo (se escribe un producto) se descarta todo.
+"""
+import os
+from functools import wraps
+
+from flask import request, session
+from markupsafe import Markup
+
+from cache import CacheLRU
+from catalogo import version_catalogo
+
+
+class CacheFragmentos(CacheLRU):
+    """HTML por clave, LRU, vaciado cada vez que cambia la versión del catálogo"""
+
+    def __init__(self, max_entries=512):
+        super().__init__(max_entries, ttl=None)
+        self._version = None
+
+    def get(self, version, clave):
+        with self._lock:
+            if version != self._version:
+                self._entradas.clear()
+                self._version = version
+            return self._leer(clave)
+
+    def set(self, version, clave, html):
+        with self._lock:
+            # Si la versión cambió mientras se renderizaba, el HTML ya es viejo
+            if version == self._version:
+                self._guardar(clave, html)
+
+
+cache_fragmentos = CacheFragmentos(max_entries=int(os.environ.get('FRAGMENTOS_MAX', 512)))
+
+
+def fragmento(nombre, *clave, caller):
+    """Global de Jinja para `{% call fragmento(...) %}`: retorna el bloque desde la caché"""
+    version = version_catalogo.actual()
+    clave = ('fragmento', nombre) + clave
+    html = cache_fragmentos.get(version, clave)
+    if html is None:
+        html = str(caller())
+        cache_fragmentos.set(version, clave, html)
+    return Markup(html)
+
+
+# Parámetros de texto libre: con ellos la página no se guarda, para que búsquedas
+# arbitrarias no expulsen de la caché las páginas que sí se repiten
+TEXTO_LIBRE = frozenset({'q'})
+
+
+def _clave_pagina(argumentos):
+    """Clave de la página con solo los parámetros que usa la vista, normalizados y ordenados
+
+    Retorna None si la página no se debe guardar (trae texto libre).
+    """
+    valores = []
+    for nombre in sorted(argumentos):
+        valor = request.args.get(nombre, '').strip()
+        if valor and nombre in TEXTO_LIBRE:
+            return None
+        if valor:
+            valores.append((nombre, valor))
+    return ('pagina', request.endpoint, tuple(valores))
+
+
+def pagina_anonima(vista=None, *, argumentos=()):
+    """Sirve la página completa desde la caché a visitantes sin sesión ni mensajes pendientes
+
+    Solo los parámetros de `argumentos` (los que la vista lee de request.args)
+    entran en la clave; cualquier otro (cache-busters, seguimiento) reusa la
+    misma página en vez de ocupar una entrada nueva.
+    """
+    if vista is None:
+        return lambda vista: pagina_anonima(vista, argumentos=argumentos)
+
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        if request.method != 'GET' or session:
+            return vista(*args, **kwargs)
+        clave = _clave_pagina(argumentos)
+        if clave is None:
+            return vista(*args, **kwargs)
+
+        version = version_catalogo.actual()
+        html = cache_fragmentos.get(version, clave)
+        if html is None:
+            html = vista(*args, **kwargs)
+            if not isinstance(html, str):
+                return html
+            cache_fragmentos.set(version, clave, html)
+        return html
+    return envoltura
+
+
+def iniciar(app):
+    """Registra `fragmento` en las plantillas de la aplicación"""
+    app.jinja_env.globals['fragmento'] = fragmento
@@ -0,0 +1,55 @@
+"""
+Configuración de gunicorn para producción
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Dimensionamiento:
+  - WEB_WORKERS procesos (por defecto uno por núcleo). Por el GIL, un proceso de
+    Python usa como mucho un núcleo para render y JSON; para usar todos los
+    núcleos hacen falta procesos.
+  - WEB_THREADS hilos por proceso (por defecto 8). Cubren la espera de MySQL y
+    de la red: mientras un hilo espera una consulta, otro renderiza.
+  - Cada worker tiene su propio pool de MySQL. DB_POOL_MAX toma el valor de
+    WEB_THREADS si no se define, así ningún hilo espera una conexión. En total
+    se abren hasta WEB_WORKERS × DB_POOL_MAX conexiones; debe quedar por debajo
+    de max_connections de MySQL (151 por defecto).
+    Ejemplo: 8 núcleos × 8 hilos = 64 conexiones como máximo.
+  - Para muchos clientes lentos o streams largos (NDJSON) conviene el modo
+    ASGI (asgi.py), que no ocupa un hilo por petición en espera.
+  - Las sesiones y los carritos se guardan en SQLite (SESSION_STORE y
+    CARRITO_STORE = sqlite por defecto) para que todos los workers los vean; en
+    memoria cada worker tendría los suyos y el usuario perdería la sesión al
+    caer en otro.
+
+Con preload_app la aplicación se importa y precalienta (wsgi.crear_app) una vez
+en el maestro; los workers heredan las plantillas compiladas y las cachés.
+"""
+import os
+
+workers = int(os.environ.get('WEB_WORKERS', os.cpu_count() or 1))
+threads = int(os.environ.get('WEB_THREADS', 8))
+worker_class = 'gthread'
+bind = os.environ.get('WEB_BIND', '0.0.0.0:8000')
+preload_app = True
+
+# Reinicia cada worker tras N peticiones (con algo de azar para no reiniciarlos a la vez)
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+keepalive = 5
+
+# Se fija antes de que se importe la aplicación, que lee el entorno al crear el pool
+os.environ.setdefault('DB_POOL_MAX', str(threads))
+os.environ.setdefault('DB_POOL_MIN', str(min(2, threads)))
+os.environ.setdefault('SESSION_STORE', 'sqlite')
+os.environ.setdefault('CARRITO_STORE', 'sqlite')
+
+
+def post_fork(server, worker):
+    import wsgi
+    wsgi.al_iniciar_worker()
+
+
+def worker_exit(server, worker):
+    import wsgi
+    wsgi.al_terminar_worker()
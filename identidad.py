@@ -0,0 +1,151 @@
+"""
+Usuarios cacheados: mapa de identidad por petición y caché entre peticiones
+
+Dentro de una petición de Flask cada usuario se lee de la base de datos a lo sumo
+una vez y todas las búsquedas retornan el mismo dict. Entre peticiones queda una
+caché LRU pequeña con TTL que se invalida con `invalidar()` cuando el usuario
+cambia. Cada proceso tiene su propia caché: lo que cambie otro proceso se ve
+cuando vence el TTL (USUARIOS_CACHE_TTL, en segundos; 0 la desactiva).
+"""
+import os
+
+from flask import g, has_request_context
+
+from cache import CacheLRU
+
+
+class CacheUsuarios(CacheLRU):
+    """Filas de usuarios por ID, con TTL, expulsión LRU e índice por correo"""
+
+    def __init__(self, max_entries=1024, ttl=60.0):
+        super().__init__(max_entries, ttl)
+        self._correos = {}    # correo en minúsculas -> id_usuario
+        self._generacion = 0  # invalidaciones, para no guardar lecturas viejas
+
+    def _sacar(self, user_id):
+        fila = super()._sacar(user_id)
+        if fila is not None and self._correos.get(_correo(fila)) == user_id:
+            del self._correos[_correo(fila)]
+        return fila
+
+    def get(self, user_id):
+        fila = super().get(user_id)
+        return None if fila is None else dict(fila)
+
+    def id_por_correo(self, correo):
+        with self._lock:
+            return self._correos.get((correo or '').lower())
+
+    def generacion(self):
+        """Se toma antes de leer de la base de datos y se pasa a set()"""
+        with self._lock:
+            return self._generacion
+
+    def set(self, usuario, generacion=None):
+        """Guarda la fila, salvo que haya habido una invalidación mientras se leía"""
+        with self._lock:
+            if not self.activa() or (generacion is not None and generacion != self._generacion):
+                return
+            self._guardar(usuario['id_usuario'], dict(usuario))
+            if usuario.get('correo'):
+                self._correos[_correo(usuario)] = usuario['id_usuario']
+
+    def invalidar(self, user_id):
+        with self._lock:
+            self._sacar(user_id)
+            self._generacion += 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._correos.clear()
+
+
+cache_usuarios = CacheUsuarios(max_entries=int(os.environ.get('USUARIOS_CACHE_MAX', 1024)),
+                               ttl=float(os.environ.get('USUARIOS_CACHE_TTL', 60)))
+
+
+def _mapa():
+    """Usuarios ya leídos en esta petición ({id_usuario: fila}), o None fuera de una petición"""
+    if not has_request_context():
+        return None
+    mapa = g.get('_usuarios')
+    if mapa is None:
+        mapa = g._usuarios = {}
+    return mapa
+
+
+def _correo(usuario):
+    return (usuario.get('correo') or '').lower()
+
+
+def _en_mapa(mapa, usuario):
+    """Anota el usuario en el mapa de la petición y retorna la instancia que queda ahí"""
+    if mapa is None:
+        return usuario
+    return mapa.setdefault(usuario['id_usuario'], usuario)
+
+
+def por_id(user_id, cargar):
+    """Retorna el usuario `user_id`; solo llama a `cargar(user_id)` si no está en el mapa ni en la caché"""
+    mapa = _mapa()
+    if mapa is not None and user_id in mapa:
+        return mapa[user_id]
+
+    usuario = cache_usuarios.get(user_id)
+    if usuario is None:
+        generacion = cache_usuarios.generacion()
+        usuario = cargar(user_id)
+        if usuario is None:
+            if mapa is not None:
+                mapa[user_id] = None
+            return None
+        cache_usuarios.set(usuario, generacion)
+    return _en_mapa(mapa, usuario)
+
+
+def por_correo(correo, cargar, fresco=False):
+    """Como por_id, pero buscando por correo; `cargar(correo)` lee de la base de datos
+
+    Con `fresco=True` siempre se lee de la base de datos (p. ej. para verificar la
+    contraseña) y la fila leída reemplaza a la del mapa y la caché.
+    """
+    clave = (correo or '').lower()
+    mapa = _mapa()
+
+    if fresco:
+        generacion = cache_usuarios.generacion()
+        usuario = cargar(correo)
+        if usuario is None:
+            return None
+        cache_usuarios.set(usuario, generacion)
+        if mapa is not None:
+            mapa[usuario['id_usuario']] = usuario
+        return usuario
+
+    if mapa:
+        for usuario in mapa.values():
+            if usuario and _correo(usuario) == clave:
+                return usuario
+
+    user_id = cache_usuarios.id_por_correo(clave)
+    if user_id is not None:
+        usuario = cache_usuarios.get(user_id)
+        if usuario is not None and _correo(usuario) == clave:
+            return _en_mapa(mapa, usuario)
+
+    generacion = cache_usuarios.generacion()
+    usuario = cargar(correo)
+    if usuario is None:
+        return None
+    cache_usuarios.set(usuario, generacion)
+    return _en_mapa(mapa, usuario)
+
+
+def invalidar(user_id):
+    """Descarta el usuario de la caché y del mapa de la petición actual (llamar tras modificarlo)"""
+    cache_usuarios.invalidar(user_id)
+    mapa = _mapa()
+    if mapa is not None:
+        mapa.pop(user_id, None)
@@ -0,0 +1,148 @@
+"""
+Procesamiento de imágenes subidas (fotos de perfil y de productos)
+
+Cada imagen se decodifica una sola vez, se gira según su EXIF y se guarda sin
+metadatos en tamaños fijos, en WebP y JPEG. Los nombres salen del hash del
+archivo original, así que subir dos veces la misma foto no ocupa más disco.
+El trabajo pesado corre en un pool de hilos (IMAGENES_HILOS) fuera de la petición.
+
+Archivos generados en static/imagenes/<tipo>/:
+    <hash>_<tamaño>.webp y <hash>_<tamaño>.jpg
+"""
+import hashlib
+import io
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow es opcional: sin él no se aceptan fotos
+    Image = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Lados máximos en píxeles; el último es el que se guarda en la base de datos
+TAMAÑOS = {
+    'perfiles': (96, 256),
+    'productos': (320, 800),
+}
+FORMATOS_ENTRADA = {'JPEG', 'PNG', 'GIF', 'WEBP'}
+MAX_BYTES = 8 * 1024 * 1024
+MAX_PIXELES = 40_000_000  # evita imágenes "bomba" que ocupan gigas al decodificarse
+CALIDAD_JPEG = 82
+CALIDAD_WEBP = 80
+
+_NOMBRE_RE = re.compile(r'^(imagenes/\w+/[0-9a-f]{32})_(\d+)\.jpg$')
+
+
+class ImagenInvalida(ValueError):
+    """El archivo subido no es una imagen aceptada"""
+
+
+_pool = ThreadPoolExecutor(max_workers=int(os.environ.get('IMAGENES_HILOS', 2)),
+                           thread_name_prefix='imagenes')
+
+
+def disponible():
+    """True si Pillow está instalado"""
+    return Image is not None
+
+
+def leer_subida(archivo):
+    """Lee un archivo subido y valida su cabecera sin decodificarlo
+
+    Retorna (datos, formato). Lanza ImagenInvalida si es muy grande o no es imagen.
+    """
+    if Image is None:
+        raise ImagenInvalida("el servidor no tiene soporte de imágenes (falta Pillow)")
+    datos = archivo.read(MAX_BYTES + 1)
+    if len(datos) > MAX_BYTES:
+        raise ImagenInvalida(f"la imagen supera los {MAX_BYTES // (1024 * 1024)} MB")
+    try:
+        with Image.open(io.BytesIO(datos)) as img:
+            formato = img.format
+            ancho, alto = img.size
+    except (OSError, Image.DecompressionBombError):
+        raise ImagenInvalida("el archivo no es una imagen válida")
+    if formato not in FORMATOS_ENTRADA:
+        raise ImagenInvalida(f"formato no soportado: {formato}")
+    if ancho * alto > MAX_PIXELES:
+        raise ImagenInvalida("la imagen tiene demasiados píxeles")
+    return datos, formato
+
+
+def nombre_base(datos, tipo):
+    """Ruta relativa a static/ (sin tamaño ni extensión) que corresponde a estos bytes"""
+    return f"imagenes/{tipo}/{hashlib.sha256(datos).hexdigest()[:32]}"
+
+
+def _guardar(img, ruta, formato, **opciones):
+    """Escribe en un temporal y renombra, para no servir nunca un archivo a medias"""
+    # Nombre único por escritura: dos hilos pueden estar guardando la misma imagen
+    temporal = f"{ruta}.{uuid.uuid4().hex}.tmp"
+    try:
+        img.save(temporal, formato, **opciones)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def procesar(datos, tipo):
+    """Genera todas las variantes de la imagen y retorna la ruta del JPEG más grande"""
+    tamaños = sorted(TAMAÑOS[tipo], reverse=True)
+    base = nombre_base(datos, tipo)
+    principal = f"{base}_{tamaños[0]}.jpg"
+    destino = os.path.join(STATIC_DIR, *base.split('/'))
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+
+    # Misma imagen ya procesada: no hay nada que hacer
+    if all(os.path.exists(f"{destino}_{lado}.{ext}") for lado in tamaños for ext in ('jpg', 'webp')):
+        return principal
+
+    with Image.open(io.BytesIO(datos)) as original:
+        # En JPEG el decodificador puede reducir la escala mientras lee
+        original.draft('RGB', (tamaños[0], tamaños[0]))
+        img = ImageOps.exif_transpose(original)
+        img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+
+    for lado in tamaños:
+        # Se reduce desde la variante anterior, que ya es más chica que el original
+        img.thumbnail((lado, lado), Image.LANCZOS)
+        _guardar(img, f"{destino}_{lado}.webp", 'WEBP', quality=CALIDAD_WEBP, method=4)
+        rgb = img
+        if img.mode == 'RGBA':
+            rgb = Image.new('RGB', img.size, (255, 255, 255))
+            rgb.paste(img, mask=img.getchannel('A'))
+        _guardar(rgb, f"{destino}_{lado}.jpg", 'JPEG', quality=CALIDAD_JPEG, optimize=True, progressive=True)
+
+    return principal
+
+
+def procesar_en_segundo_plano(datos, tipo, al_terminar=None):
+    """Encola procesar(); `al_terminar(ruta)` se llama en el hilo del pool si todo sale bien"""
+    def tarea():
+        try:
+            ruta = procesar(datos, tipo)
+        except Exception as e:
+            print(f"❌ Error procesando imagen: {e}")
+            return None
+        if al_terminar:
+            al_terminar(ruta)
+        return ruta
+
+    return _pool.submit(tarea)
+
+
+def variantes(ruta):
+    """Para una ruta generada aquí retorna {'webp': [(ruta, lado)], 'jpg': [...]}; None si es una imagen antigua"""
+    match = _NOMBRE_RE.match(ruta or '')
+    if not match:
+        return None
+    base = match.group(1)
+    tipo = base.split('/')[1]
+    lados = sorted(TAMAÑOS.get(tipo, (int(match.group(2)),)))
+    return {ext: [(f"{base}_{lado}.{ext}", lado) for lado in lados] for ext in ('webp', 'jpg')}
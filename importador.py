@@ -0,0 +1,246 @@
+"""
+Importación masiva de productos para vendedores
+
+Lee catálogos CSV, JSON (arreglo de objetos) o NDJSON fila por fila, valida cada
+producto y los guarda en lotes con un INSERT de varias filas por transacción.
+Si la fila trae `sku`, un producto existente del mismo vendedor con ese sku se
+actualiza en vez de duplicarse. La memoria usada no depende del tamaño del archivo.
+
+Uso desde la terminal:
+    flask --app app importar-productos VENDEDOR_ID catalogo.csv
+"""
+import csv
+import io
+import itertools
+import json
+import os
+from decimal import Decimal, InvalidOperation
+
+from conexion import db, ErrorBD
+from busqueda import indice
+
+TAMAÑO_LOTE = 500
+MAX_ERRORES = 100     # errores que se guardan para el reporte; el resto solo se cuentan
+MAX_OBJETO = 1024 * 1024  # tamaño máximo de un producto en JSON
+ESTADOS = {'BORRADOR', 'PUBLICADO', 'PAUSADO'}
+
+UPSERT_PRODUCTOS = """
+    INSERT INTO productos (id_vendedor, sku, nombre, descripcion, categoria, precio, stock, estado)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        nombre = VALUES(nombre),
+        descripcion = VALUES(descripcion),
+        categoria = VALUES(categoria),
+        precio = VALUES(precio),
+        stock = VALUES(stock),
+        estado = VALUES(estado)
+"""
+
+
+class FilaInvalida(ValueError):
+    """Una fila del archivo no cumple el formato esperado"""
+
+    def __init__(self, numero, motivo):
+        super().__init__(f"Fila {numero}: {motivo}")
+        self.numero = numero
+        self.motivo = motivo
+
+
+# ---------- Lectura ----------
+
+def _texto(archivo):
+    """Envuelve un archivo binario (p. ej. una subida de Flask) como texto UTF-8"""
+    if isinstance(archivo, io.TextIOBase):
+        return archivo
+    return io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+
+
+def leer_csv(archivo):
+    """Entrega cada fila del CSV como dict; detecta si el separador es ',' o ';'"""
+    texto = _texto(archivo)
+    muestra = texto.readline()
+    separador = ';' if muestra.count(';') > muestra.count(',') else ','
+    lector = csv.DictReader(itertools.chain([muestra], texto), delimiter=separador)
+    for fila in lector:
+        yield {(clave or '').strip().lower(): valor for clave, valor in fila.items()}
+
+
+def leer_ndjson(archivo):
+    """Entrega un objeto por cada línea no vacía"""
+    for numero, linea in enumerate(_texto(archivo), start=1):
+        if linea.strip():
+            try:
+                yield json.loads(linea)
+            except ValueError as e:
+                raise FilaInvalida(numero, f"JSON inválido ({e})")
+
+
+def leer_json(archivo, tamaño_bloque=64 * 1024):
+    """Entrega los objetos de un arreglo JSON de a uno, sin cargar el archivo completo"""
+    texto = _texto(archivo)
+    decoder = json.JSONDecoder()
+    buffer = ''
+    inicio_visto = False
+    fin = False
+    numero = 0
+
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,')
+        if not inicio_visto and buffer:
+            if buffer[0] != '[':
+                raise FilaInvalida(0, "se esperaba un arreglo JSON")
+            inicio_visto = True
+            buffer = buffer[1:].lstrip(' \t\r\n,')
+        if buffer.startswith(']'):
+            return
+
+        if buffer:
+            try:
+                objeto, usado = decoder.raw_decode(buffer)
+            except ValueError:
+                objeto = None
+            else:
+                # Un número o literal al final del bloque podría seguir en el próximo
+                if usado < len(buffer) or fin:
+                    numero += 1
+                    buffer = buffer[usado:]
+                    yield objeto
+                    continue
+
+        if fin or len(buffer) > MAX_OBJETO:
+            if buffer:
+                raise FilaInvalida(numero + 1, "JSON incompleto o inválido")
+            return
+        bloque = texto.read(tamaño_bloque)
+        if not bloque:
+            fin = True
+        buffer += bloque
+
+
+LECTORES = {'csv': leer_csv, 'json': leer_json, 'ndjson': leer_ndjson, 'jsonl': leer_ndjson}
+
+
+def leer(archivo, formato):
+    """Elige el lector según el formato: csv, json o ndjson"""
+    if formato not in LECTORES:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return LECTORES[formato](archivo)
+
+
+def formato_de(nombre_archivo):
+    """Deduce el formato a partir de la extensión del archivo"""
+    return os.path.splitext(nombre_archivo or '')[1].lstrip('.').lower()
+
+
+# ---------- Validación ----------
+
+def _decimal(valor):
+    texto = str(valor).strip().replace('$', '').replace(' ', '')
+    if ',' in texto and '.' not in texto:
+        texto = texto.replace(',', '.')
+    return Decimal(texto)
+
+
+def validar(fila, numero):
+    """Normaliza una fila y retorna la tupla lista para UPSERT_PRODUCTOS (sin id_vendedor)"""
+    if not isinstance(fila, dict):
+        raise FilaInvalida(numero, "se esperaba un objeto con los datos del producto")
+
+    nombre = (fila.get('nombre') or '').strip()
+    if not nombre:
+        raise FilaInvalida(numero, "falta el nombre")
+    if len(nombre) > 150:
+        raise FilaInvalida(numero, "el nombre supera los 150 caracteres")
+
+    categoria = (fila.get('categoria') or '').strip() or None
+    if categoria and len(categoria) > 50:
+        raise FilaInvalida(numero, "la categoría supera los 50 caracteres")
+
+    sku = str(fila.get('sku') or '').strip() or None
+    if sku and len(sku) > 64:
+        raise FilaInvalida(numero, "el sku supera los 64 caracteres")
+
+    try:
+        precio = _decimal(fila.get('precio', ''))
+        if not precio.is_finite():
+            raise ValueError(precio)
+    except (InvalidOperation, ValueError):
+        raise FilaInvalida(numero, f"precio inválido: {fila.get('precio')!r}")
+    if precio < 0:
+        raise FilaInvalida(numero, "el precio no puede ser negativo")
+
+    try:
+        stock = int(str(fila.get('stock') or 0).strip())
+    except ValueError:
+        raise FilaInvalida(numero, f"stock inválido: {fila.get('stock')!r}")
+    if stock < 0:
+        raise FilaInvalida(numero, "el stock no puede ser negativo")
+
+    estado = (fila.get('estado') or 'PUBLICADO').strip().upper()
+    if estado not in ESTADOS:
+        raise FilaInvalida(numero, f"estado inválido: {estado}")
+
+    descripcion = (fila.get('descripcion') or '').strip() or None
+    return (sku, nombre, descripcion, categoria, precio, stock, estado)
+
+
+# ---------- Importación ----------
+
+def importar_por_lotes(vendedor_id, filas, tamaño_lote=TAMAÑO_LOTE):
+    """Valida y guarda los productos de `filas` en lotes transaccionales
+
+    Es un generador: entrega el resumen acumulado después de cada lote y una
+    última vez al terminar, con 'fin': True. Las filas inválidas se saltan y
+    quedan en el reporte; si un lote falla en la base de datos se deshace solo
+    ese lote.
+    """
+    resumen = {'procesadas': 0, 'guardadas': 0, 'invalidas': 0, 'errores': [], 'fin': False}
+
+    def error(mensaje):
+        if len(resumen['errores']) < MAX_ERRORES:
+            resumen['errores'].append(mensaje)
+
+    def guardar(lote):
+        try:
+            with db.transaction():
+                db.execute_many(UPSERT_PRODUCTOS, lote, batch_size=tamaño_lote)
+            resumen['guardadas'] += len(lote)
+        except ErrorBD as e:
+            resumen['invalidas'] += len(lote)
+            error(f"Lote hasta la fila {resumen['procesadas']}: {e}")
+
+    lote = []
+    numero = 0
+    try:
+        for numero, fila in enumerate(filas, start=1):
+            resumen['procesadas'] = numero
+            try:
+                lote.append((vendedor_id,) + validar(fila, numero))
+            except FilaInvalida as e:
+                resumen['invalidas'] += 1
+                error(str(e))
+                continue
+            if len(lote) >= tamaño_lote:
+                guardar(lote)
+                lote = []
+                yield resumen
+    except (FilaInvalida, csv.Error, UnicodeDecodeError) as e:
+        # El archivo se cortó o está mal formado: se guarda lo leído hasta ahí
+        error(str(e) if isinstance(e, FilaInvalida) else f"Fila {numero + 1}: {e}")
+
+    if lote:
+        guardar(lote)
+
+    if resumen['guardadas']:
+        # Muchos productos nuevos: se reconstruye el índice en la próxima búsqueda
+        indice.marcar_vencido()
+    resumen['fin'] = True
+    yield resumen
+
+
+def importar(vendedor_id, filas, tamaño_lote=TAMAÑO_LOTE, progreso=None):
+    """Importa todas las filas y retorna el resumen final; `progreso(resumen)` se llama por lote"""
+    for resumen in importar_por_lotes(vendedor_id, filas, tamaño_lote):
+        if progreso:
+            progreso(resumen)
+    return resumen
@@ -0,0 +1,71 @@
+-- Esquema base de MercadoVecino.
+-- Usa IF NOT EXISTS para que se pueda aplicar sobre bases creadas a mano.
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id_usuario INT AUTO_INCREMENT PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    apellido VARCHAR(100),
+    correo VARCHAR(150) NOT NULL,
+    telefono VARCHAR(30),
+    password_hash VARCHAR(255) NOT NULL,
+    rol ENUM('COMPRADOR', 'VENDEDOR') NOT NULL DEFAULT 'COMPRADOR',
+    direccion VARCHAR(255),
+    foto VARCHAR(255),
+    nombre_local VARCHAR(150),
+    descripcion_local TEXT,
+    fecha_registro DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS productos (
+    id_producto INT AUTO_INCREMENT PRIMARY KEY,
+    id_vendedor INT NOT NULL,
+    nombre VARCHAR(150) NOT NULL,
+    descripcion TEXT,
+    categoria VARCHAR(50),
+    precio DECIMAL(10,2) NOT NULL DEFAULT 0,
+    stock INT NOT NULL DEFAULT 0,
+    estado ENUM('BORRADOR', 'PUBLICADO', 'PAUSADO') NOT NULL DEFAULT 'PUBLICADO',
+    fecha_registro DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_productos_vendedor FOREIGN KEY (id_vendedor) REFERENCES usuarios (id_usuario)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS resenas (
+    id_resena INT AUTO_INCREMENT PRIMARY KEY,
+    id_producto INT NOT NULL,
+    id_comprador INT NOT NULL,
+    calificacion TINYINT NOT NULL,
+    comentario TEXT,
+    fecha_creacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_resenas_producto FOREIGN KEY (id_producto) REFERENCES productos (id_producto),
+    CONSTRAINT fk_resenas_comprador FOREIGN KEY (id_comprador) REFERENCES usuarios (id_usuario)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS pedidos (
+    id_pedido INT AUTO_INCREMENT PRIMARY KEY,
+    id_comprador INT NOT NULL,
+    id_vendedor INT NOT NULL,
+    total DECIMAL(12,2) NOT NULL DEFAULT 0,
+    estado VARCHAR(20) NOT NULL DEFAULT 'PENDIENTE',
+    fecha_creacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_pedidos_comprador FOREIGN KEY (id_comprador) REFERENCES usuarios (id_usuario),
+    CONSTRAINT fk_pedidos_vendedor FOREIGN KEY (id_vendedor) REFERENCES usuarios (id_usuario)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS pedido_items (
+    id_item INT AUTO_INCREMENT PRIMARY KEY,
+    id_pedido INT NOT NULL,
+    id_producto INT NOT NULL,
+    cantidad INT NOT NULL,
+    precio_unitario DECIMAL(10,2) NOT NULL,
+    CONSTRAINT fk_items_pedido FOREIGN KEY (id_pedido) REFERENCES pedidos (id_pedido),
+    CONSTRAINT fk_items_producto FOREIGN KEY (id_producto) REFERENCES productos (id_producto)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS favoritos (
+    id_usuario INT NOT NULL,
+    id_producto INT NOT NULL,
+    fecha_agregado DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_usuario, id_producto),
+    CONSTRAINT fk_favoritos_usuario FOREIGN KEY (id_usuario) REFERENCES usuarios (id_usuario),
+    CONSTRAINT fk_favoritos_producto FOREIGN KEY (id_producto) REFERENCES productos (id_producto)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
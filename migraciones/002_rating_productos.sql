@@ -0,0 +1,19 @@
+-- Resumen de calificaciones por producto, mantenido por Resena.crear_resena.
+-- Reconstruir desde cero con: flask --app app reconstruir-ratings
+
+ALTER TABLE productos
+    ADD COLUMN rating_suma INT NOT NULL DEFAULT 0,
+    ADD COLUMN total_resenas INT NOT NULL DEFAULT 0,
+    ADD COLUMN rating DECIMAL(3,2) NOT NULL DEFAULT 0,
+    ADD INDEX idx_productos_estado_rating (estado, rating, fecha_registro);
+
+-- Las reseñas anteriores a esta migración
+UPDATE productos p
+JOIN (
+    SELECT id_producto, SUM(calificacion) as suma, COUNT(*) as total
+    FROM resenas
+    GROUP BY id_producto
+) r ON r.id_producto = p.id_producto
+SET p.rating_suma = r.suma,
+    p.total_resenas = r.total,
+    p.rating = r.suma / r.total;
@@ -0,0 +1,21 @@
+-- Índices para las consultas de models.py.
+-- `flask --app app verificar-indices` comprueba con EXPLAIN que ninguna haga un escaneo completo.
+
+-- Login y verificación de correo al registrarse
+CREATE UNIQUE INDEX uq_usuarios_correo ON usuarios (correo);
+
+-- Catálogo paginado por id (/api/productos)
+CREATE INDEX idx_productos_estado_id ON productos (estado, id_producto);
+
+-- Productos de un vendedor, más recientes primero
+CREATE INDEX idx_productos_vendedor_fecha ON productos (id_vendedor, fecha_registro);
+
+-- Historial de pedidos de compradores y vendedores
+CREATE INDEX idx_pedidos_comprador_fecha ON pedidos (id_comprador, fecha_creacion);
+CREATE INDEX idx_pedidos_vendedor_fecha ON pedidos (id_vendedor, fecha_creacion);
+
+-- Favoritos de un usuario, más recientes primero
+CREATE INDEX idx_favoritos_usuario_fecha ON favoritos (id_usuario, fecha_agregado);
+
+-- Reseñas de un producto, más recientes primero
+CREATE INDEX idx_resenas_producto_fecha ON resenas (id_producto, fecha_creacion);
@@ -0,0 +1,6 @@
+-- Código propio del vendedor para cada producto, usado por el importador masivo
+-- para actualizar en vez de duplicar cuando se vuelve a subir el catálogo.
+
+ALTER TABLE productos
+    ADD COLUMN sku VARCHAR(64) NULL AFTER id_vendedor,
+    ADD UNIQUE INDEX uq_productos_vendedor_sku (id_vendedor, sku);
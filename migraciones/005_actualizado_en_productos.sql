@@ -0,0 +1,7 @@
+-- Marca de la última modificación de cada producto, con microsegundos.
+-- catalogo.py la usa (MAX + COUNT) como versión del catálogo para ETags y cachés de HTML.
+
+ALTER TABLE productos
+    ADD COLUMN actualizado_en TIMESTAMP(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_productos_actualizado (actualizado_en);
@@ -0,0 +1,58 @@
+-- Resúmenes de ventas y calificaciones por vendedor para el panel del vendedor.
+-- Pedido.crear_pedido_completo y Resena.crear_resena los actualizan en la misma
+-- transacción; el panel lee filas ya sumadas en vez de agregar pedidos y reseñas.
+-- Reconstruir desde cero con: flask --app app reconstruir-resumenes
+
+-- Pedidos, unidades e ingresos de cada vendedor por día
+CREATE TABLE IF NOT EXISTS ventas_vendedor_dia (
+    id_vendedor INT NOT NULL,
+    dia DATE NOT NULL,
+    pedidos INT NOT NULL DEFAULT 0,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_vendedor, dia),
+    CONSTRAINT fk_ventas_dia_vendedor FOREIGN KEY (id_vendedor) REFERENCES usuarios (id_usuario)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Unidades vendidas e ingresos acumulados por producto
+CREATE TABLE IF NOT EXISTS ventas_producto (
+    id_producto INT NOT NULL PRIMARY KEY,
+    id_vendedor INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14,2) NOT NULL DEFAULT 0,
+    INDEX idx_ventas_producto_vendedor (id_vendedor, unidades),
+    CONSTRAINT fk_ventas_producto_producto FOREIGN KEY (id_producto) REFERENCES productos (id_producto)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Reseñas y suma de calificaciones de los productos de cada vendedor por día
+CREATE TABLE IF NOT EXISTS calificaciones_vendedor_dia (
+    id_vendedor INT NOT NULL,
+    dia DATE NOT NULL,
+    resenas INT NOT NULL DEFAULT 0,
+    suma INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_vendedor, dia),
+    CONSTRAINT fk_calificaciones_dia_vendedor FOREIGN KEY (id_vendedor) REFERENCES usuarios (id_usuario)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Alertas de stock bajo: productos de un vendedor con menos unidades
+CREATE INDEX idx_productos_vendedor_stock ON productos (id_vendedor, stock);
+
+-- Los pedidos anteriores a esta migración
+INSERT INTO ventas_vendedor_dia (id_vendedor, dia, pedidos, unidades, ingresos)
+SELECT p.id_vendedor, DATE(p.fecha_creacion), COUNT(*), COALESCE(SUM(i.unidades), 0), SUM(p.total)
+FROM pedidos p
+LEFT JOIN (SELECT id_pedido, SUM(cantidad) as unidades FROM pedido_items GROUP BY id_pedido) i
+    ON i.id_pedido = p.id_pedido
+GROUP BY p.id_vendedor, DATE(p.fecha_creacion);
+
+INSERT INTO ventas_producto (id_producto, id_vendedor, unidades, ingresos)
+SELECT i.id_producto, MAX(p.id_vendedor), SUM(i.cantidad), SUM(i.cantidad * i.precio_unitario)
+FROM pedido_items i
+JOIN pedidos p ON p.id_pedido = i.id_pedido
+GROUP BY i.id_producto;
+
+INSERT INTO calificaciones_vendedor_dia (id_vendedor, dia, resenas, suma)
+SELECT p.id_vendedor, DATE(r.fecha_creacion), COUNT(*), SUM(r.calificacion)
+FROM resenas r
+JOIN productos p ON p.id_producto = r.id_producto
+GROUP BY p.id_vendedor, DATE(r.fecha_creacion);
@@ -0,0 +1,62 @@
+-- Esquema base de MercadoVecino para SQLite (DB_BACKEND=sqlite).
+-- Mismas tablas y columnas que ../001_esquema_inicial.sql; los ENUM son CHECK.
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id_usuario INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(100) NOT NULL,
+    apellido VARCHAR(100),
+    correo VARCHAR(150) NOT NULL,
+    telefono VARCHAR(30),
+    password_hash VARCHAR(255) NOT NULL,
+    rol VARCHAR(20) NOT NULL DEFAULT 'COMPRADOR' CHECK (rol IN ('COMPRADOR', 'VENDEDOR')),
+    direccion VARCHAR(255),
+    foto VARCHAR(255),
+    nombre_local VARCHAR(150),
+    descripcion_local TEXT,
+    fecha_registro DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS productos (
+    id_producto INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_vendedor INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    nombre VARCHAR(150) NOT NULL,
+    descripcion TEXT,
+    categoria VARCHAR(50),
+    precio DECIMAL(10,2) NOT NULL DEFAULT 0,
+    stock INTEGER NOT NULL DEFAULT 0,
+    estado VARCHAR(20) NOT NULL DEFAULT 'PUBLICADO' CHECK (estado IN ('BORRADOR', 'PUBLICADO', 'PAUSADO')),
+    fecha_registro DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS resenas (
+    id_resena INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_producto INTEGER NOT NULL REFERENCES productos (id_producto),
+    id_comprador INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    calificacion TINYINT NOT NULL,
+    comentario TEXT,
+    fecha_creacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS pedidos (
+    id_pedido INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_comprador INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    id_vendedor INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    total DECIMAL(12,2) NOT NULL DEFAULT 0,
+    estado VARCHAR(20) NOT NULL DEFAULT 'PENDIENTE',
+    fecha_creacion DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS pedido_items (
+    id_item INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_pedido INTEGER NOT NULL REFERENCES pedidos (id_pedido),
+    id_producto INTEGER NOT NULL REFERENCES productos (id_producto),
+    cantidad INTEGER NOT NULL,
+    precio_unitario DECIMAL(10,2) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS favoritos (
+    id_usuario INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    id_producto INTEGER NOT NULL REFERENCES productos (id_producto),
+    fecha_agregado DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_usuario, id_producto)
+) WITHOUT ROWID;
@@ -0,0 +1,13 @@
+-- Resumen de calificaciones por producto (ver ../002_rating_productos.sql).
+
+ALTER TABLE productos ADD COLUMN rating_suma INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE productos ADD COLUMN total_resenas INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE productos ADD COLUMN rating DECIMAL(3,2) NOT NULL DEFAULT 0;
+CREATE INDEX idx_productos_estado_rating ON productos (estado, rating, fecha_registro);
+
+-- Las reseñas anteriores a esta migración (SQLite no tiene UPDATE ... JOIN)
+UPDATE productos
+SET rating_suma = (SELECT SUM(calificacion) FROM resenas r WHERE r.id_producto = productos.id_producto),
+    total_resenas = (SELECT COUNT(*) FROM resenas r WHERE r.id_producto = productos.id_producto),
+    rating = (SELECT AVG(calificacion) FROM resenas r WHERE r.id_producto = productos.id_producto)
+WHERE id_producto IN (SELECT id_producto FROM resenas);
@@ -0,0 +1,9 @@
+-- Índices para las consultas de models.py (ver ../003_indices_consultas.sql).
+
+CREATE UNIQUE INDEX uq_usuarios_correo ON usuarios (correo);
+CREATE INDEX idx_productos_estado_id ON productos (estado, id_producto);
+CREATE INDEX idx_productos_vendedor_fecha ON productos (id_vendedor, fecha_registro);
+CREATE INDEX idx_pedidos_comprador_fecha ON pedidos (id_comprador, fecha_creacion);
+CREATE INDEX idx_pedidos_vendedor_fecha ON pedidos (id_vendedor, fecha_creacion);
+CREATE INDEX idx_favoritos_usuario_fecha ON favoritos (id_usuario, fecha_agregado);
+CREATE INDEX idx_resenas_producto_fecha ON resenas (id_producto, fecha_creacion);
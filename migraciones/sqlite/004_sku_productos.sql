@@ -0,0 +1,4 @@
+-- Código propio del vendedor para cada producto (ver ../004_sku_productos.sql).
+
+ALTER TABLE productos ADD COLUMN sku VARCHAR(64) NULL;
+CREATE UNIQUE INDEX uq_productos_vendedor_sku ON productos (id_vendedor, sku);
@@ -0,0 +1,19 @@
+-- Marca de la última modificación de cada producto (ver ../005_actualizado_en_productos.sql).
+-- SQLite no tiene ON UPDATE CURRENT_TIMESTAMP: lo hace un trigger.
+
+ALTER TABLE productos ADD COLUMN actualizado_en TIMESTAMP NOT NULL DEFAULT '1970-01-01 00:00:00';
+UPDATE productos SET actualizado_en = strftime('%Y-%m-%d %H:%M:%f', 'now');
+CREATE INDEX idx_productos_actualizado ON productos (actualizado_en);
+
+CREATE TRIGGER trg_productos_insertado AFTER INSERT ON productos
+BEGIN
+    UPDATE productos SET actualizado_en = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE id_producto = NEW.id_producto;
+END;
+
+CREATE TRIGGER trg_productos_actualizado AFTER UPDATE ON productos
+WHEN NEW.actualizado_en = OLD.actualizado_en
+BEGIN
+    UPDATE productos SET actualizado_en = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE id_producto = NEW.id_producto;
+END;
@@ -0,0 +1,47 @@
+-- Resúmenes de ventas y calificaciones por vendedor (ver ../006_resumenes_vendedor.sql).
+
+CREATE TABLE IF NOT EXISTS ventas_vendedor_dia (
+    id_vendedor INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    dia DATE NOT NULL,
+    pedidos INTEGER NOT NULL DEFAULT 0,
+    unidades INTEGER NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_vendedor, dia)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ventas_producto (
+    id_producto INTEGER NOT NULL PRIMARY KEY REFERENCES productos (id_producto),
+    id_vendedor INTEGER NOT NULL,
+    unidades INTEGER NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14,2) NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_ventas_producto_vendedor ON ventas_producto (id_vendedor, unidades);
+
+CREATE TABLE IF NOT EXISTS calificaciones_vendedor_dia (
+    id_vendedor INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    dia DATE NOT NULL,
+    resenas INTEGER NOT NULL DEFAULT 0,
+    suma INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_vendedor, dia)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_productos_vendedor_stock ON productos (id_vendedor, stock);
+
+INSERT INTO ventas_vendedor_dia (id_vendedor, dia, pedidos, unidades, ingresos)
+SELECT p.id_vendedor, DATE(p.fecha_creacion), COUNT(*), COALESCE(SUM(i.unidades), 0), SUM(p.total)
+FROM pedidos p
+LEFT JOIN (SELECT id_pedido, SUM(cantidad) as unidades FROM pedido_items GROUP BY id_pedido) i
+    ON i.id_pedido = p.id_pedido
+GROUP BY p.id_vendedor, DATE(p.fecha_creacion);
+
+INSERT INTO ventas_producto (id_producto, id_vendedor, unidades, ingresos)
+SELECT i.id_producto, MAX(p.id_vendedor), SUM(i.cantidad), SUM(i.cantidad * i.precio_unitario)
+FROM pedido_items i
+JOIN pedidos p ON p.id_pedido = i.id_pedido
+GROUP BY i.id_producto;
+
+INSERT INTO calificaciones_vendedor_dia (id_vendedor, dia, resenas, suma)
+SELECT p.id_vendedor, DATE(r.fecha_creacion), COUNT(*), SUM(r.calificacion)
+FROM resenas r
+JOIN productos p ON p.id_producto = r.id_producto
+GROUP BY p.id_vendedor, DATE(r.fecha_creacion);
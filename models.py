@@ -1,6 +1,21 @@
-from conexion import db
+from conexion import db, ErrorBD
+from busqueda import indice
+import identidad
+from favoritos import cache_favoritos
 from datetime import datetime
 
+
+class StockInsuficiente(Exception):
+    """El pedido pide más unidades de las disponibles o un producto no está a la venta"""
+    
+    def __init__(self, producto_id, disponible, pedido):
+        super().__init__(f"Stock insuficiente para el producto {producto_id}: "
+                         f"disponible {disponible}, pedido {pedido}")
+        self.producto_id = producto_id
+        self.disponible = disponible
+        self.pedido = pedido
+
+
 class Usuario:
     @staticmethod
     def crear_usuario(nombre, apellido, correo, telefono, password_hash, rol='COMPRADOR', direccion=None):
@@ -11,16 +26,24 @@ class Usuario:
         """, (nombre, apellido, correo, telefono, password_hash, rol, direccion))
     
     @staticmethod
-    def buscar_por_correo(correo):
-        """Busca un usuario por su correo electrónico"""
-        usuarios = db.execute_query("SELECT * FROM usuarios WHERE correo = %s", (correo,))
-        return usuarios[0] if usuarios else None
+    def buscar_por_correo(correo, fresco=False):
+        """Busca un usuario por su correo electrónico (a lo sumo una lectura por petición)
+
+        Con fresco=True se lee siempre de la base de datos; el login lo usa para no
+        verificar la contraseña contra un hash cacheado.
+        """
+        def cargar(correo):
+            usuarios = db.execute_query("SELECT * FROM usuarios WHERE correo = %s", (correo,))
+            return usuarios[0] if usuarios else None
+        return identidad.por_correo(correo, cargar, fresco)
     
     @staticmethod
     def buscar_por_id(user_id):
-        """Busca un usuario por su ID"""
-        usuarios = db.execute_query("SELECT * FROM usuarios WHERE id_usuario = %s", (user_id,))
-        return usuarios[0] if usuarios else None
+        """Busca un usuario por su ID (a lo sumo una lectura por petición)"""
+        def cargar(user_id):
+            usuarios = db.execute_query("SELECT * FROM usuarios WHERE id_usuario = %s", (user_id,))
+            return usuarios[0] if usuarios else None
+        return identidad.por_id(user_id, cargar)
     
     @staticmethod
     def actualizar_usuario(user_id, datos):
@@ -36,7 +59,9 @@ class Usuario:
         if campos:
             valores.append(user_id)
             query = f"UPDATE usuarios SET {', '.join(campos)} WHERE id_usuario = %s"
-            return db.execute_update(query, valores)
+            filas = db.execute_update(query, valores)
+            identidad.invalidar(user_id)
+            return filas
         return 0
 
 class Producto:
@@ -44,12 +69,9 @@ class Producto:
     def obtener_productos(categoria=None, busqueda=None, limit=None):
         """Obtiene productos con filtros opcionales"""
         query = """
-            SELECT p.*, u.nombre as vendedor_nombre, u.telefono as vendedor_telefono,
-                   COALESCE(AVG(r.calificacion), 0) as rating,
-                   COUNT(r.id_resena) as total_resenas
+            SELECT p.*, u.nombre as vendedor_nombre, u.telefono as vendedor_telefono
             FROM productos p 
             JOIN usuarios u ON p.id_vendedor = u.id_usuario
-            LEFT JOIN resenas r ON p.id_producto = r.id_producto
             WHERE p.estado = 'PUBLICADO' AND p.stock > 0
         """
         params = []
@@ -59,69 +81,221 @@ class Producto:
             params.append(categoria)
         
         if busqueda:
-            query += " AND (p.nombre LIKE %s OR p.descripcion LIKE %s)"
-            params.extend([f"%{busqueda}%", f"%{busqueda}%"])
+            # El índice de búsqueda decide qué productos coinciden y en qué orden
+            ids = indice.buscar_ids(busqueda)
+            if not ids:
+                return []
+            query += f" AND p.id_producto IN ({', '.join(['%s'] * len(ids))})"
+            params.extend(ids)
+            
+            orden = {producto_id: i for i, producto_id in enumerate(ids)}
+            productos = db.execute_query(query, params, cache=True)
+            productos.sort(key=lambda producto: orden[producto['id_producto']])
+            return productos[:limit] if limit else productos
         
-        query += " GROUP BY p.id_producto ORDER BY rating DESC, p.fecha_registro DESC"
+        query += " ORDER BY p.rating DESC, p.fecha_registro DESC"
         
         if limit:
             query += f" LIMIT {limit}"
         
-        return db.execute_query(query, params)
+        return db.execute_query(query, params, cache=True)
     
     @staticmethod
     def obtener_producto_por_id(producto_id):
         """Obtiene un producto específico por su ID"""
         productos = db.execute_query("""
             SELECT p.*, u.nombre as vendedor_nombre, u.telefono as vendedor_telefono,
-                   u.direccion as vendedor_direccion,
-                   COALESCE(AVG(r.calificacion), 0) as rating,
-                   COUNT(r.id_resena) as total_resenas
+                   u.direccion as vendedor_direccion
             FROM productos p 
             JOIN usuarios u ON p.id_vendedor = u.id_usuario
-            LEFT JOIN resenas r ON p.id_producto = r.id_producto
             WHERE p.id_producto = %s
-            GROUP BY p.id_producto
         """, (producto_id,))
         return productos[0] if productos else None
     
+    @staticmethod
+    def obtener_por_ids(producto_ids):
+        """Nombre, precio, stock y estado de varios productos en una sola consulta; retorna {id: fila}"""
+        if not producto_ids:
+            return {}
+        marcadores = ', '.join(['%s'] * len(producto_ids))
+        productos = db.execute_query(f"""
+            SELECT p.id_producto, p.nombre, p.precio, p.stock, p.estado,
+                   u.nombre as vendedor_nombre
+            FROM productos p
+            JOIN usuarios u ON p.id_vendedor = u.id_usuario
+            WHERE p.id_producto IN ({marcadores})
+        """, list(producto_ids))
+        return {producto['id_producto']: producto for producto in productos}
+    
     @staticmethod
     def crear_producto(vendedor_id, nombre, descripcion, categoria, precio, stock):
         """Crea un nuevo producto"""
-        return db.execute_insert("""
+        producto_id = db.execute_insert("""
             INSERT INTO productos (id_vendedor, nombre, descripcion, categoria, precio, stock)
             VALUES (%s, %s, %s, %s, %s, %s)
         """, (vendedor_id, nombre, descripcion, categoria, precio, stock))
+        
+        if producto_id:
+            # El estado lo asigna la base de datos; se relee para indexar lo guardado
+            Producto._reindexar(producto_id)
+        return producto_id
+    
+    @staticmethod
+    def actualizar_producto(producto_id, datos):
+        """Actualiza los datos de un producto"""
+        campos = []
+        valores = []
+        
+        for campo, valor in datos.items():
+            if valor is not None:
+                campos.append(f"{campo} = %s")
+                valores.append(valor)
+        
+        if campos:
+            valores.append(producto_id)
+            query = f"UPDATE productos SET {', '.join(campos)} WHERE id_producto = %s"
+            filas = db.execute_update(query, valores)
+            Producto._reindexar(producto_id)
+            return filas
+        return 0
+    
+    @staticmethod
+    def _reindexar(producto_id):
+        """Actualiza un producto en el índice de búsqueda"""
+        productos = db.execute_query("""
+            SELECT id_producto, nombre, descripcion, categoria, precio, estado
+            FROM productos WHERE id_producto = %s
+        """, (producto_id,))
+        if productos:
+            indice.indexar(productos[0])
+        else:
+            indice.eliminar(producto_id)
     
     @staticmethod
     def obtener_productos_vendedor(vendedor_id):
         """Obtiene todos los productos de un vendedor específico"""
         return db.execute_query("""
-            SELECT p.*, COALESCE(AVG(r.calificacion), 0) as rating,
-                   COUNT(r.id_resena) as total_resenas
+            SELECT p.*
             FROM productos p 
-            LEFT JOIN resenas r ON p.id_producto = r.id_producto
             WHERE p.id_vendedor = %s
-            GROUP BY p.id_producto
             ORDER BY p.fecha_registro DESC
         """, (vendedor_id,))
 
 class Pedido:
     @staticmethod
     def crear_pedido(comprador_id, vendedor_id, total):
-        """Crea un nuevo pedido"""
+        """Crea un nuevo pedido y lo suma al resumen de ventas del vendedor"""
+        try:
+            with db.transaction():
+                pedido_id = Pedido._insertar(comprador_id, vendedor_id, total)
+                ResumenVendedor._sumar_ventas([(vendedor_id, 1, 0, total)], [])
+        except ErrorBD as e:
+            print(f"❌ Error al crear pedido: {e}")
+            return None
+        return pedido_id
+    
+    @staticmethod
+    def agregar_item_pedido(pedido_id, producto_id, cantidad, precio_unitario):
+        """Agrega un item al pedido y suma sus unidades a los resúmenes de ventas"""
+        try:
+            with db.transaction():
+                item_id = db.execute_insert("""
+                    INSERT INTO pedido_items (id_pedido, id_producto, cantidad, precio_unitario)
+                    VALUES (%s, %s, %s, %s)
+                """, (pedido_id, producto_id, cantidad, precio_unitario))
+                vendedor_id = db.execute_query("""
+                    SELECT id_vendedor FROM pedidos WHERE id_pedido = %s
+                """, (pedido_id,))[0]['id_vendedor']
+                # Los ingresos del vendedor ya se sumaron con el total del pedido
+                ResumenVendedor._sumar_ventas(
+                    [(vendedor_id, 0, cantidad, 0)],
+                    [(producto_id, vendedor_id, cantidad, cantidad * precio_unitario)])
+        except ErrorBD as e:
+            print(f"❌ Error al agregar item al pedido: {e}")
+            return None
+        return item_id
+    
+    @staticmethod
+    def _insertar(comprador_id, vendedor_id, total):
+        """INSERT del pedido sin tocar los resúmenes; se llama dentro de una transacción"""
         return db.execute_insert("""
             INSERT INTO pedidos (id_comprador, id_vendedor, total)
             VALUES (%s, %s, %s)
         """, (comprador_id, vendedor_id, total))
     
     @staticmethod
-    def agregar_item_pedido(pedido_id, producto_id, cantidad, precio_unitario):
-        """Agrega un item al pedido"""
-        return db.execute_insert("""
-            INSERT INTO pedido_items (id_pedido, id_producto, cantidad, precio_unitario)
-            VALUES (%s, %s, %s, %s)
-        """, (pedido_id, producto_id, cantidad, precio_unitario))
+    def crear_pedido_completo(comprador_id, items):
+        """Crea el pedido de un carrito completo en una sola transacción
+        
+        `items` es una lista de dicts con id_producto y cantidad. Se arma un pedido
+        por vendedor, los precios se toman de la base de datos y el stock se
+        descuenta con los productos bloqueados (SELECT ... FOR UPDATE), así dos
+        compradores no pueden vender la misma unidad. Retorna la lista de IDs de
+        pedido creados, o None si los items no son válidos o falla la base de datos.
+        Lanza StockInsuficiente si algún producto no alcanza.
+        """
+        cantidades = {}
+        try:
+            for item in items:
+                producto_id, cantidad = int(item['id_producto']), int(item['cantidad'])
+                cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"❌ Item de pedido inválido: {e!r}")
+            return None
+        if not cantidades or min(cantidades.values()) <= 0:
+            return None
+        
+        # Bloquear siempre en el mismo orden evita interbloqueos entre compras simultáneas
+        producto_ids = sorted(cantidades)
+        marcadores = ', '.join(['%s'] * len(producto_ids))
+        
+        try:
+            with db.transaction():
+                productos = {fila['id_producto']: fila for fila in db.execute_query(f"""
+                    SELECT id_producto, id_vendedor, precio, stock, estado
+                    FROM productos
+                    WHERE id_producto IN ({marcadores})
+                    ORDER BY id_producto
+                    FOR UPDATE
+                """, producto_ids)}
+                
+                for producto_id in producto_ids:
+                    producto = productos.get(producto_id)
+                    disponible = producto['stock'] if producto and producto['estado'] == 'PUBLICADO' else 0
+                    if disponible < cantidades[producto_id]:
+                        raise StockInsuficiente(producto_id, disponible, cantidades[producto_id])
+                
+                db.execute_many("""
+                    UPDATE productos SET stock = stock - %s WHERE id_producto = %s
+                """, [(cantidades[pid], pid) for pid in producto_ids])
+                
+                subtotales = {pid: productos[pid]['precio'] * cantidades[pid] for pid in producto_ids}
+                por_vendedor = {}
+                for producto_id in producto_ids:
+                    por_vendedor.setdefault(productos[producto_id]['id_vendedor'], []).append(producto_id)
+                # El total de cada pedido se calcula una vez: el mismo va a la cabecera y al resumen
+                totales = {vendedor_id: sum(subtotales[pid] for pid in ids)
+                           for vendedor_id, ids in por_vendedor.items()}
+                
+                pedido_ids = []
+                for vendedor_id, ids in por_vendedor.items():
+                    pedido_id = Pedido._insertar(comprador_id, vendedor_id, totales[vendedor_id])
+                    db.execute_many("""
+                        INSERT INTO pedido_items (id_pedido, id_producto, cantidad, precio_unitario)
+                        VALUES (%s, %s, %s, %s)
+                    """, [(pedido_id, pid, cantidades[pid], productos[pid]['precio']) for pid in ids])
+                    pedido_ids.append(pedido_id)
+                
+                ResumenVendedor._sumar_ventas(
+                    [(vendedor_id, 1, sum(cantidades[pid] for pid in ids), totales[vendedor_id])
+                     for vendedor_id, ids in sorted(por_vendedor.items())],
+                    [(pid, productos[pid]['id_vendedor'], cantidades[pid], subtotales[pid])
+                     for pid in producto_ids])
+        except ErrorBD as e:
+            print(f"❌ Error al crear pedido: {e}")
+            return None
+        
+        return pedido_ids
     
     @staticmethod
     def obtener_pedidos_comprador(comprador_id, limit=None):
@@ -157,51 +331,120 @@ class Favorito:
     @staticmethod
     def agregar_favorito(user_id, producto_id):
         """Agrega un producto a favoritos"""
-        return db.execute_insert("""
+        resultado = db.execute_insert("""
             INSERT IGNORE INTO favoritos (id_usuario, id_producto) 
             VALUES (%s, %s)
         """, (user_id, producto_id))
+        cache_favoritos.invalidar(user_id)
+        return resultado
     
     @staticmethod
     def quitar_favorito(user_id, producto_id):
         """Quita un producto de favoritos"""
-        return db.execute_update("""
+        filas = db.execute_update("""
             DELETE FROM favoritos 
             WHERE id_usuario = %s AND id_producto = %s
         """, (user_id, producto_id))
+        cache_favoritos.invalidar(user_id)
+        return filas
+    
+    @staticmethod
+    def alternar(user_id, producto_id):
+        """Agrega o quita un producto de favoritos; retorna si quedó como favorito"""
+        if Favorito.es_favorito(user_id, producto_id):
+            Favorito.quitar_favorito(user_id, producto_id)
+        else:
+            Favorito.agregar_favorito(user_id, producto_id)
+        # Se relee: el INSERT pudo fallar (p. ej. el producto no existe)
+        return Favorito.es_favorito(user_id, producto_id)
     
     @staticmethod
     def obtener_favoritos(user_id):
         """Obtiene los productos favoritos de un usuario"""
         return db.execute_query("""
-            SELECT p.*, f.fecha_agregado, u.nombre as vendedor_nombre,
-                   COALESCE(AVG(r.calificacion), 0) as rating
+            SELECT p.*, f.fecha_agregado, u.nombre as vendedor_nombre
             FROM favoritos f
             JOIN productos p ON f.id_producto = p.id_producto
             JOIN usuarios u ON p.id_vendedor = u.id_usuario
-            LEFT JOIN resenas r ON p.id_producto = r.id_producto
             WHERE f.id_usuario = %s
-            GROUP BY p.id_producto
             ORDER BY f.fecha_agregado DESC
         """, (user_id,))
     
+    @staticmethod
+    def ids_favoritos(user_id):
+        """frozenset con los IDs de los productos favoritos; sale de la caché si ya se leyó"""
+        ids = cache_favoritos.get(user_id)
+        if ids is None:
+            generacion = cache_favoritos.generacion()
+            ids = frozenset(fila['id_producto'] for fila in db.execute_query("""
+                SELECT id_producto FROM favoritos WHERE id_usuario = %s
+            """, (user_id,)))
+            cache_favoritos.set(user_id, ids, generacion)
+        return ids
+    
+    @staticmethod
+    def estados(user_id, producto_ids):
+        """{id_producto: True/False} para varios productos, con a lo sumo una consulta"""
+        ids = Favorito.ids_favoritos(user_id)
+        return {producto_id: producto_id in ids for producto_id in producto_ids}
+    
     @staticmethod
     def es_favorito(user_id, producto_id):
         """Verifica si un producto está en favoritos"""
-        resultado = db.execute_query("""
-            SELECT 1 FROM favoritos 
-            WHERE id_usuario = %s AND id_producto = %s
-        """, (user_id, producto_id))
-        return len(resultado) > 0
+        return producto_id in Favorito.ids_favoritos(user_id)
 
 class Resena:
     @staticmethod
     def crear_resena(producto_id, comprador_id, calificacion, comentario=None):
-        """Crea una nueva reseña"""
-        return db.execute_insert("""
-            INSERT INTO resenas (id_producto, id_comprador, calificacion, comentario)
-            VALUES (%s, %s, %s, %s)
-        """, (producto_id, comprador_id, calificacion, comentario))
+        """Crea una nueva reseña y actualiza el resumen de calificaciones del producto"""
+        try:
+            with db.transaction():
+                resena_id = db.execute_insert("""
+                    INSERT INTO resenas (id_producto, id_comprador, calificacion, comentario)
+                    VALUES (%s, %s, %s, %s)
+                """, (producto_id, comprador_id, calificacion, comentario))
+                
+                # rating va primero para que MySQL lo calcule con los valores anteriores;
+                # el * 1.0 evita la división entera de SQLite
+                db.execute_update("""
+                    UPDATE productos
+                    SET rating = (rating_suma + %s) * 1.0 / (total_resenas + 1),
+                        rating_suma = rating_suma + %s,
+                        total_resenas = total_resenas + 1
+                    WHERE id_producto = %s
+                """, (calificacion, calificacion, producto_id))
+                
+                ResumenVendedor._sumar_calificacion(producto_id, calificacion)
+        except ErrorBD as e:
+            print(f"❌ Error al crear reseña: {e}")
+            return None
+        return resena_id
+    
+    @staticmethod
+    def reconstruir_ratings():
+        """Recalcula el resumen de calificaciones de todos los productos desde resenas"""
+        if db.dialecto == 'sqlite':
+            # SQLite no tiene UPDATE ... JOIN: subconsultas por producto sobre el índice de resenas
+            return db.execute_update("""
+                UPDATE productos
+                SET rating_suma = COALESCE((SELECT SUM(calificacion) FROM resenas r
+                                            WHERE r.id_producto = productos.id_producto), 0),
+                    total_resenas = (SELECT COUNT(*) FROM resenas r
+                                     WHERE r.id_producto = productos.id_producto),
+                    rating = COALESCE((SELECT AVG(calificacion) FROM resenas r
+                                       WHERE r.id_producto = productos.id_producto), 0)
+            """)
+        return db.execute_update("""
+            UPDATE productos p
+            LEFT JOIN (
+                SELECT id_producto, SUM(calificacion) as suma, COUNT(*) as total
+                FROM resenas
+                GROUP BY id_producto
+            ) r ON r.id_producto = p.id_producto
+            SET p.rating_suma = COALESCE(r.suma, 0),
+                p.total_resenas = COALESCE(r.total, 0),
+                p.rating = COALESCE(r.suma / r.total, 0)
+        """)
     
     @staticmethod
     def obtener_resenas_producto(producto_id):
@@ -212,4 +455,153 @@ class Resena:
             JOIN usuarios u ON r.id_comprador = u.id_usuario
             WHERE r.id_producto = %s
             ORDER BY r.fecha_creacion DESC
-        """, (producto_id,))
\ No newline at end of file
+        """, (producto_id,))
+
+
+class ResumenVendedor:
+    """Panel del vendedor servido desde tablas de resumen (migración 006)
+    
+    Las tablas se actualizan en la misma transacción que crea el pedido o la
+    reseña; el panel solo lee filas ya sumadas, acotadas por días o por
+    productos, así su costo no crece con el historial de pedidos.
+    """
+    
+    STOCK_BAJO = 5  # unidades desde las que un producto publicado genera alerta
+    
+    @staticmethod
+    def _sumar_ventas(por_vendedor, por_producto):
+        """Suma un pedido a los resúmenes; se llama dentro de la transacción del pedido
+        
+        `por_vendedor` es [(id_vendedor, pedidos, unidades, ingresos)] ordenado por vendedor y
+        `por_producto` [(id_producto, id_vendedor, unidades, ingresos)] ordenado por
+        producto: el mismo orden en todas las compras evita interbloqueos.
+        """
+        db.execute_many("""
+            INSERT INTO ventas_vendedor_dia (id_vendedor, dia, pedidos, unidades, ingresos)
+            VALUES (%s, CURRENT_DATE, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE pedidos = pedidos + VALUES(pedidos),
+                                    unidades = unidades + VALUES(unidades),
+                                    ingresos = ingresos + VALUES(ingresos)
+        """, por_vendedor)
+        db.execute_many("""
+            INSERT INTO ventas_producto (id_producto, id_vendedor, unidades, ingresos)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE unidades = unidades + VALUES(unidades),
+                                    ingresos = ingresos + VALUES(ingresos)
+        """, por_producto)
+    
+    @staticmethod
+    def _sumar_calificacion(producto_id, calificacion):
+        """Suma una reseña al resumen del vendedor del producto"""
+        db.execute_update("""
+            INSERT INTO calificaciones_vendedor_dia (id_vendedor, dia, resenas, suma)
+            SELECT id_vendedor, CURRENT_DATE, 1, %s FROM productos WHERE id_producto = %s
+            ON DUPLICATE KEY UPDATE resenas = resenas + 1, suma = suma + %s
+        """, (calificacion, producto_id, calificacion))
+    
+    @staticmethod
+    def _desde(dias):
+        """(SQL, parámetro) del primer día de los últimos `dias`
+
+        Se calcula en la base de datos: las filas se escriben con su CURRENT_DATE
+        (UTC en SQLite, la zona de la sesión en MySQL), no con la fecha del proceso.
+        """
+        if db.dialecto == 'sqlite':
+            return "date('now', %s)", f"-{int(dias) - 1} days"
+        return "CURRENT_DATE - INTERVAL %s DAY", int(dias) - 1
+    
+    @staticmethod
+    def ventas_por_dia(vendedor_id, dias=30):
+        """Pedidos, unidades e ingresos de los últimos `dias` días, del más viejo al más nuevo"""
+        desde, parametro = ResumenVendedor._desde(dias)
+        return db.execute_query(f"""
+            SELECT dia, pedidos, unidades, ingresos
+            FROM ventas_vendedor_dia
+            WHERE id_vendedor = %s AND dia >= {desde}
+            ORDER BY dia
+        """, (vendedor_id, parametro))
+    
+    @staticmethod
+    def productos_mas_vendidos(vendedor_id, limit=10):
+        """Productos del vendedor con más unidades vendidas"""
+        return db.execute_query(f"""
+            SELECT v.id_producto, p.nombre, v.unidades, v.ingresos
+            FROM ventas_producto v
+            JOIN productos p ON p.id_producto = v.id_producto
+            WHERE v.id_vendedor = %s
+            ORDER BY v.unidades DESC
+            LIMIT {int(limit)}
+        """, (vendedor_id,))
+    
+    @staticmethod
+    def stock_bajo(vendedor_id, umbral=None, limit=20):
+        """Productos publicados del vendedor con `umbral` unidades o menos, los más escasos primero"""
+        return db.execute_query(f"""
+            SELECT id_producto, nombre, stock
+            FROM productos
+            WHERE id_vendedor = %s AND stock <= %s AND estado = 'PUBLICADO'
+            ORDER BY stock
+            LIMIT {int(limit)}
+        """, (vendedor_id, ResumenVendedor.STOCK_BAJO if umbral is None else umbral))
+    
+    @staticmethod
+    def tendencia_calificaciones(vendedor_id, dias=30):
+        """Reseñas y promedio por día de los últimos `dias` días"""
+        desde, parametro = ResumenVendedor._desde(dias)
+        filas = db.execute_query(f"""
+            SELECT dia, resenas, suma
+            FROM calificaciones_vendedor_dia
+            WHERE id_vendedor = %s AND dia >= {desde}
+            ORDER BY dia
+        """, (vendedor_id, parametro))
+        for fila in filas:
+            fila['promedio'] = round(fila['suma'] / fila['resenas'], 2) if fila['resenas'] else 0
+        return filas
+    
+    @staticmethod
+    def panel(vendedor_id, dias=30):
+        """Todo lo que muestra el panel del vendedor"""
+        ventas = ResumenVendedor.ventas_por_dia(vendedor_id, dias)
+        return {
+            'ventas_por_dia': ventas,
+            'ingresos': sum(fila['ingresos'] for fila in ventas),
+            'pedidos': sum(fila['pedidos'] for fila in ventas),
+            'mas_vendidos': ResumenVendedor.productos_mas_vendidos(vendedor_id),
+            'stock_bajo': ResumenVendedor.stock_bajo(vendedor_id),
+            'calificaciones': ResumenVendedor.tendencia_calificaciones(vendedor_id, dias),
+            'pedidos_recientes': Pedido.obtener_pedidos_vendedor(vendedor_id, limit=5),
+        }
+    
+    @staticmethod
+    def reconstruir():
+        """Recalcula las tablas de resumen desde pedidos, pedido_items y resenas"""
+        try:
+            with db.transaction():
+                for tabla in ('ventas_vendedor_dia', 'ventas_producto', 'calificaciones_vendedor_dia'):
+                    db.execute_update(f"DELETE FROM {tabla}")
+                db.execute_update("""
+                    INSERT INTO ventas_vendedor_dia (id_vendedor, dia, pedidos, unidades, ingresos)
+                    SELECT p.id_vendedor, DATE(p.fecha_creacion), COUNT(*), COALESCE(SUM(i.unidades), 0), SUM(p.total)
+                    FROM pedidos p
+                    LEFT JOIN (SELECT id_pedido, SUM(cantidad) as unidades FROM pedido_items GROUP BY id_pedido) i
+                        ON i.id_pedido = p.id_pedido
+                    GROUP BY p.id_vendedor, DATE(p.fecha_creacion)
+                """)
+                productos = db.execute_update("""
+                    INSERT INTO ventas_producto (id_producto, id_vendedor, unidades, ingresos)
+                    SELECT i.id_producto, MAX(p.id_vendedor), SUM(i.cantidad), SUM(i.cantidad * i.precio_unitario)
+                    FROM pedido_items i
+                    JOIN pedidos p ON p.id_pedido = i.id_pedido
+                    GROUP BY i.id_producto
+                """)
+                db.execute_update("""
+                    INSERT INTO calificaciones_vendedor_dia (id_vendedor, dia, resenas, suma)
+                    SELECT p.id_vendedor, DATE(r.fecha_creacion), COUNT(*), SUM(r.calificacion)
+                    FROM resenas r
+                    JOIN productos p ON p.id_producto = r.id_producto
+                    GROUP BY p.id_vendedor, DATE(r.fecha_creacion)
+                """)
+        except ErrorBD as e:
+            print(f"❌ Error al reconstruir los resúmenes: {e}")
+            return None
+        return productos
@@ -0,0 +1,213 @@
+"""
+Perfilador de consultas: cuántas consultas hace cada página y cuánto tardan
+
+`DatabaseConnection` informa cada consulta (SQL, duración, filas) a
+`db.perfilador`. Aquí se agrupan por huella (el SQL sin valores literales) y
+por ruta de Flask:
+  - cabecera Server-Timing en cada respuesta: `db;dur=12.3;desc="5 consultas"`
+  - consultas de más de SLOW_QUERY_MS milisegundos (200 por defecto) al
+    registro de consultas lentas, una línea JSON por consulta en
+    SLOW_QUERY_LOG (instance/consultas_lentas.log por defecto)
+  - histogramas de duración y de consultas por petición en /metrics
+
+Se desactiva con PERFILADOR=0.
+"""
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+from flask import has_request_context, request
+
+from cache import normalizar_sql
+
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+SIN_RUTA = '-'  # consultas fuera de una petición (comandos, hilos de fondo)
+
+_CADENA_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMERO_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LISTA_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_FILAS_RE = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+
+@lru_cache(maxsize=2048)
+def huella(query):
+    """SQL sin valores: `WHERE id IN (1, 2, 3)` y `WHERE id IN (%s)` quedan iguales"""
+    sql = normalizar_sql(query).replace('%s', '?')
+    sql = _CADENA_RE.sub('?', sql)
+    sql = _NUMERO_RE.sub('?', sql)
+    sql = _LISTA_RE.sub('(...)', sql)
+    sql = _FILAS_RE.sub('(...)', sql)
+    return sql
+
+
+class Histograma:
+    """Histograma acumulado al estilo de Prometheus"""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.cuentas = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.cuentas[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, cuenta in zip(self.limites + ('+Inf',), self.cuentas):
+            acumulado += cuenta
+            yield f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}'
+        yield f'{nombre}_sum{{{etiquetas}}} {self.suma:.6f}'
+        yield f'{nombre}_count{{{etiquetas}}} {self.total}'
+
+
+def _etiqueta(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+class PerfiladorConsultas:
+    """Agrega las consultas por ruta y por huella; lleva los totales de la petición en curso"""
+
+    def __init__(self, umbral_lento=0.2, registro_lento=None, max_huellas=200):
+        self.umbral_lento = umbral_lento
+        self.registro_lento = registro_lento
+        self.max_huellas = max_huellas
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._por_ruta = {}      # ruta -> Histograma de duración
+        self._por_peticion = {}  # ruta -> Histograma de consultas por petición
+        self._huellas = {}       # huella -> [consultas, segundos, filas]
+        self._archivo_lento = None
+        self.lentas = 0
+
+    # ----- Petición en curso -----
+
+    def iniciar_peticion(self, ruta):
+        self._local.ruta = ruta or SIN_RUTA
+        self._local.consultas = 0
+        self._local.segundos = 0.0
+
+    def totales(self):
+        """(consultas, segundos) de la petición en curso"""
+        return getattr(self._local, 'consultas', 0), getattr(self._local, 'segundos', 0.0)
+
+    def terminar_peticion(self):
+        ruta = getattr(self._local, 'ruta', None)
+        if ruta is None:
+            return
+        with self._lock:
+            histograma = self._por_peticion.get(ruta)
+            if histograma is None:
+                histograma = self._por_peticion[ruta] = Histograma(BUCKETS_CONSULTAS)
+            histograma.observar(self._local.consultas)
+        self._local.ruta = None
+
+    # ----- Consultas -----
+
+    def registrar(self, query, segundos, filas):
+        """Anota una consulta ejecutada; la llama DatabaseConnection"""
+        if getattr(self._local, 'ruta', None) is not None:
+            self._local.consultas += 1
+            self._local.segundos += segundos
+        # Se toma del contexto y no de _local: una respuesta en stream consulta
+        # después de terminar la petición, con el contexto restaurado
+        ruta = (request.endpoint or SIN_RUTA) if has_request_context() else SIN_RUTA
+
+        sql = huella(query)
+        with self._lock:
+            histograma = self._por_ruta.get(ruta)
+            if histograma is None:
+                histograma = self._por_ruta[ruta] = Histograma(BUCKETS_SEGUNDOS)
+            histograma.observar(segundos)
+
+            totales = self._huellas.get(sql)
+            if totales is None:
+                # Se acota la cantidad de series: el resto se suma en "otras"
+                clave = sql if len(self._huellas) < self.max_huellas else 'otras'
+                totales = self._huellas.setdefault(clave, [0, 0.0, 0])
+            totales[0] += 1
+            totales[1] += segundos
+            totales[2] += filas or 0
+
+        if segundos >= self.umbral_lento:
+            self._anotar_lenta(sql, query, segundos, filas, ruta)
+
+    def _anotar_lenta(self, sql, query, segundos, filas, ruta):
+        linea = json.dumps({
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'ms': round(segundos * 1000, 1),
+            'filas': filas,
+            'ruta': ruta,
+            'huella': sql,
+            'sql': normalizar_sql(query),
+        }, ensure_ascii=False)
+        with self._lock:
+            self.lentas += 1
+            if self.registro_lento is None:
+                print(f"🐢 Consulta lenta: {linea}")
+                return
+            try:
+                if self._archivo_lento is None:
+                    self._archivo_lento = open(self.registro_lento, 'a', encoding='utf-8', buffering=1)
+                self._archivo_lento.write(linea + '\n')
+            except OSError as e:
+                print(f"❌ No se pudo escribir el registro de consultas lentas: {e}")
+
+    # ----- Métricas -----
+
+    def metricas(self):
+        """Líneas en formato de texto de Prometheus"""
+        lineas = []
+        with self._lock:
+            for ruta, histograma in sorted(self._por_ruta.items()):
+                lineas.extend(histograma.lineas('mercadovecino_db_query_seconds', f'route="{_etiqueta(ruta)}"'))
+            for ruta, histograma in sorted(self._por_peticion.items()):
+                lineas.extend(histograma.lineas('mercadovecino_db_queries_per_request', f'route="{_etiqueta(ruta)}"'))
+            for sql, (consultas, segundos, filas) in sorted(self._huellas.items(), key=lambda item: -item[1][1]):
+                etiquetas = f'query="{_etiqueta(sql)}"'
+                lineas.append(f'mercadovecino_db_fingerprint_queries_total{{{etiquetas}}} {consultas}')
+                lineas.append(f'mercadovecino_db_fingerprint_seconds_total{{{etiquetas}}} {segundos:.6f}')
+                lineas.append(f'mercadovecino_db_fingerprint_rows_total{{{etiquetas}}} {filas}')
+            lineas.append(f'mercadovecino_db_slow_queries_total {self.lentas}')
+        return lineas
+
+
+perfilador = PerfiladorConsultas(
+    umbral_lento=float(os.environ.get('SLOW_QUERY_MS', 200)) / 1000,
+    max_huellas=int(os.environ.get('PERFILADOR_MAX_HUELLAS', 200)),
+)
+
+
+def iniciar(app, db):
+    """Conecta el perfilador a `db` y a las peticiones de la aplicación"""
+    if os.environ.get('PERFILADOR', '1') == '0':
+        return None
+
+    perfilador.registro_lento = os.environ.get(
+        'SLOW_QUERY_LOG', os.path.join(app.instance_path, 'consultas_lentas.log'))
+    os.makedirs(os.path.dirname(perfilador.registro_lento) or '.', exist_ok=True)
+    db.perfilador = perfilador
+
+    @app.before_request
+    def perfilar_peticion():
+        perfilador.iniciar_peticion(request.endpoint)
+
+    @app.after_request
+    def server_timing(resp):
+        consultas, segundos = perfilador.totales()
+        resp.headers.add('Server-Timing', f'db;dur={segundos * 1000:.1f};desc="{consultas} consultas"')
+        return resp
+
+    @app.teardown_request
+    def terminar_peticion(error=None):
+        perfilador.terminar_peticion()
+
+    return perfilador
@@ -0,0 +1,119 @@
+"""
+GET condicional (ETag) y compresión de respuestas HTML y JSON
+
+`etag_catalogo()` decora vistas cuyo contenido depende solo del catálogo: si el
+navegador manda un If-None-Match que coincide con la versión actual se responde
+304 sin ejecutar la vista, es decir, sin consultar la base de datos.
+
+`iniciar(app)` registra la compresión: los cuerpos de texto de más de
+COMPRESION_MINIMO bytes se envían en brotli o gzip según Accept-Encoding.
+"""
+import gzip
+import hashlib
+import os
+from functools import wraps
+
+from flask import make_response, request, session, Response
+
+from catalogo import version_catalogo
+
+try:
+    import brotli
+except ImportError:  # sin brotli solo se usa gzip
+    brotli = None
+
+TIPOS_COMPRIMIBLES = {
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'application/json',
+    'application/javascript', 'application/x-ndjson', 'image/svg+xml',
+}
+COMPRESION_MINIMO = int(os.environ.get('COMPRESION_MINIMO', 1024))
+
+
+# ---------- ETag ----------
+
+def calcular_etag(ruta_completa, user_id=None):
+    """ETag de una ruta (con su query string) para la versión actual del catálogo"""
+    partes = [version_catalogo.actual(), ruta_completa]
+    if user_id is not None:
+        partes.append(user_id)
+    return hashlib.sha1(repr(partes).encode()).hexdigest()[:20]
+
+
+def etag_catalogo(por_usuario=False):
+    """Responde 304 antes de ejecutar la vista si el catálogo no cambió
+
+    Con `por_usuario=True` el ETag incluye al usuario de la sesión, para páginas
+    que además muestran datos de quien está conectado.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            # Un mensaje flash pendiente cambia la página aunque el catálogo no cambie
+            if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                return vista(*args, **kwargs)
+
+            etag = calcular_etag(request.full_path, session.get('user_id') if por_usuario else None)
+            cache_control = 'private, no-cache' if por_usuario else 'no-cache'
+
+            if request.if_none_match.contains_weak(etag):
+                resp = Response(status=304)
+            else:
+                resp = make_response(vista(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag, weak=True)
+            resp.headers['Cache-Control'] = cache_control
+            return resp
+        return envoltura
+    return decorador
+
+
+# ---------- Compresión ----------
+
+def _codificacion(aceptadas):
+    """La mejor codificación entre las que acepta el cliente (un Accept de werkzeug), o None"""
+    if brotli is not None and aceptadas['br']:
+        return 'br'
+    if aceptadas['gzip']:
+        return 'gzip'
+    return None
+
+
+def comprimir_cuerpo(datos, aceptadas):
+    """Retorna (cuerpo, codificacion); codificacion es None si no conviene comprimir"""
+    codificacion = _codificacion(aceptadas)
+    if len(datos) < COMPRESION_MINIMO or codificacion is None:
+        return datos, None
+    if codificacion == 'br':
+        comprimido = brotli.compress(datos, quality=5)
+    else:
+        comprimido = gzip.compress(datos, compresslevel=6)
+    if len(comprimido) >= len(datos):
+        return datos, None
+    return comprimido, codificacion
+
+
+def comprimir(resp):
+    """after_request: comprime el cuerpo si es texto, es grande y el cliente lo acepta"""
+    if (resp.status_code < 200 or resp.status_code in (204, 304) or resp.direct_passthrough
+            or resp.is_streamed or 'Content-Encoding' in resp.headers
+            or resp.mimetype not in TIPOS_COMPRIMIBLES):
+        return resp
+
+    resp.vary.add('Accept-Encoding')
+    comprimido, codificacion = comprimir_cuerpo(resp.get_data(), request.accept_encodings)
+    if codificacion is None:
+        return resp
+
+    resp.set_data(comprimido)
+    resp.headers['Content-Encoding'] = codificacion
+    # El cuerpo ya no es idéntico byte a byte: un ETag fuerte pasa a ser débil
+    etag, debil = resp.get_etag()
+    if etag and not debil:
+        resp.set_etag(etag, weak=True)
+    return resp
+
+
+def iniciar(app):
+    """Registra la compresión de respuestas en la aplicación"""
+    app.after_request(comprimir)
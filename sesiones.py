@@ -0,0 +1,187 @@
+"""
+Sesiones guardadas en el servidor
+
+La cookie solo lleva un ID opaco y aleatorio; los datos de la sesión viven en un
+almacén del servidor. Así la cookie no crece con lo que se guarda en ella y no
+hay que verificar una firma en cada petición.
+
+Almacenes disponibles (variable de entorno SESSION_STORE):
+  - memoria (por defecto): diccionario con TTL y expulsión LRU, propio de cada proceso
+  - sqlite: archivo SQLite compartido por todos los procesos de la misma máquina
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from cache import CacheLRU
+
+
+def _nuevo_sid():
+    return secrets.token_urlsafe(32)
+
+
+class SesionServidor(CallbackDict, SessionMixin):
+    """Sesión cuyos datos se guardan en el servidor bajo `sid`"""
+
+    def __init__(self, datos=None, sid=None, nueva=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(datos, on_update)
+        self.sid = sid or _nuevo_sid()
+        self.new = nueva
+        self.modified = False
+        self.sid_anterior = None
+
+    def regenerar(self):
+        """Cambia el ID conservando los datos; se usa al iniciar sesión para evitar la fijación de sesión"""
+        if not self.new:
+            self.sid_anterior = self.sid
+        self.sid = _nuevo_sid()
+        self.modified = True
+
+
+class AlmacenMemoria(CacheLRU):
+    """Sesiones en un diccionario del proceso, con TTL deslizante y expulsión LRU"""
+
+    def __init__(self, ttl, max_entries=10000):
+        super().__init__(max_entries, ttl)
+
+    def get(self, sid):
+        with self._lock:
+            datos = self._leer(sid)
+            if datos is None:
+                return None
+            # Cada lectura renueva el vencimiento
+            self._guardar(sid, datos)
+            return dict(datos)
+
+    def set(self, sid, datos):
+        super().set(sid, dict(datos))
+
+    def delete(self, sid):
+        with self._lock:
+            self._sacar(sid)
+
+
+class AlmacenSQLite:
+    """Sesiones en un archivo SQLite, con una conexión por hilo"""
+
+    PURGA_CADA = 100  # escrituras entre limpiezas de sesiones vencidas
+
+    def __init__(self, ruta, ttl):
+        self.ruta = ruta
+        self.ttl = ttl
+        self._local = threading.local()
+        self._escrituras = 0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sesiones (
+                    sid TEXT PRIMARY KEY,
+                    datos TEXT NOT NULL,
+                    expira REAL NOT NULL
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sesiones_expira ON sesiones (expira)')
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid):
+        conn = self._conn()
+        fila = conn.execute('SELECT datos, expira FROM sesiones WHERE sid = ?', (sid,)).fetchone()
+        if fila is None:
+            return None
+        ahora = time.time()
+        if fila[1] < ahora:
+            conn.execute('DELETE FROM sesiones WHERE sid = ?', (sid,))
+            return None
+        # Se extiende el vencimiento solo cuando pasó la mitad, para no escribir en cada petición
+        if fila[1] - ahora < self.ttl / 2:
+            conn.execute('UPDATE sesiones SET expira = ? WHERE sid = ?', (ahora + self.ttl, sid))
+        return json.loads(fila[0])
+
+    def set(self, sid, datos):
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE INTO sesiones (sid, datos, expira) VALUES (?, ?, ?)',
+                     (sid, json.dumps(datos, default=str), time.time() + self.ttl))
+        self._escrituras += 1
+        if self._escrituras % self.PURGA_CADA == 0:
+            conn.execute('DELETE FROM sesiones WHERE expira < ?', (time.time(),))
+
+    def delete(self, sid):
+        self._conn().execute('DELETE FROM sesiones WHERE sid = ?', (sid,))
+
+
+class InterfazSesionesServidor(SessionInterface):
+    """SessionInterface de Flask que guarda las sesiones en `almacen`"""
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+
+    def open_session(self, app, request):
+        # Los archivos estáticos no usan la sesión: ni se busca ni se envía cookie
+        if app.static_url_path and request.path.startswith(app.static_url_path + '/'):
+            return self.make_null_session(app)
+
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            datos = self.almacen.get(sid)
+            if datos is not None:
+                return SesionServidor(datos, sid)
+        return SesionServidor(nueva=True)
+
+    def save_session(self, app, session, response):
+        nombre = self.get_cookie_name(app)
+        dominio = self.get_cookie_domain(app)
+        ruta = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        response.vary.add('Cookie')
+
+        if session.sid_anterior:
+            self.almacen.delete(session.sid_anterior)
+            session.sid_anterior = None
+
+        if not session:
+            # Sesión vaciada (p. ej. logout): se borra del almacén y del navegador
+            if not session.new:
+                self.almacen.delete(session.sid)
+                response.delete_cookie(nombre, domain=dominio, path=ruta, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+            return
+
+        if not session.modified:
+            return
+
+        self.almacen.set(session.sid, dict(session))
+        response.set_cookie(nombre, session.sid, expires=self.get_expiration_time(app, session),
+                            httponly=httponly, domain=dominio, path=ruta, secure=secure,
+                            samesite=samesite)
+
+
+def crear_interfaz(app):
+    """Crea la interfaz de sesiones según la configuración del entorno"""
+    ttl = float(os.environ.get('SESSION_TTL', app.permanent_session_lifetime.total_seconds()))
+
+    if os.environ.get('SESSION_STORE', 'memoria') == 'sqlite':
+        ruta = os.environ.get('SESSION_SQLITE', os.path.join(app.instance_path, 'sesiones.db'))
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        almacen = AlmacenSQLite(ruta, ttl)
+    else:
+        almacen = AlmacenMemoria(ttl, max_entries=int(os.environ.get('SESSION_MAX', 10000)))
+
+    return InterfazSesionesServidor(almacen)
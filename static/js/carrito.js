@@ -0,0 +1,35 @@
+// carrito.js - Botones de cantidad y eliminar del carrito de compras
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.item-compra').forEach(item => {
+        const productoId = item.dataset.id;
+        const cantidad = parseInt(item.dataset.cantidad, 10);
+
+        item.querySelectorAll('.cantidad button').forEach(boton => {
+            boton.addEventListener('click', () => {
+                actualizarCarrito('PUT', productoId, cantidad + parseInt(boton.dataset.cambio, 10));
+            });
+        });
+
+        item.querySelector('.eliminar').addEventListener('click', () => {
+            actualizarCarrito('DELETE', productoId);
+        });
+    });
+});
+
+async function actualizarCarrito(metodo, productoId, cantidad) {
+    try {
+        const response = await fetch(`/api/carrito/${productoId}`, {
+            method: metodo,
+            headers: { 'Content-Type': 'application/json' },
+            body: cantidad === undefined ? undefined : JSON.stringify({ cantidad: Math.max(cantidad, 0) })
+        });
+        if (!response.ok) {
+            const datos = await response.json();
+            alert(datos.error || 'No se pudo actualizar el carrito');
+        }
+        // El servidor recalcula precios y totales: se vuelve a mostrar la página
+        window.location.reload();
+    } catch (error) {
+        console.error('Error al actualizar el carrito:', error);
+    }
+}
@@ -13,6 +13,11 @@ document.addEventListener('DOMContentLoaded', function() {
 function cargarProductos() {
     const productosContainer = document.getElementById('productosContainer');
     
+    // Los productos ya vienen renderizados desde el servidor
+    if (productosContainer.dataset.servidor) {
+        return;
+    }
+    
     // Mostrar indicador de carga
     productosContainer.innerHTML = '<p>Cargando productos...</p>';
     
@@ -142,7 +147,7 @@ function aplicarFiltro(tipoFiltro) {
 }
 
 // FUNCIÓN QUE VERIFICA SI ESTÁ LOGUEADO
-function requireLogin() {
+function requireLogin(productoId) {
     // Verificar si el usuario está logueado buscando el mensaje de bienvenida
     const userWelcome = document.getElementById('userWelcome');
     
@@ -151,17 +156,44 @@ function requireLogin() {
         alert('Debes iniciar sesión para agregar productos al carrito');
         window.location.href = '/login';
     } else {
-        // Usuario SÍ logueado - no hacer nada (función carrito no existe aún)
-        console.log('Usuario logueado - función carrito pendiente de implementar');
-        // Aquí irá tu función de carrito cuando la tengas lista
+        // Usuario SÍ logueado - agregar el producto al carrito
+        if (productoId !== undefined) {
+            agregarAlCarrito(productoId);
+        }
+    }
+}
+
+// Agrega una unidad del producto al carrito del servidor
+async function agregarAlCarrito(productoId) {
+    try {
+        const response = await fetch('/api/carrito', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ id_producto: productoId, cantidad: 1 })
+        });
+        const datos = await response.json();
+        alert(response.ok ? 'Producto agregado al carrito' : (datos.error || 'No se pudo agregar al carrito'));
+    } catch (error) {
+        console.error('Error al agregar al carrito:', error);
     }
 }
 
 // Función para cargar productos desde la API (para uso futuro)
 async function cargarProductosDesdeAPI() {
     try {
-        const response = await fetch('/api/productos');
-        const productos = await response.json();
+        // La API responde por páginas: se sigue `siguiente` hasta la última
+        const productos = [];
+        let siguiente = null;
+        do {
+            const url = siguiente === null ? '/api/productos' : `/api/productos?after=${siguiente}`;
+            const response = await fetch(url);
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            const pagina = await response.json();
+            productos.push(...pagina.productos);
+            siguiente = pagina.siguiente;
+        } while (siguiente !== null);
         
         const productosContainer = document.getElementById('productosContainer');
         let html = '<div class="productos-grid">';
@@ -173,7 +205,7 @@ async function cargarProductosDesdeAPI() {
                     <p>${producto.descripcion}</p>
                     <span class="precio">$${producto.precio.toLocaleString()}</span>
                     <p><small>Vendedor: ${producto.vendedor}</small></p>
-                    <button class="btn-login-required" onclick="requireLogin()">
+                    <button class="btn-login-required" onclick="requireLogin(${producto.id})">
                         Agregar al carrito
                     </button>
                 </div>
@@ -0,0 +1,136 @@
+"""
+Pruebas sobre el motor SQLite (DB_BACKEND=sqlite): no necesitan un servidor MySQL
+
+Las variables de entorno se fijan antes de importar la aplicación, porque los
+módulos crean sus instancias globales al importarse. El fixture `bd` deja una
+base de datos nueva con todas las migraciones para cada prueba, y se salta si
+el árbol todavía no tiene el motor SQLite; las cachés de módulos que aún no
+existen simplemente no se vacían.
+"""
+import importlib
+import os
+import tempfile
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix='mercadovecino-pruebas-')
+
+os.environ.update({
+    'DB_BACKEND': 'sqlite',
+    'DB_SQLITE': os.path.join(_TMP, 'inicial.db'),
+    'SLOW_QUERY_LOG': os.path.join(_TMP, 'consultas_lentas.log'),
+    'PASSWORD_ALGORITMO': 'pbkdf2',
+    'PASSWORD_COSTO': '1000',
+    'PASSWORD_HILOS': '0',
+    'BUSQUEDA_REFRESCO': '0',
+    'CATALOGO_VERSION_TTL': '0',
+    'PRECALENTAR': '0',
+})
+
+
+def _vaciar_caches():
+    """Deja vacías las cachés de proceso de los módulos presentes en el árbol"""
+    from conexion import db
+
+    if getattr(db, 'cache', None) is not None:
+        db.cache.clear()
+    for modulo, vaciar in _CACHES:
+        try:
+            vaciar(importlib.import_module(modulo))
+        except ImportError:
+            continue
+
+
+def _vaciar_fragmentos(fragmentos):
+    fragmentos.cache_fragmentos = fragmentos.CacheFragmentos()
+
+
+def _vaciar_carritos(carrito):
+    from sesiones import AlmacenMemoria
+
+    carrito.carritos.almacen = AlmacenMemoria(carrito.carritos.almacen.ttl)
+    carrito.carritos.fotos = carrito.FotosProductos(ttl=carrito.carritos.fotos.ttl)
+
+
+# Módulo -> cómo vaciar su caché; los que aún no existen en el árbol se saltan
+_CACHES = [
+    ('identidad', lambda identidad: identidad.cache_usuarios.clear()),
+    ('favoritos', lambda favoritos: favoritos.cache_favoritos.clear()),
+    ('fragmentos', _vaciar_fragmentos),
+    ('carrito', _vaciar_carritos),
+    ('catalogo', lambda catalogo: catalogo.version_catalogo.invalidar()),
+]
+
+
+@pytest.fixture
+def bd(tmp_path):
+    """Base de datos SQLite vacía con el esquema al día; se salta sin el motor SQLite"""
+    esquema = pytest.importorskip('esquema')
+    from conexion import db
+
+    if getattr(db, 'dialecto', None) != 'sqlite':
+        pytest.skip('requiere el motor SQLite (DB_BACKEND=sqlite)')
+
+    db.disconnect()
+    db.ruta = str(tmp_path / 'mercado_vecino.db')
+    esquema.migrar()
+    _vaciar_caches()
+    try:
+        from busqueda import indice
+    except ImportError:
+        pass
+    else:
+        indice.reconstruir()
+    yield db
+    db.disconnect()
+
+
+@pytest.fixture
+def crear_usuario(bd):
+    """Fábrica de usuarios: crear_usuario(rol='COMPRADOR', contraseña=None, **campos) -> id"""
+    import contrasenas
+    from models import Usuario
+
+    contador = iter(range(1, 10 ** 6))
+
+    def crear(rol='COMPRADOR', contraseña=None, **campos):
+        n = next(contador)
+        return Usuario.crear_usuario(
+            campos.get('nombre', f'Usuario{n}'), campos.get('apellido', 'Prueba'),
+            campos.get('correo', f'usuario{n}@mercadovecino.co'), campos.get('telefono', '3000000000'),
+            contrasenas.hashear(contraseña) if contraseña else 'x', rol, campos.get('direccion'))
+    return crear
+
+
+@pytest.fixture
+def crear_producto(bd):
+    """Fábrica de productos publicados: crear_producto(vendedor_id, nombre, **campos) -> id"""
+    from models import Producto
+
+    def crear(vendedor_id, nombre='Producto', descripcion=None, categoria='Frutas', precio=1000, stock=10):
+        return Producto.crear_producto(vendedor_id, nombre, descripcion, categoria, precio, stock)
+    return crear
+
+
+@pytest.fixture
+def cliente(bd):
+    """Cliente de pruebas de Flask sobre la base de datos de la prueba"""
+    from app import app
+
+    app.config['TESTING'] = True
+    with app.test_client() as cliente:
+        yield cliente
+
+
+@pytest.fixture
+def iniciar_sesion(cliente):
+    """Deja a `cliente` con la sesión de `user_id` sin pasar por el formulario de login"""
+    from models import Usuario
+
+    def iniciar(user_id):
+        usuario = Usuario.buscar_por_id(user_id)
+        with cliente.session_transaction() as sesion:
+            sesion['user_id'] = user_id
+            sesion['user_role'] = usuario['rol']
+        return cliente
+    return iniciar
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def catalogo(crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    return [crear_producto(vendedor_id, f'Producto {i}', precio=1000 + i) for i in range(7)]
+
+
+def test_paginas_siguen_el_cursor_sin_repetir(cliente, catalogo):
+    vistos = []
+    after = None
+    paginas = 0
+    while True:
+        url = '/api/productos?limit=3' + (f'&after={after}' if after else '')
+        datos = cliente.get(url).get_json()
+        vistos.extend(producto['id'] for producto in datos['productos'])
+        paginas += 1
+        after = datos['siguiente']
+        if after is None:
+            break
+    assert vistos == sorted(catalogo, reverse=True)
+    assert paginas == 3
+
+
+def test_ultima_pagina_exacta_no_tiene_siguiente(cliente, catalogo):
+    datos = cliente.get('/api/productos?limit=7').get_json()
+    assert len(datos['productos']) == 7
+    assert datos['siguiente'] is None
+
+
+def test_limit_se_acota(cliente, catalogo):
+    datos = cliente.get('/api/productos?limit=0').get_json()
+    assert len(datos['productos']) == 1
+
+
+def test_ndjson_transmite_una_linea_por_producto(cliente, catalogo):
+    resp = cliente.get(f'/api/productos?formato=ndjson&after={catalogo[4]}')
+    assert resp.mimetype == 'application/x-ndjson'
+    lineas = [json.loads(linea) for linea in resp.get_data(as_text=True).splitlines()]
+    assert [producto['id'] for producto in lineas] == sorted(catalogo[:4], reverse=True)
+    assert lineas[0]['precio'] == 1003
@@ -0,0 +1,194 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip('asgiref')
+
+import asgi  # noqa: E402
+from conexion_async import AsyncDatabaseConnection  # noqa: E402
+
+
+class CursorAsync:
+    """Cursor de aiomysql que ejecuta el SQL sobre la base de pruebas"""
+
+    def __init__(self, bd):
+        self.bd = bd
+        self.filas = []
+
+    async def execute(self, query, params=()):
+        self.filas = self.bd.execute_query(query, params)
+
+    async def fetchall(self):
+        filas, self.filas = self.filas, []
+        return filas
+
+    async def fetchmany(self, cantidad):
+        filas, self.filas = self.filas[:cantidad], self.filas[cantidad:]
+        return filas
+
+
+class PoolAsync:
+    def __init__(self, bd):
+        self.bd = bd
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    @asynccontextmanager
+    async def cursor(self, clase=None):
+        yield CursorAsync(self.bd)
+
+
+@pytest.fixture
+def db_async(bd, monkeypatch):
+    conexion = AsyncDatabaseConnection(cache=bd.cache, perfilador=bd.perfilador)
+    conexion.pool = PoolAsync(bd)
+    monkeypatch.setattr(asgi, 'db_async', conexion)
+    return conexion
+
+
+def llamar(path, query_string='', headers=None, metodo='GET'):
+    """Ejecuta una petición contra asgi.app y retorna (status, cabeceras, cuerpo)"""
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': metodo, 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': query_string.encode(), 'server': ('localhost', 80),
+        'headers': [(nombre.lower().encode(), valor.encode()) for nombre, valor in (headers or {}).items()],
+    }
+    mensajes = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(mensaje):
+        mensajes.append(mensaje)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    inicio = mensajes[0]
+    cabeceras = {nombre.decode(): valor.decode() for nombre, valor in inicio['headers']}
+    cuerpo = b''.join(mensaje.get('body', b'') for mensaje in mensajes[1:])
+    return inicio['status'], cabeceras, cuerpo
+
+
+@pytest.fixture
+def catalogo(crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    return [crear_producto(vendedor_id, f'Miel {i}') for i in range(5)]
+
+
+def test_peticion():
+    peticion = asgi.Peticion({'path': '/api/productos', 'query_string': b'after=5&limit=x', 'method': 'GET',
+                              'headers': [(b'Accept-Encoding', b'gzip')]})
+    assert peticion.full_path == '/api/productos?after=5&limit=x'
+    assert peticion.entero('after') == 5
+    assert peticion.entero('limit', 20) == 20
+    assert peticion.headers['accept-encoding'] == 'gzip'
+
+
+def test_api_productos_igual_que_en_wsgi(cliente, db_async, catalogo):
+    status, cabeceras, cuerpo = llamar('/api/productos', 'limit=2')
+    wsgi = cliente.get('/api/productos?limit=2')
+    assert status == 200
+    assert json.loads(cuerpo) == wsgi.get_json()
+    assert cabeceras['etag'] == wsgi.headers['ETag']
+
+    status, _, cuerpo = llamar('/api/productos', 'limit=2', {'If-None-Match': cabeceras['etag']})
+    assert status == 304 and cuerpo == b''
+
+
+def test_api_productos_ndjson(db_async, catalogo):
+    status, cabeceras, cuerpo = llamar('/api/productos', f'formato=ndjson&after={catalogo[2]}')
+    assert cabeceras['content-type'] == 'application/x-ndjson'
+    assert [json.loads(linea)['id'] for linea in cuerpo.decode().splitlines()] == [catalogo[1], catalogo[0]]
+
+
+def test_api_buscar(db_async, catalogo):
+    _, _, cuerpo = llamar('/api/buscar', 'q=miel&limit=3')
+    assert len(json.loads(cuerpo)['resultados']) == 3
+
+
+def test_el_resto_lo_atiende_flask(db_async):
+    status, cabeceras, cuerpo = llamar('/login')
+    assert status == 200 and 'text/html' in cabeceras['content-type']
+
+
+def test_iter_query_se_registra_en_el_perfilador(db_async, catalogo):
+    from perfilador import PerfiladorConsultas
+
+    db_async.perfilador = PerfiladorConsultas()
+    db_async.perfilador.iniciar_peticion('prueba')
+
+    async def leer():
+        return [fila async for fila in db_async.iter_query("SELECT id_producto FROM productos", batch_size=2)]
+
+    assert len(asyncio.run(leer())) == len(catalogo)
+    assert db_async.perfilador.totales()[0] == 1
+    assert 'mercadovecino_db_fingerprint_queries_total{query="SELECT id_producto FROM productos"} 1' in \
+        '\n'.join(db_async.perfilador.metricas())
+
+
+def _ndjson(send, al_terminar=None):
+    """Pide /api/productos en NDJSON; `al_terminar()` corre apenas termina la app, dentro del loop"""
+    scope = {'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+             'path': '/api/productos', 'raw_path': b'/api/productos', 'root_path': '',
+             'query_string': b'formato=ndjson', 'server': ('localhost', 80), 'headers': []}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def correr():
+        try:
+            await asgi.app(scope, receive, send)
+        finally:
+            if al_terminar:
+                al_terminar()
+
+    asyncio.run(correr())
+
+
+def test_ndjson_suelta_la_conexion_si_el_cliente_se_va(db_async, catalogo, monkeypatch):
+    prestadas = []
+
+    @asynccontextmanager
+    async def acquire():
+        prestadas.append(1)
+        try:
+            yield db_async.pool
+        finally:
+            prestadas.pop()
+
+    monkeypatch.setattr(db_async.pool, 'acquire', acquire)
+
+    async def send(mensaje):
+        if mensaje.get('more_body'):
+            raise OSError("el cliente cerró la conexión")
+
+    # Antes de que el loop recolecte generadores pendientes
+    al_terminar = []
+    with pytest.raises(OSError):
+        _ndjson(send, lambda: al_terminar.append(list(prestadas)))
+    assert al_terminar == [[]]
+
+
+def test_ndjson_con_error_de_base_no_termina_como_completo(db_async, catalogo, monkeypatch):
+    async def fetchmany(self, cantidad):
+        if not self.filas:
+            raise OSError("se perdió la conexión con MySQL")
+        filas, self.filas = self.filas[:2], self.filas[2:]
+        return filas
+
+    monkeypatch.setattr(CursorAsync, 'fetchmany', fetchmany)
+    mensajes = []
+
+    async def send(mensaje):
+        mensajes.append(mensaje)
+
+    with pytest.raises(OSError):
+        _ndjson(send)
+    lineas = b''.join(mensaje.get('body', b'') for mensaje in mensajes[1:]).decode().splitlines()
+    assert json.loads(lineas[-1]) == {'error': 'Error al leer los productos'}
+    # Nunca se envió el cuerpo final sin more_body
+    assert all(mensaje.get('more_body') for mensaje in mensajes[1:])
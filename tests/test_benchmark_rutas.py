@@ -0,0 +1,36 @@
+from benchmarks import rutas
+
+
+class RespuestaFalsa:
+    def __init__(self, server_timing):
+        self.headers = {'Server-Timing': server_timing} if server_timing else {}
+
+
+def test_percentil_y_resumen():
+    assert rutas.percentil([], 50) is None
+    assert rutas.percentil([3, 1, 2, 4], 50) == 3
+    assert rutas.percentil([3, 1, 2, 4], 99) == 4
+
+    resultado = rutas.resumen([(0.010, 2, 1.5), (0.020, 4, 2.5), (0.030, None, None)], errores=1, segundos=2)
+    assert resultado['peticiones'] == 3 and resultado['rps'] == 1.5
+    assert resultado['p50_ms'] == 20.0
+    assert resultado['consultas_por_peticion'] == 3 and resultado['db_ms_por_peticion'] == 2.0
+
+
+def test_server_timing():
+    assert rutas._server_timing(RespuestaFalsa('db;dur=12.5;desc="3 consultas"')) == (3, 12.5)
+    assert rutas._server_timing(RespuestaFalsa(None)) == (None, None)
+
+
+def test_sembrar_y_medir(bd):
+    rutas.sembrar(usuarios=20, productos=50, resenas=40, pedidos=15, semilla=1)
+    compradores, vendedores = rutas.cuentas_de_prueba()
+    assert len(vendedores) == 2 and len(compradores) == 18
+
+    max_id = bd.execute_query("SELECT MAX(id_producto) AS maximo FROM productos")[0]['maximo']
+    escenarios = rutas.escenarios(compradores, vendedores, max_id)
+    for nombre in ('GET /api/productos', 'GET /inicio_vendedor'):
+        preparar, peticion = escenarios[nombre]
+        resultado = rutas.medir(preparar, peticion, hilos=2, segundos=0.2, calentamiento=0, semilla=1)
+        assert resultado['peticiones'] > 0 and resultado['errores'] == 0
+        assert resultado['consultas_por_peticion'] is not None
@@ -0,0 +1,69 @@
+from busqueda import IndiceBusqueda, indice, normalizar, tokenizar
+from models import Producto
+
+
+def test_normalizar_y_tokenizar():
+    assert normalizar('Café ÑANDÚ') == 'cafe nandu'
+    assert tokenizar('La miel de la abeja') == ['miel', 'abeja']
+
+
+def test_relevancia_y_prefijos(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    en_descripcion = crear_producto(vendedor_id, 'Frasco', descripcion='con miel de abejas')
+    en_nombre = crear_producto(vendedor_id, 'Miel pura')
+    crear_producto(vendedor_id, 'Queso')
+
+    assert indice.buscar_ids('miel') == [en_nombre, en_descripcion]
+    assert indice.buscar_ids('abej') == [en_descripcion]
+    assert indice.buscar_ids('miel queso') == []
+    assert indice.buscar('MIEL', limite=1)[0]['nombre'] == 'Miel pura'
+
+
+def test_cambios_de_productos_se_indexan(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    producto_id = crear_producto(vendedor_id, 'Arepa')
+
+    Producto.actualizar_producto(producto_id, {'nombre': 'Empanada'})
+    assert indice.buscar_ids('arepa') == []
+    assert indice.buscar_ids('empanada') == [producto_id]
+
+    Producto.actualizar_producto(producto_id, {'estado': 'PAUSADO'})
+    assert indice.buscar_ids('empanada') == []
+
+
+def test_obtener_productos_filtra_con_el_indice(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    crear_producto(vendedor_id, 'Café de origen')
+    crear_producto(vendedor_id, 'Panela')
+
+    assert [p['nombre'] for p in Producto.obtener_productos(busqueda='cafe')] == ['Café de origen']
+
+
+def test_reconstruir_recoge_cambios_de_otros_procesos(bd, crear_usuario):
+    vendedor_id = crear_usuario('VENDEDOR')
+    nuevo = IndiceBusqueda(bd, refresco=0)
+    assert nuevo.buscar_ids('mango') == []
+
+    bd.execute_insert("INSERT INTO productos (id_vendedor, nombre, precio, stock) VALUES (%s, 'Mango', 1, 1)",
+                      (vendedor_id,))
+    assert nuevo.asegurar_cargado() is None
+    nuevo.marcar_vencido()
+    # El refresco corre en otro hilo; mientras tanto responde el índice anterior
+    hilo = nuevo.asegurar_cargado()
+    hilo.join(timeout=10)
+    assert not nuevo.vencido()
+    assert len(nuevo.buscar_ids('mango')) == 1
+
+
+def test_cambios_durante_la_reconstruccion_no_se_pierden():
+    class BDLenta:
+        def iter_query(self, consulta):
+            yield {'id_producto': 1, 'nombre': 'Arepa', 'precio': 1}
+            # Llegan mientras se está leyendo la tabla
+            nuevo.indexar({'id_producto': 2, 'nombre': 'Mango', 'precio': 1})
+            nuevo.eliminar(1)
+
+    nuevo = IndiceBusqueda(BDLenta(), refresco=0)
+    nuevo.reconstruir()
+    assert nuevo.buscar_ids('mango') == [2]
+    assert nuevo.buscar_ids('arepa') == []
@@ -0,0 +1,77 @@
+import time
+
+from cache import CacheLRU, QueryCache, normalizar_sql, tablas_de
+
+
+def test_normalizar_y_tablas():
+    assert normalizar_sql("SELECT *\n   FROM  productos ") == "SELECT * FROM productos"
+    assert tablas_de("SELECT * FROM productos p JOIN `usuarios` u ON 1") == {'productos', 'usuarios'}
+    assert tablas_de("UPDATE productos SET stock = 1") == {'productos'}
+
+
+def test_cache_lru_base():
+    cache = CacheLRU(max_entries=2)
+    cache.set('a', None)
+    cache.set('b', 2)
+    assert cache.get('a', 'falta') is None
+    cache.set('c', 3)
+    assert cache.get('b') is None and len(cache) == 2
+    cache.invalidar('c')
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 1, 'invalidations': 1, 'entries': 1}
+
+    desactivada = CacheLRU(ttl=0)
+    desactivada.set('a', 1)
+    assert desactivada.get('a') is None and len(desactivada) == 0
+
+
+def test_ttl_y_lru():
+    cache = QueryCache(max_entries=2, ttl=0.02)
+    cache.set('a', 1, frozenset({'productos'}))
+    cache.set('b', 2, frozenset({'productos'}))
+    cache.get('a')
+    cache.set('c', 3, frozenset({'productos'}))
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
+    time.sleep(0.03)
+    assert cache.get('a') is None
+
+
+def test_invalidar_solo_las_tablas_escritas():
+    cache = QueryCache()
+    cache.set('p', 1, frozenset({'productos', 'usuarios'}))
+    cache.set('r', 2, frozenset({'resenas'}))
+    cache.invalidate(frozenset({'usuarios'}))
+    assert cache.get('p') is None
+    assert cache.get('r') == 2
+
+
+def test_lectura_vieja_no_se_guarda():
+    cache = QueryCache()
+    tablas = frozenset({'productos'})
+    generacion = cache.generation(tablas)
+    cache.invalidate(tablas)  # una escritura mientras se consultaba
+    cache.set('p', 'viejo', tablas, generacion)
+    assert cache.get('p') is None
+
+
+def test_db_cachea_hasta_que_se_escribe(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    producto_id = crear_producto(vendedor_id, 'Miel', stock=3)
+    consulta = "SELECT stock FROM productos WHERE id_producto = %s"
+
+    assert bd.execute_query(consulta, (producto_id,), cache=True) == [{'stock': 3}]
+    hits = bd.cache.stats()['hits']
+    assert bd.execute_query(consulta, (producto_id,), cache=True) == [{'stock': 3}]
+    assert bd.cache.stats()['hits'] == hits + 1
+
+    bd.execute_update("UPDATE productos SET stock = 1 WHERE id_producto = %s", (producto_id,))
+    assert bd.execute_query(consulta, (producto_id,), cache=True) == [{'stock': 1}]
+
+
+def test_no_se_cachea_dentro_de_una_transaccion(bd, crear_usuario):
+    crear_usuario()
+    entradas = bd.cache.stats()['entries']
+    with bd.transaction():
+        bd.execute_query("SELECT * FROM usuarios", cache=True)
+    assert bd.cache.stats()['entries'] == entradas
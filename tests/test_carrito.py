@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+
+import pytest
+
+from carrito import CANTIDAD_MAX, Carritos, FotosProductos, carritos
+from models import Producto
+from sesiones import AlmacenMemoria, AlmacenSQLite
+
+
+def _consultas(resp):
+    return int(re.search(r'desc="(\d+) consultas"', resp.headers['Server-Timing']).group(1))
+
+
+@pytest.fixture
+def productos(crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR', nombre='Tienda')
+    return (crear_producto(vendedor_id, 'Pan', precio=2000, stock=5),
+            crear_producto(vendedor_id, 'Miel', precio=12000, stock=2))
+
+
+def test_fotos_en_una_sola_consulta(bd, productos, monkeypatch):
+    lecturas = []
+    obtener_por_ids = Producto.obtener_por_ids
+    monkeypatch.setattr(Producto, 'obtener_por_ids',
+                        lambda ids: lecturas.append(list(ids)) or obtener_por_ids(ids))
+    fotos = FotosProductos(ttl=60)
+
+    assert set(fotos.obtener(list(productos) + [999])) == set(productos)
+    assert fotos.obtener(list(productos) + [999]).keys() == set(productos)
+    # El producto inexistente también se recuerda
+    assert lecturas == [list(productos) + [999]]
+
+
+def test_cantidades_se_acotan_al_stock(bd, productos):
+    pan, miel = productos
+    assert carritos.agregar(1, pan, 3) == 3
+    assert carritos.agregar(1, pan, 4) == 5
+    assert carritos.fijar(1, miel, 1000) == 2
+    assert carritos.fijar(1, 999, 1) is None
+    assert carritos.contenido(1) == {pan: 5, miel: 2}
+
+    detalle = carritos.detalle(1)
+    assert detalle['resumen'] == {'subtotal': 5 * 2000 + 2 * 12000, 'articulos': 7}
+    assert detalle['items'][0]['vendedor'] == 'Tienda'
+
+    carritos.quitar(1, pan)
+    assert carritos.contenido(1) == {miel: 2}
+    carritos.vaciar(1)
+    assert carritos.contenido(1) == {}
+
+
+def test_tope_por_linea(bd, crear_usuario, crear_producto):
+    producto_id = crear_producto(crear_usuario('VENDEDOR'), 'Arroz', stock=1000)
+    assert carritos.fijar(1, producto_id, 500) == CANTIDAD_MAX
+
+
+def test_producto_borrado_desaparece_del_carrito(bd, productos):
+    pan, miel = productos
+    carritos.agregar(1, pan)
+    carritos.agregar(1, miel)
+    bd.execute_update("DELETE FROM productos WHERE id_producto = %s", (miel,))
+    carritos.fotos = FotosProductos(ttl=60)
+
+    assert [linea['id'] for linea in carritos.detalle(1)['items']] == [pan]
+    assert carritos.contenido(1) == {pan: 1}
+
+
+def test_sin_stock_no_suma_al_total(bd, productos):
+    pan, _ = productos
+    carritos.agregar(1, pan, 5)
+    Producto.actualizar_producto(pan, {'stock': 2})
+    carritos.fotos = FotosProductos(ttl=60)
+    detalle = carritos.detalle(1)
+    assert detalle['items'][0]['disponible'] == 2
+    assert detalle['resumen'] == {'subtotal': 0, 'articulos': 0}
+
+
+def test_almacen_sqlite(bd, productos, tmp_path):
+    pan, _ = productos
+    propio = Carritos(AlmacenSQLite(str(tmp_path / 'carritos.db'), 60), FotosProductos())
+    propio.agregar(7, pan, 2)
+    otro_proceso = Carritos(AlmacenSQLite(str(tmp_path / 'carritos.db'), 60), FotosProductos())
+    assert otro_proceso.contenido(7) == {pan: 2}
+
+
+def test_cambios_concurrentes_no_se_pierden(bd, productos, monkeypatch):
+    pan, miel = productos
+    propio = Carritos(AlmacenMemoria(60), FotosProductos(ttl=60))
+    propio.fotos.obtener([pan, miel])
+    get = propio.almacen.get
+    # Ensancha la ventana entre leer y reescribir el carrito
+    monkeypatch.setattr(propio.almacen, 'get', lambda clave: time.sleep(0.01) or get(clave))
+
+    hilos = [threading.Thread(target=propio.agregar, args=(3, producto_id))
+             for producto_id in (pan, pan, pan, miel, miel)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert propio.contenido(3) == {pan: 3, miel: 2}
+
+
+def test_api(cliente, crear_usuario, iniciar_sesion, productos):
+    pan, miel = productos
+    assert cliente.get('/api/carrito').status_code == 401
+
+    iniciar_sesion(crear_usuario())
+    resp = cliente.post('/api/carrito', json={'id_producto': pan, 'cantidad': 2})
+    assert resp.get_json()['resumen']['articulos'] == 2
+    assert cliente.post('/api/carrito', json={'id_producto': 'pan'}).status_code == 400
+    assert cliente.post('/api/carrito', json={'id_producto': 999}).status_code == 404
+
+    assert cliente.put(f'/api/carrito/{miel}', json={'cantidad': 1}).get_json()['resumen']['articulos'] == 3
+    assert cliente.put(f'/api/carrito/{miel}', json={'cantidad': -1}).status_code == 400
+    assert cliente.delete(f'/api/carrito/{pan}').get_json()['resumen']['articulos'] == 1
+
+    # Con la foto al día mostrar el carrito no consulta productos
+    resp = cliente.get('/api/carrito')
+    assert _consultas(resp) <= 1
+    assert cliente.delete('/api/carrito').get_json()['items'] == []
+
+
+def test_pagina_del_carrito(cliente, crear_usuario, iniciar_sesion, productos):
+    pan, _ = productos
+    user_id = crear_usuario()
+    iniciar_sesion(user_id)
+    carritos.agregar(user_id, pan, 2)
+    html = cliente.get('/carrito_compras').get_data(as_text=True)
+    assert 'Pan' in html
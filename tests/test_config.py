@@ -0,0 +1,112 @@
+import threading
+
+from mysql.connector import Error
+
+from conexion import ConnectionPool, DatabaseConnection
+from config import MercadoVecinoWeb
+
+
+class CursorFalso:
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = None
+
+    def execute(self, query, params=()):
+        self.conn.consultas.append((' '.join(query.split()), tuple(params)))
+        if self.conn.falla:
+            raise Error("fallo simulado")
+        if query.lstrip().upper().startswith('INSERT'):
+            self.lastrowid = 7
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return [dict(fila) for fila in self.conn.filas]
+
+    def close(self):
+        pass
+
+
+class ConexionFalsa:
+    in_transaction = False
+    unread_result = False
+
+    def __init__(self, filas=(), falla=False):
+        self.filas = filas
+        self.falla = falla
+        self.consultas = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, dictionary=False, buffered=False):
+        return CursorFalso(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def is_connected(self):
+        return True
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        pass
+
+
+def crear_mercado(**opciones):
+    conexiones = []
+
+    def fabrica():
+        conn = ConexionFalsa(**opciones)
+        conexiones.append(conn)
+        return conn
+
+    db = DatabaseConnection(pooled=True)
+    db.pool = ConnectionPool(fabrica, min_size=0, max_size=2, timeout=1)
+    return MercadoVecinoWeb(db), db, conexiones
+
+
+def test_registrar_confirma_y_devuelve_la_conexion():
+    mercado, db, conexiones = crear_mercado()
+    assert mercado.registrar_usuario('Ana', 'Díaz', 'ana@mercadovecino.co', '300', 'Calle 1', 'secreta') == 7
+    assert conexiones[0].commits == 1
+    assert db.pool.stats()['en_uso'] == 0
+
+
+def test_error_deshace_y_devuelve_la_conexion():
+    mercado, db, conexiones = crear_mercado(falla=True)
+    assert mercado.registrar_usuario('Ana', 'Díaz', 'ana@mercadovecino.co', '300', 'Calle 1', 'secreta') is None
+    assert conexiones[0].rollbacks >= 1
+    assert db.pool.stats()['en_uso'] == 0
+
+
+def test_busqueda_respeta_el_orden_del_indice(monkeypatch):
+    mercado, _, conexiones = crear_mercado(filas=[{'id_producto': 1}, {'id_producto': 3}])
+    monkeypatch.setattr(mercado.indice, 'buscar_ids', lambda texto: [3, 1])
+    productos = mercado.obtener_productos(busqueda='miel')
+    assert [p['id_producto'] for p in productos] == [3, 1]
+    assert conexiones[0].consultas[0][1] == (3, 1)
+
+
+def test_hilos_comparten_el_pool():
+    mercado, db, conexiones = crear_mercado(filas=[{'id_producto': 1}])
+    errores = []
+
+    def cliente():
+        for _ in range(25):
+            if mercado.obtener_productos() != [{'id_producto': 1}]:
+                errores.append('resultado inesperado')
+
+    hilos = [threading.Thread(target=cliente) for _ in range(6)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert not errores
+    assert len(conexiones) <= 2
+    assert db.pool.stats()['en_uso'] == 0
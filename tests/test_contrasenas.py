@@ -0,0 +1,60 @@
+import hashlib
+
+import pytest
+
+from contrasenas import ServicioContrasenas, es_sha256_antiguo, metodo_werkzeug
+from models import Usuario
+
+
+def test_metodo_werkzeug():
+    assert metodo_werkzeug('scrypt') == 'scrypt:32768:8:1'
+    assert metodo_werkzeug('pbkdf2', 1000) == 'pbkdf2:sha256:1000'
+    with pytest.raises(ValueError):
+        metodo_werkzeug('md5')
+
+
+@pytest.mark.parametrize('hilos', [0, 2])
+def test_hashear_y_verificar(hilos):
+    servicio = ServicioContrasenas('pbkdf2', 1000, hilos=hilos)
+    hash_guardado = servicio.hashear('secreta1')
+    assert servicio.verificar(hash_guardado, 'secreta1') == (True, None)
+    assert servicio.verificar(hash_guardado, 'otra') == (False, None)
+    assert servicio.verificar('', 'secreta1') == (False, None)
+    assert servicio.verificar('desconocido$x$y', 'secreta1') == (False, None)
+    servicio.cerrar()
+
+
+def test_sha256_antiguo_se_reemplaza():
+    servicio = ServicioContrasenas('pbkdf2', 1000, hilos=0)
+    antiguo = hashlib.sha256(b'secreta1').hexdigest()
+    assert es_sha256_antiguo(antiguo)
+
+    correcta, hash_nuevo = servicio.verificar(antiguo, 'secreta1')
+    assert correcta and hash_nuevo.startswith('pbkdf2:sha256:1000$')
+    assert servicio.verificar(antiguo, 'otra') == (False, None)
+
+
+def test_cambio_de_costo_pide_rehash():
+    viejo = ServicioContrasenas('pbkdf2', 1000, hilos=0).hashear('secreta1')
+    servicio = ServicioContrasenas('pbkdf2', 2000, hilos=0)
+    assert servicio.necesita_rehash(viejo)
+    correcta, hash_nuevo = servicio.verificar(viejo, 'secreta1')
+    assert correcta and not servicio.necesita_rehash(hash_nuevo)
+
+
+def test_login_reemplaza_el_hash_antiguo(cliente, bd):
+    user_id = Usuario.crear_usuario('Ana', 'Díaz', 'ana@mercadovecino.co', '300',
+                                    hashlib.sha256(b'secreta1').hexdigest())
+
+    resp = cliente.post('/login', data={'correo': 'ana@mercadovecino.co', 'contraseña': 'secreta1'})
+    assert resp.status_code == 302
+
+    guardado = bd.execute_query("SELECT password_hash FROM usuarios WHERE id_usuario = %s", (user_id,))
+    assert guardado[0]['password_hash'].startswith('pbkdf2:sha256:1000$')
+
+
+def test_registro_usa_el_servicio(cliente, bd):
+    cliente.post('/registrar', data={'nombre': 'Ana', 'apellido': 'Díaz', 'correo': 'ana@mercadovecino.co',
+                                     'contraseña': 'secreta1', 'confirm_password': 'secreta1'})
+    guardado = bd.execute_query("SELECT password_hash FROM usuarios")
+    assert guardado[0]['password_hash'].startswith('pbkdf2:sha256:1000$')
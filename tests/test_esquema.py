@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+import esquema
+from conexion import ErrorBD
+
+
+def _versiones(carpeta):
+    return sorted(archivo.split('_')[0] for archivo in os.listdir(carpeta) if archivo.endswith('.sql'))
+
+
+def test_mysql_y_sqlite_tienen_las_mismas_migraciones():
+    assert _versiones(esquema.MIGRACIONES_DIR) == _versiones(os.path.join(esquema.MIGRACIONES_DIR, 'sqlite'))
+
+
+def test_sentencias_respeta_triggers_y_comentarios():
+    sql = """
+        -- comentario; con punto y coma
+        CREATE TABLE a (x INT);
+        CREATE TRIGGER t AFTER INSERT ON a BEGIN
+            UPDATE a SET x = 1;
+            UPDATE a SET x = 2;
+        END;
+        INSERT INTO a VALUES (1);
+    """
+    sentencias = esquema._sentencias(sql)
+    assert len(sentencias) == 3
+    assert sentencias[1].startswith('CREATE TRIGGER') and sentencias[1].endswith('END')
+
+
+def test_migrar_es_idempotente(bd):
+    versiones = [version for version, _, _ in esquema.listar_migraciones()]
+    aplicadas = [fila['version'] for fila in bd.execute_query("SELECT version FROM schema_migraciones ORDER BY version")]
+    assert aplicadas == versiones
+    assert esquema.migrar() == []
+
+
+def test_migrar_hasta_una_version(bd, tmp_path):
+    bd.disconnect()
+    bd.ruta = str(tmp_path / 'parcial.db')
+    assert esquema.migrar(2) == [1, 2]
+    assert esquema.migrar() == [version for version, _, _ in esquema.listar_migraciones()][2:]
+
+
+def test_migracion_fallida_se_deshace_completa(bd, tmp_path, monkeypatch):
+    carpeta = tmp_path / 'migraciones'
+    (carpeta / 'sqlite').mkdir(parents=True)
+    (carpeta / 'sqlite' / '900_rota.sql').write_text(
+        "CREATE TABLE nueva (x INT);\nINSERT INTO no_existe VALUES (1);\n", encoding='utf-8')
+    monkeypatch.setattr(esquema, 'MIGRACIONES_DIR', str(carpeta))
+
+    with pytest.raises(ErrorBD):
+        esquema.migrar()
+    assert bd.execute_query("SELECT name FROM sqlite_master WHERE name = 'nueva'") == []
+    assert bd.execute_query("SELECT version FROM schema_migraciones WHERE version = 900") == []
+
+
+def test_consultas_models_cubre_todos_los_metodos():
+    import inspect
+    import models
+
+    metodos = {f"{nombre}.{metodo}"
+               for nombre, clase in inspect.getmembers(models, inspect.isclass) if clase.__module__ == 'models'
+               for metodo, _ in inspect.getmembers(clase, inspect.isfunction) if not metodo.startswith('_')}
+    consultados = {metodo for metodo, _, _ in esquema.consultas_models()}
+    assert consultados <= metodos
+    assert {'Producto.obtener_productos', 'Pedido.crear_pedido_completo', 'ResumenVendedor.panel'} <= consultados
+
+
+def test_verificar_indices_sin_mysql_no_pasa(bd, monkeypatch):
+    assert esquema.reportar_indices() is None
+    monkeypatch.setattr('sys.argv', ['esquema.py', 'verificar'])
+    assert esquema.main() == 2
+
+    from app import app
+    resultado = app.test_cli_runner().invoke(args=['verificar-indices'])
+    assert resultado.exit_code == 2 and 'omitida' in resultado.output
@@ -0,0 +1,68 @@
+import gzip
+
+import pytest
+from flask import Flask, url_for
+
+import estaticos
+from estaticos import ManifiestoEstaticos
+
+
+@pytest.fixture
+def app(tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'index.css').write_text('body { color: red; }\n' * 200)
+    (tmp_path / 'imagenes' / 'perfiles').mkdir(parents=True)
+    (tmp_path / 'imagenes' / 'perfiles' / 'foto.png').write_bytes(b'\x89PNG')
+
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path='/static')
+    estaticos.iniciar(app)
+    return app
+
+
+def test_url_lleva_el_hash_del_contenido(app):
+    manifiesto = app.extensions['estaticos']
+    with app.test_request_context():
+        url = url_for('static', filename='css/index.css')
+    assert url.startswith('/static/css/index.') and url.endswith('.css') and url != '/static/css/index.css'
+    assert 'imagenes/perfiles/foto.png' not in manifiesto.urls
+
+
+def test_respuesta_inmutable_y_comprimida(app):
+    with app.test_request_context():
+        url = url_for('static', filename='css/index.css')
+    cliente = app.test_client()
+
+    resp = cliente.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert resp.headers['Cache-Control'] == f'public, max-age={estaticos.UN_AÑO}, immutable'
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(resp.data) == b'body { color: red; }\n' * 200
+    assert 'Accept-Encoding' in resp.headers['Vary']
+
+    sin_comprimir = cliente.get(url)
+    assert sin_comprimir.data == b'body { color: red; }\n' * 200
+    assert cliente.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': resp.headers['ETag']}).status_code == 304
+
+
+def test_etag_distinto_por_codificacion(app):
+    with app.test_request_context():
+        url = url_for('static', filename='css/index.css')
+    cliente = app.test_client()
+
+    etags = {codificacion: cliente.get(url, headers={'Accept-Encoding': codificacion}).headers['ETag']
+             for codificacion in ('identity', 'gzip')}
+    assert etags['identity'] != etags['gzip'] and not etags['gzip'].startswith('W/')
+    # El ETag del cuerpo gzip no sirve para validar el cuerpo sin comprimir
+    assert cliente.get(url, headers={'If-None-Match': etags['gzip']}).status_code == 200
+
+
+def test_archivos_excluidos_se_sirven_como_siempre(app):
+    resp = app.test_client().get('/static/imagenes/perfiles/foto.png')
+    assert resp.status_code == 200 and resp.data == b'\x89PNG'
+    assert 'immutable' not in resp.headers.get('Cache-Control', '')
+
+
+def test_contenido_distinto_cambia_la_url(tmp_path):
+    (tmp_path / 'app.js').write_text('uno')
+    antes = ManifiestoEstaticos(str(tmp_path)).construir().url('app.js')
+    (tmp_path / 'app.js').write_text('dos')
+    assert ManifiestoEstaticos(str(tmp_path)).construir().url('app.js') != antes
@@ -0,0 +1,73 @@
+from favoritos import CacheFavoritos, cache_favoritos
+from models import Favorito
+from perfilador import PerfiladorConsultas
+
+
+def test_generacion_descarta_lecturas_viejas():
+    cache = CacheFavoritos(ttl=60)
+    generacion = cache.generacion()
+    cache.invalidar(1)
+    cache.set(1, {5}, generacion)
+    assert cache.get(1) is None
+
+    cache.set(1, {5}, cache.generacion())
+    assert cache.get(1) == frozenset({5})
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'invalidations': 1, 'entries': 1}
+
+
+def test_ttl_cero_no_guarda():
+    cache = CacheFavoritos(ttl=0)
+    cache.set(1, {5})
+    assert cache.get(1) is None
+
+
+def test_expulsion_lru():
+    cache = CacheFavoritos(max_entries=2, ttl=60)
+    for user_id in (1, 2):
+        cache.set(user_id, {user_id})
+    cache.get(1)
+    cache.set(3, {3})
+    assert cache.get(2) is None and cache.get(1) == frozenset({1})
+
+
+def test_estados_sin_consultas(bd, crear_usuario, crear_producto, monkeypatch):
+    user_id = crear_usuario()
+    vendedor_id = crear_usuario('VENDEDOR')
+    miel, pan = crear_producto(vendedor_id, 'Miel'), crear_producto(vendedor_id, 'Pan')
+    Favorito.agregar_favorito(user_id, miel)
+    Favorito.ids_favoritos(user_id)
+
+    monkeypatch.setattr(bd, 'perfilador', PerfiladorConsultas())
+    bd.perfilador.iniciar_peticion('prueba')
+    assert Favorito.estados(user_id, [miel, pan, 999]) == {miel: True, pan: False, 999: False}
+    assert Favorito.es_favorito(user_id, miel)
+    assert bd.perfilador.totales()[0] == 0
+
+
+def test_agregar_y_quitar_invalidan(bd, crear_usuario, crear_producto):
+    user_id = crear_usuario()
+    miel = crear_producto(crear_usuario('VENDEDOR'), 'Miel')
+    assert Favorito.ids_favoritos(user_id) == frozenset()
+    invalidaciones = cache_favoritos.stats()['invalidations']
+
+    assert Favorito.alternar(user_id, miel) is True
+    assert Favorito.ids_favoritos(user_id) == frozenset({miel})
+    assert Favorito.alternar(user_id, miel) is False
+    assert Favorito.ids_favoritos(user_id) == frozenset()
+    assert cache_favoritos.stats()['invalidations'] == invalidaciones + 2
+
+
+def test_alternar_producto_inexistente(bd, crear_usuario):
+    assert Favorito.alternar(crear_usuario(), 999) is False
+
+
+def test_api(cliente, crear_usuario, crear_producto, iniciar_sesion):
+    miel = crear_producto(crear_usuario('VENDEDOR'), 'Miel')
+    assert cliente.get('/api/favoritos').status_code == 401
+
+    iniciar_sesion(crear_usuario())
+    assert cliente.post(f'/api/favoritos/{miel}').get_json() == {'id': miel, 'favorito': True}
+    assert cliente.get('/api/favoritos').get_json() == {'favoritos': [miel]}
+    assert cliente.get(f'/api/favoritos?ids={miel},999').get_json() == \
+        {'favoritos': {str(miel): True, '999': False}}
+    assert cliente.get('/api/favoritos?ids=a,b').status_code == 400
@@ -0,0 +1,84 @@
+import re
+
+from flask import Flask, request
+
+import fragmentos
+from fragmentos import CacheFragmentos
+
+
+def _consultas(resp):
+    return int(re.search(r'desc="(\d+) consultas"', resp.headers['Server-Timing']).group(1))
+
+
+def test_cambio_de_version_vacia_la_cache():
+    cache = CacheFragmentos(max_entries=2)
+    assert cache.get('v1', 'a') is None
+    cache.set('v1', 'a', '<p>a</p>')
+    assert cache.get('v1', 'a') == '<p>a</p>'
+    assert cache.get('v2', 'a') is None
+    # Lo renderizado con una versión vieja no se guarda
+    cache.set('v1', 'a', '<p>viejo</p>')
+    assert cache.get('v2', 'a') is None
+
+
+def test_lru():
+    cache = CacheFragmentos(max_entries=2)
+    cache.get('v1', 'a')
+    for clave in ('a', 'b', 'c'):
+        cache.set('v1', clave, clave)
+    assert cache.get('v1', 'a') is None
+    assert cache.stats()['entries'] == 2
+
+
+def test_pagina_anonima_sale_de_la_cache(cliente, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    crear_producto(vendedor_id, 'Miel de montaña')
+
+    primera = cliente.get('/')
+    assert 'Miel de montaña' in primera.get_data(as_text=True)
+    segunda = cliente.get('/')
+    assert segunda.data == primera.data
+    # Solo queda la lectura de la versión del catálogo
+    assert _consultas(segunda) < _consultas(primera)
+    assert _consultas(segunda) <= 1
+
+    crear_producto(vendedor_id, 'Panela orgánica')
+    assert 'Panela orgánica' in cliente.get('/').get_data(as_text=True)
+
+
+def test_usuarios_conectados_no_reciben_la_pagina_anonima(cliente, crear_usuario, iniciar_sesion):
+    user_id = crear_usuario(nombre='Ana')
+    cliente.get('/')
+    iniciar_sesion(user_id)
+    assert 'Ana' in cliente.get('/').get_data(as_text=True)
+
+
+def test_parametros_desconocidos_no_ocupan_la_cache(cliente):
+    cliente.get('/')
+    entradas = fragmentos.cache_fragmentos.stats()['entries']
+    for i in range(5):
+        cliente.get(f'/?utm_source=x{i}&q=aleatorio{i}')
+    assert fragmentos.cache_fragmentos.stats()['entries'] == entradas
+
+
+def test_clave_con_los_argumentos_de_la_vista(bd):
+    app = Flask(__name__)
+    app.secret_key = 'prueba'
+    renders = []
+
+    @app.route('/lista')
+    @fragmentos.pagina_anonima(argumentos=('categoria', 'q'))
+    def lista():
+        renders.append(request.full_path)
+        return 'ok'
+
+    cliente = app.test_client()
+    cliente.get('/lista?categoria=Frutas')
+    cliente.get('/lista?utm=1&categoria=Frutas%20')
+    assert len(renders) == 1
+    cliente.get('/lista?categoria=Verduras')
+    assert len(renders) == 2
+    # Las búsquedas de texto libre se renderizan siempre
+    cliente.get('/lista?q=miel')
+    cliente.get('/lista?q=miel')
+    assert len(renders) == 4
@@ -0,0 +1,85 @@
+import time
+
+from flask import Flask
+
+import identidad
+from identidad import CacheUsuarios
+from models import Usuario
+
+
+def test_cache_ttl_lru_y_correo():
+    cache = CacheUsuarios(max_entries=2, ttl=0.05)
+    cache.set({'id_usuario': 1, 'correo': 'Ana@mercadovecino.co'})
+    cache.set({'id_usuario': 2, 'correo': 'bea@mercadovecino.co'})
+    assert cache.id_por_correo('ana@MERCADOVECINO.co') == 1
+    cache.get(1)
+    cache.set({'id_usuario': 3, 'correo': 'cami@mercadovecino.co'})
+    assert cache.get(2) is None
+    assert cache.id_por_correo('bea@mercadovecino.co') is None
+    time.sleep(0.06)
+    assert cache.get(1) is None
+
+
+def test_cache_entrega_copias():
+    cache = CacheUsuarios()
+    cache.set({'id_usuario': 1, 'nombre': 'Ana'})
+    cache.get(1)['nombre'] = 'Otra'
+    assert cache.get(1)['nombre'] == 'Ana'
+
+
+def test_una_lectura_por_peticion():
+    lecturas = []
+
+    def cargar(user_id):
+        lecturas.append(user_id)
+        return {'id_usuario': user_id, 'correo': 'ana@mercadovecino.co'}
+
+    with Flask(__name__).test_request_context():
+        identidad.cache_usuarios.clear()
+        primero = identidad.por_id(1, cargar)
+        assert identidad.por_id(1, cargar) is primero
+        assert identidad.por_correo('ANA@mercadovecino.co', cargar) is primero
+    assert lecturas == [1]
+
+
+def test_entre_peticiones_usa_la_cache_hasta_invalidar(bd, crear_usuario):
+    user_id = crear_usuario(nombre='Ana')
+    assert Usuario.buscar_por_id(user_id)['nombre'] == 'Ana'
+
+    # Otro proceso cambia el usuario: la caché sigue sirviendo la fila anterior
+    bd.execute_update("UPDATE usuarios SET nombre = 'Bea' WHERE id_usuario = %s", (user_id,))
+    assert Usuario.buscar_por_id(user_id)['nombre'] == 'Ana'
+
+    Usuario.actualizar_usuario(user_id, {'apellido': 'Díaz'})
+    usuario = Usuario.buscar_por_id(user_id)
+    assert (usuario['nombre'], usuario['apellido']) == ('Bea', 'Díaz')
+
+
+def test_usuario_inexistente(bd):
+    assert Usuario.buscar_por_id(999) is None
+    assert Usuario.buscar_por_correo('nadie@mercadovecino.co') is None
+
+
+def test_lectura_vieja_no_se_guarda_tras_invalidar():
+    cache = CacheUsuarios()
+    generacion = cache.generacion()
+    cache.invalidar(1)
+    cache.set({'id_usuario': 1, 'correo': 'ana@mercadovecino.co'}, generacion)
+    assert cache.get(1) is None and cache.id_por_correo('ana@mercadovecino.co') is None
+
+
+def test_login_no_usa_el_hash_cacheado(bd, cliente, crear_usuario):
+    import contrasenas
+
+    user_id = crear_usuario(correo='ana@mercadovecino.co', contraseña='vieja-123')
+    assert Usuario.buscar_por_correo('ana@mercadovecino.co')['id_usuario'] == user_id
+
+    # Otro worker cambia la contraseña: la caché de este proceso aún tiene el hash anterior
+    bd.execute_update("UPDATE usuarios SET password_hash = %s WHERE id_usuario = %s",
+                      (contrasenas.hashear('nueva-123'), user_id))
+    cliente.post('/login', data={'correo': 'ana@mercadovecino.co', 'contraseña': 'vieja-123'})
+    with cliente.session_transaction() as sesion:
+        assert 'user_id' not in sesion
+    cliente.post('/login', data={'correo': 'ana@mercadovecino.co', 'contraseña': 'nueva-123'})
+    with cliente.session_transaction() as sesion:
+        assert sesion['user_id'] == user_id
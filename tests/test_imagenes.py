@@ -0,0 +1,83 @@
+import io
+import os
+
+import pytest
+
+import imagenes
+from imagenes import ImagenInvalida
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.fixture(autouse=True)
+def static_temporal(tmp_path, monkeypatch):
+    monkeypatch.setattr(imagenes, 'STATIC_DIR', str(tmp_path))
+    return tmp_path
+
+
+def _png(ancho=1200, alto=600, modo='RGB'):
+    salida = io.BytesIO()
+    Image.new(modo, (ancho, alto), (200, 30, 30, 128) if modo == 'RGBA' else (200, 30, 30)).save(salida, 'PNG')
+    return salida.getvalue()
+
+
+def test_leer_subida_valida_la_cabecera():
+    datos, formato = imagenes.leer_subida(io.BytesIO(_png()))
+    assert formato == 'PNG'
+    with pytest.raises(ImagenInvalida):
+        imagenes.leer_subida(io.BytesIO(b'esto no es una imagen'))
+
+
+def test_leer_subida_rechaza_archivos_grandes(monkeypatch):
+    monkeypatch.setattr(imagenes, 'MAX_BYTES', 10)
+    with pytest.raises(ImagenInvalida):
+        imagenes.leer_subida(io.BytesIO(_png()))
+
+
+def test_procesar_genera_variantes(static_temporal):
+    datos = _png(modo='RGBA')
+    ruta = imagenes.procesar(datos, 'perfiles')
+    assert ruta == imagenes.nombre_base(datos, 'perfiles') + '_256.jpg'
+
+    for ext in ('webp', 'jpg'):
+        for lado in (96, 256):
+            with Image.open(static_temporal / f"{ruta[:-8]}_{lado}.{ext}") as img:
+                assert max(img.size) == lado
+    assert not [nombre for nombre in os.listdir(static_temporal / 'imagenes' / 'perfiles') if nombre.endswith('.tmp')]
+
+
+def test_misma_imagen_no_se_procesa_dos_veces(static_temporal, monkeypatch):
+    datos = _png()
+    imagenes.procesar(datos, 'perfiles')
+    monkeypatch.setattr(imagenes, '_guardar', lambda *args, **kwargs: pytest.fail("se volvió a guardar"))
+    imagenes.procesar(datos, 'perfiles')
+
+
+def test_misma_imagen_en_varios_hilos(static_temporal):
+    from concurrent.futures import ThreadPoolExecutor
+
+    datos = _png()
+    with ThreadPoolExecutor(8) as hilos:
+        rutas = set(hilos.map(lambda _: imagenes.procesar(datos, 'productos'), range(8)))
+    assert len(rutas) == 1
+    with Image.open(static_temporal / rutas.pop()) as img:
+        img.verify()
+    assert not [nombre for nombre in os.listdir(static_temporal / 'imagenes' / 'productos') if nombre.endswith('.tmp')]
+
+
+def test_guardar_fallido_no_deja_temporales(static_temporal):
+    with pytest.raises(KeyError):
+        imagenes._guardar(Image.new('RGB', (4, 4)), str(static_temporal / 'x.jpg'), 'FORMATO_INEXISTENTE')
+    assert os.listdir(static_temporal) == []
+
+
+def test_segundo_plano_avisa_al_terminar():
+    rutas = []
+    futuro = imagenes.procesar_en_segundo_plano(_png(), 'productos', al_terminar=rutas.append)
+    assert futuro.result(timeout=10) == rutas[0]
+
+
+def test_variantes():
+    ruta = 'imagenes/perfiles/' + 'a' * 32 + '_256.jpg'
+    assert imagenes.variantes(ruta)['webp'] == [(ruta[:-8] + '_96.webp', 96), (ruta[:-8] + '_256.webp', 256)]
+    assert imagenes.variantes('imagenes/perfiles/foto_vieja.png') is None
@@ -0,0 +1,87 @@
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+import importador
+from importador import FilaInvalida, importar, leer_csv, leer_json, leer_ndjson, validar
+
+
+def _binario(texto):
+    return io.BytesIO(texto.encode('utf-8'))
+
+
+def test_leer_csv_detecta_punto_y_coma():
+    filas = list(leer_csv(_binario("Nombre;Precio;Stock\nMiel;12,5;3\n")))
+    assert filas == [{'nombre': 'Miel', 'precio': '12,5', 'stock': '3'}]
+
+
+def test_leer_json_por_bloques():
+    productos = [{'nombre': f'Producto {i}', 'precio': i} for i in range(20)]
+    assert list(leer_json(_binario(json.dumps(productos)), tamaño_bloque=7)) == productos
+    with pytest.raises(FilaInvalida):
+        list(leer_json(_binario('{"nombre": "no es un arreglo"}')))
+    with pytest.raises(FilaInvalida):
+        list(leer_json(_binario('[{"nombre": "cortado"'), tamaño_bloque=4))
+
+
+def test_leer_ndjson_ignora_lineas_vacias():
+    assert list(leer_ndjson(_binario('{"a": 1}\n\n{"a": 2}\n'))) == [{'a': 1}, {'a': 2}]
+    with pytest.raises(FilaInvalida):
+        list(leer_ndjson(_binario('{"a": 1}\n{roto\n')))
+
+
+def test_validar_normaliza():
+    fila = {'nombre': ' Miel ', 'precio': '$ 12000,5', 'stock': '3', 'estado': 'pausado'}
+    assert validar(fila, 1) == (None, 'Miel', None, None, Decimal('12000.5'), 3, 'PAUSADO')
+
+
+@pytest.mark.parametrize('fila', [
+    {'precio': '1'},
+    {'nombre': 'x' * 151, 'precio': '1'},
+    {'nombre': 'Miel', 'precio': 'gratis'},
+    {'nombre': 'Miel', 'precio': 'NaN'},
+    {'nombre': 'Miel', 'precio': 'sNaN'},
+    {'nombre': 'Miel', 'precio': 'Infinity'},
+    {'nombre': 'Miel', 'precio': '-1'},
+    {'nombre': 'Miel', 'precio': '1', 'stock': '-2'},
+    {'nombre': 'Miel', 'precio': '1', 'estado': 'VENDIDO'},
+    ['no', 'es', 'un', 'objeto'],
+])
+def test_validar_rechaza(fila):
+    with pytest.raises(FilaInvalida):
+        validar(fila, 4)
+
+
+def test_importar_guarda_por_lotes_y_actualiza_por_sku(bd, crear_usuario):
+    vendedor_id = crear_usuario('VENDEDOR')
+    filas = [{'sku': f'S{i}', 'nombre': f'Producto {i}', 'precio': '1000', 'stock': '1'} for i in range(7)]
+    filas.insert(3, {'nombre': '', 'precio': '1'})
+    progreso = []
+
+    resumen = importar(vendedor_id, filas, tamaño_lote=3, progreso=progreso.append)
+    assert (resumen['procesadas'], resumen['guardadas'], resumen['invalidas']) == (8, 7, 1)
+    assert resumen['errores'] == ['Fila 4: falta el nombre']
+    assert len(progreso) == 3
+
+    importar(vendedor_id, [{'sku': 'S0', 'nombre': 'Renombrado', 'precio': '5', 'stock': '9'}])
+    productos = bd.execute_query("SELECT nombre, stock FROM productos WHERE sku = 'S0'")
+    assert productos == [{'nombre': 'Renombrado', 'stock': 9}]
+    assert bd.execute_query("SELECT COUNT(*) AS total FROM productos")[0]['total'] == 7
+
+
+def test_lote_con_error_de_base_se_deshace_solo(bd, crear_usuario):
+    vendedor_id = crear_usuario('VENDEDOR')
+    resumen = importar(vendedor_id + 100, [{'nombre': 'Sin vendedor', 'precio': '1'}])
+    assert resumen['guardadas'] == 0 and resumen['invalidas'] == 1
+    assert resumen['errores'][0].startswith('Lote hasta la fila 1')
+
+
+def test_archivo_cortado_guarda_lo_leido(bd, crear_usuario, monkeypatch):
+    vendedor_id = crear_usuario('VENDEDOR')
+    monkeypatch.setattr(importador, 'MAX_OBJETO', 64)
+    archivo = _binario('[{"nombre": "Miel", "precio": 1}, {"nombre": "' + 'x' * 200)
+    resumen = importar(vendedor_id, leer_json(archivo, tamaño_bloque=16))
+    assert resumen['guardadas'] == 1
+    assert resumen['errores'] == ['Fila 2: JSON incompleto o inválido']
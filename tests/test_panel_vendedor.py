@@ -0,0 +1,115 @@
+import time
+
+import pytest
+
+import esquema
+from models import Pedido, Resena, ResumenVendedor
+
+TABLAS = ('ventas_vendedor_dia', 'ventas_producto', 'calificaciones_vendedor_dia')
+
+
+def _resumenes(bd):
+    return {tabla: sorted(tuple(sorted(fila.items())) for fila in bd.execute_query(f"SELECT * FROM {tabla}"))
+            for tabla in TABLAS}
+
+
+def _ventas(crear_usuario, crear_producto):
+    comprador_id = crear_usuario()
+    tienda, granja = crear_usuario('VENDEDOR'), crear_usuario('VENDEDOR')
+    pan = crear_producto(tienda, 'Pan', precio=2000, stock=20)
+    miel = crear_producto(tienda, 'Miel', precio=12000, stock=2)
+    huevos = crear_producto(granja, 'Huevos', precio=500, stock=30)
+    Pedido.crear_pedido_completo(comprador_id, [{'id_producto': pan, 'cantidad': 3},
+                                                {'id_producto': huevos, 'cantidad': 12}])
+    Pedido.crear_pedido_completo(comprador_id, [{'id_producto': pan, 'cantidad': 1},
+                                                {'id_producto': miel, 'cantidad': 2}])
+    Resena.crear_resena(pan, comprador_id, 5)
+    Resena.crear_resena(huevos, comprador_id, 3)
+    return tienda, granja
+
+
+def test_incremental_igual_a_reconstruir(bd, crear_usuario, crear_producto):
+    _ventas(crear_usuario, crear_producto)
+    incremental = _resumenes(bd)
+    assert ResumenVendedor.reconstruir() is not None
+    assert _resumenes(bd) == incremental
+
+
+def test_panel(bd, crear_usuario, crear_producto):
+    tienda, _ = _ventas(crear_usuario, crear_producto)
+    panel = ResumenVendedor.panel(tienda)
+    assert panel['pedidos'] == 2 and panel['ingresos'] == 4 * 2000 + 2 * 12000
+    assert [fila['nombre'] for fila in panel['mas_vendidos']] == ['Pan', 'Miel']
+    assert [fila['nombre'] for fila in panel['stock_bajo']] == ['Miel']
+    assert panel['calificaciones'][0]['promedio'] == 5
+    assert len(panel['pedidos_recientes']) == 2
+
+
+def test_api(cliente, crear_usuario, crear_producto, iniciar_sesion):
+    tienda, _ = _ventas(crear_usuario, crear_producto)
+    assert cliente.get('/api/vendedor/panel').status_code == 401
+
+    iniciar_sesion(crear_usuario())
+    assert cliente.get('/api/vendedor/panel').status_code == 403
+
+    iniciar_sesion(tienda)
+    panel = cliente.get('/api/vendedor/panel?dias=7').get_json()
+    assert panel['ingresos'] == 32000.0
+    assert isinstance(panel['ventas_por_dia'][0]['dia'], str)
+
+
+def test_migracion_suma_los_pedidos_anteriores(bd, crear_usuario, crear_producto, tmp_path):
+    bd.disconnect()
+    bd.ruta = str(tmp_path / 'anterior.db')
+    esquema.migrar(destino=5)
+    comprador_id, tienda = crear_usuario(), crear_usuario('VENDEDOR')
+    pan = crear_producto(tienda, 'Pan', precio=2000)
+    # Pedidos y reseñas escritos antes de que existieran las tablas de resumen
+    for cantidad in (1, 4):
+        pedido_id = bd.execute_insert("INSERT INTO pedidos (id_comprador, id_vendedor, total) VALUES (%s, %s, %s)",
+                                      (comprador_id, tienda, cantidad * 2000))
+        bd.execute_insert("INSERT INTO pedido_items (id_pedido, id_producto, cantidad, precio_unitario) "
+                          "VALUES (%s, %s, %s, 2000)", (pedido_id, pan, cantidad))
+    bd.execute_insert("INSERT INTO resenas (id_producto, id_comprador, calificacion) VALUES (%s, %s, 4)",
+                      (pan, comprador_id))
+
+    esquema.migrar()
+    migrado = _resumenes(bd)
+    assert [(fila['pedidos'], fila['unidades']) for fila in ResumenVendedor.ventas_por_dia(tienda)] == [(2, 5)]
+
+    ResumenVendedor.reconstruir()
+    assert _resumenes(bd) == migrado
+
+
+def test_pedido_por_partes_suma_a_los_resumenes(bd, crear_usuario, crear_producto):
+    comprador_id, tienda = crear_usuario(), crear_usuario('VENDEDOR')
+    pan = crear_producto(tienda, 'Pan', precio=2000)
+    pedido_id = Pedido.crear_pedido(comprador_id, tienda, 6000)
+    assert Pedido.agregar_item_pedido(pedido_id, pan, 3, 2000)
+    assert Pedido.agregar_item_pedido(pedido_id + 100, pan, 1, 2000) is None
+
+    incremental = _resumenes(bd)
+    assert incremental['ventas_producto'][0] == (('id_producto', pan), ('id_vendedor', tienda),
+                                                 ('ingresos', 6000), ('unidades', 3))
+    ResumenVendedor.reconstruir()
+    assert _resumenes(bd) == incremental
+
+
+@pytest.mark.skipif(not hasattr(time, 'tzset'), reason="requiere time.tzset")
+@pytest.mark.parametrize('zona', ['Pacific/Kiritimati', 'Pacific/Pago_Pago'])
+def test_ventana_de_dias_con_el_reloj_de_la_base(bd, crear_usuario, crear_producto, monkeypatch, zona):
+    tienda, _ = _ventas(crear_usuario, crear_producto)
+    # El proceso en una zona de +14h o -11h: su fecha difiere casi siempre de la de SQLite (UTC)
+    monkeypatch.setenv('TZ', zona)
+    time.tzset()
+    try:
+        assert [fila['pedidos'] for fila in ResumenVendedor.ventas_por_dia(tienda, dias=1)] == [2]
+        assert len(ResumenVendedor.tendencia_calificaciones(tienda, dias=1)) == 1
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    hoy = bd.execute_query("SELECT CURRENT_DATE AS hoy")[0]['hoy']
+    bd.execute_update("UPDATE ventas_vendedor_dia SET dia = date(%s, '-30 days')", (hoy,))
+    assert ResumenVendedor.ventas_por_dia(tienda, dias=30) == []
+    assert len(ResumenVendedor.ventas_por_dia(tienda, dias=31)) == 1
@@ -0,0 +1,89 @@
+import threading
+from decimal import Decimal
+
+import pytest
+
+from models import Pedido, Producto, StockInsuficiente
+
+
+def _stock(bd, producto_id):
+    return bd.execute_query("SELECT stock FROM productos WHERE id_producto = %s", (producto_id,))[0]['stock']
+
+
+def test_un_pedido_por_vendedor_con_precios_de_la_base(bd, crear_usuario, crear_producto):
+    comprador_id = crear_usuario()
+    vendedor_a = crear_usuario('VENDEDOR')
+    vendedor_b = crear_usuario('VENDEDOR')
+    pan = crear_producto(vendedor_a, 'Pan', precio=2000, stock=5)
+    leche = crear_producto(vendedor_a, 'Leche', precio=3500, stock=5)
+    miel = crear_producto(vendedor_b, 'Miel', precio=12000, stock=5)
+
+    pedido_ids = Pedido.crear_pedido_completo(comprador_id, [
+        {'id_producto': pan, 'cantidad': 2},
+        {'id_producto': miel, 'cantidad': 1},
+        {'id_producto': leche, 'cantidad': 1},
+        {'id_producto': pan, 'cantidad': 1},
+    ])
+
+    assert len(pedido_ids) == 2
+    totales = {fila['id_vendedor']: fila['total'] for fila in bd.execute_query(
+        "SELECT id_vendedor, total FROM pedidos")}
+    assert totales == {vendedor_a: Decimal('9500'), vendedor_b: Decimal('12000')}
+    assert [_stock(bd, pid) for pid in (pan, leche, miel)] == [2, 4, 4]
+
+
+def test_stock_insuficiente_no_deja_nada_a_medias(bd, crear_usuario, crear_producto):
+    comprador_id = crear_usuario()
+    vendedor_id = crear_usuario('VENDEDOR')
+    pan = crear_producto(vendedor_id, 'Pan', stock=5)
+    miel = crear_producto(vendedor_id, 'Miel', stock=1)
+
+    with pytest.raises(StockInsuficiente) as error:
+        Pedido.crear_pedido_completo(comprador_id, [{'id_producto': pan, 'cantidad': 1},
+                                                    {'id_producto': miel, 'cantidad': 2}])
+
+    assert error.value.producto_id == miel and error.value.disponible == 1
+    assert _stock(bd, pan) == 5
+    assert bd.execute_query("SELECT COUNT(*) AS total FROM pedidos")[0]['total'] == 0
+
+
+def test_producto_no_publicado_no_se_vende(bd, crear_usuario, crear_producto):
+    comprador_id = crear_usuario()
+    vendedor_id = crear_usuario('VENDEDOR')
+    producto_id = crear_producto(vendedor_id, 'Pausado', stock=5)
+    Producto.actualizar_producto(producto_id, {'estado': 'PAUSADO'})
+
+    with pytest.raises(StockInsuficiente):
+        Pedido.crear_pedido_completo(comprador_id, [{'id_producto': producto_id, 'cantidad': 1}])
+
+
+def test_cantidades_invalidas(bd, crear_usuario):
+    comprador_id = crear_usuario()
+    assert Pedido.crear_pedido_completo(comprador_id, []) is None
+    assert Pedido.crear_pedido_completo(comprador_id, [{'id_producto': 1, 'cantidad': 0}]) is None
+    for item in ({'id_producto': 1}, {'id_producto': 1, 'cantidad': None},
+                 {'id_producto': 1, 'cantidad': 'dos'}, {'id_producto': 'uno', 'cantidad': 1}, None):
+        assert Pedido.crear_pedido_completo(comprador_id, [item]) is None
+
+
+def test_compras_simultaneas_no_venden_de_mas(bd, crear_usuario, crear_producto):
+    comprador_id = crear_usuario()
+    vendedor_id = crear_usuario('VENDEDOR')
+    producto_id = crear_producto(vendedor_id, 'Última unidad', stock=3)
+    resultados = []
+
+    def comprar():
+        try:
+            resultados.append(bool(Pedido.crear_pedido_completo(
+                comprador_id, [{'id_producto': producto_id, 'cantidad': 1}])))
+        except StockInsuficiente:
+            resultados.append(False)
+
+    hilos = [threading.Thread(target=comprar) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert resultados.count(True) == 3
+    assert _stock(bd, producto_id) == 0
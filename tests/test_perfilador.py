@@ -0,0 +1,67 @@
+import json
+
+from perfilador import Histograma, PerfiladorConsultas, huella
+
+
+def test_huella_quita_los_valores():
+    assert huella("SELECT * FROM p WHERE id IN (1, 2, 3) AND n = 'x'") == \
+        huella("SELECT *\n FROM p WHERE id IN (%s) AND n = %s") == \
+        "SELECT * FROM p WHERE id IN (...) AND n = ?"
+    assert huella("INSERT INTO t VALUES (%s, %s), (%s, %s)") == "INSERT INTO t VALUES (...)"
+
+
+def test_histograma_acumulado():
+    histograma = Histograma((1, 5))
+    for valor in (0, 3, 3, 9):
+        histograma.observar(valor)
+    assert list(histograma.lineas('x', 'r="a"')) == [
+        'x_bucket{r="a",le="1"} 1', 'x_bucket{r="a",le="5"} 3', 'x_bucket{r="a",le="+Inf"} 4',
+        'x_sum{r="a"} 15.000000', 'x_count{r="a"} 4',
+    ]
+
+
+def test_totales_de_la_peticion_y_huellas_acotadas():
+    perfilador = PerfiladorConsultas(umbral_lento=10, max_huellas=1)
+    perfilador.iniciar_peticion('index')
+    perfilador.registrar("SELECT 1 FROM a", 0.01, 1)
+    perfilador.registrar("SELECT 1 FROM b", 0.02, 3)
+    assert perfilador.totales() == (2, 0.03)
+    perfilador.terminar_peticion()
+
+    metricas = '\n'.join(perfilador.metricas())
+    assert 'mercadovecino_db_queries_per_request_count{route="index"} 1' in metricas
+    assert 'mercadovecino_db_fingerprint_queries_total{query="otras"} 1' in metricas
+
+
+def test_consultas_lentas_al_registro(tmp_path):
+    registro = tmp_path / 'lentas.log'
+    perfilador = PerfiladorConsultas(umbral_lento=0.1, registro_lento=str(registro))
+    perfilador.registrar("SELECT * FROM productos WHERE id_producto = 7", 0.25, 1)
+    perfilador.registrar("SELECT 1", 0.01, 1)
+
+    lineas = registro.read_text(encoding='utf-8').splitlines()
+    assert len(lineas) == 1
+    entrada = json.loads(lineas[0])
+    assert entrada['ms'] == 250.0 and entrada['huella'] == "SELECT * FROM productos WHERE id_producto = ?"
+    assert perfilador.lentas == 1
+
+
+def test_server_timing_y_metrics(cliente, crear_usuario, crear_producto):
+    crear_producto(crear_usuario('VENDEDOR'), 'Miel')
+    resp = cliente.get('/api/productos')
+    assert resp.headers['Server-Timing'].startswith('db;dur=')
+    assert 'consultas"' in resp.headers['Server-Timing']
+
+    metricas = cliente.get('/metrics').get_data(as_text=True)
+    assert 'mercadovecino_db_query_seconds_bucket{route="api_productos"' in metricas
+
+
+def test_stream_ndjson_se_registra(cliente, crear_usuario, crear_producto):
+    from conexion import db
+
+    crear_producto(crear_usuario('VENDEDOR'), 'Miel')
+    antes = {sql: list(totales) for sql, totales in db.perfilador._huellas.items()}
+    cliente.get('/api/productos?formato=ndjson').get_data()
+    cambiadas = [sql for sql, totales in db.perfilador._huellas.items()
+                 if 'ORDER BY p.id_producto DESC' in sql and totales != antes.get(sql)]
+    assert cambiadas
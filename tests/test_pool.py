@@ -0,0 +1,195 @@
+import threading
+import time
+
+import pytest
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+from conexion import ConnectionPool, DatabaseConnection
+
+
+class ConexionFalsa:
+    """Lo que ConnectionPool usa de una conexión de mysql-connector"""
+
+    def __init__(self):
+        self.cerrada = False
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.falla_ping = False
+
+    def ping(self, reconnect=False):
+        if self.falla_ping:
+            raise Error("conexión perdida")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.cerrada = True
+
+
+def crear_pool(**opciones):
+    abiertas = []
+
+    def fabrica():
+        conn = ConexionFalsa()
+        abiertas.append(conn)
+        return conn
+
+    return ConnectionPool(fabrica, **opciones), abiertas
+
+
+def test_reutiliza_la_conexion_devuelta():
+    pool, abiertas = crear_pool(min_size=0, max_size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert len(abiertas) == 1
+
+
+def test_fill_abre_el_minimo():
+    pool, abiertas = crear_pool(min_size=3, max_size=5)
+    pool.fill()
+    assert len(abiertas) == 3
+    assert pool.stats() == {'abiertas': 3, 'inactivas': 3, 'en_uso': 0, 'max': 5}
+
+
+def test_espera_y_falla_al_llegar_al_maximo():
+    pool, _ = crear_pool(min_size=0, max_size=1, timeout=0.05)
+    pool.acquire()
+    inicio = time.monotonic()
+    with pytest.raises(PoolError):
+        pool.acquire()
+    assert time.monotonic() - inicio >= 0.05
+
+
+def test_release_despierta_a_quien_espera():
+    pool, _ = crear_pool(min_size=0, max_size=1, timeout=2)
+    conn = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(conn,)).start()
+    assert pool.acquire() is conn
+
+
+def test_release_deshace_la_transaccion_abierta():
+    pool, _ = crear_pool(min_size=0, max_size=1)
+    conn = pool.acquire()
+    conn.in_transaction = True
+    pool.release(conn)
+    assert conn.rollbacks == 1
+
+
+def test_conexion_rota_se_descarta():
+    pool, abiertas = crear_pool(min_size=0, max_size=1)
+    conn = pool.acquire()
+    pool.release(conn, broken=True)
+    assert conn.cerrada
+    assert pool.acquire() is not conn
+    assert len(abiertas) == 2
+
+
+def test_ping_fallido_y_reciclaje_descartan():
+    pool, _ = crear_pool(min_size=0, max_size=2, idle_check=0.001, recycle=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.falla_ping = True
+    time.sleep(0.01)
+    assert pool.acquire() is not conn
+    assert conn.cerrada
+
+    pool, _ = crear_pool(min_size=0, max_size=2, idle_check=0, recycle=0.001)
+    conn = pool.acquire()
+    pool.release(conn)
+    time.sleep(0.01)
+    assert pool.acquire() is not conn
+
+
+def test_hilos_nunca_superan_el_maximo():
+    pool, abiertas = crear_pool(min_size=0, max_size=3, timeout=5)
+    en_uso = []
+    maximo = [0]
+    lock = threading.Lock()
+
+    def cliente():
+        for _ in range(20):
+            conn = pool.acquire()
+            with lock:
+                en_uso.append(conn)
+                maximo[0] = max(maximo[0], len(en_uso))
+            time.sleep(0.001)
+            with lock:
+                en_uso.remove(conn)
+            pool.release(conn)
+
+    hilos = [threading.Thread(target=cliente) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert maximo[0] <= 3
+    assert len(abiertas) <= 3
+
+
+def test_close_cierra_las_inactivas_y_rechaza_nuevas():
+    pool, abiertas = crear_pool(min_size=2, max_size=2)
+    pool.fill()
+    pool.close()
+    assert all(conn.cerrada for conn in abiertas)
+    with pytest.raises(PoolError):
+        pool.acquire()
+
+
+def test_conexion_presta_y_devuelve():
+    db = DatabaseConnection(pooled=True, pool_min=0, pool_max=1, pool_timeout=0.05)
+    db.pool, _ = crear_pool(min_size=0, max_size=1, timeout=0.05)
+
+    class Prestada(ConexionFalsa):
+        unread_result = False
+
+    db.pool.factory = Prestada
+    with db.conexion() as conn:
+        assert db.pool.stats()['en_uso'] == 1
+    assert db.pool.stats()['en_uso'] == 0
+    with db.conexion() as otra:
+        assert otra is conn
+
+
+def test_ping_lento_no_bloquea_al_resto():
+    pool, abiertas = crear_pool(min_size=0, max_size=2, idle_check=0.001)
+    lenta, otra = pool.acquire(), pool.acquire()
+    pool.release(lenta)
+    lenta.ping = lambda reconnect=False: time.sleep(0.3)
+    time.sleep(0.01)
+
+    hilo = threading.Thread(target=pool.acquire)
+    hilo.start()
+    time.sleep(0.05)
+    # Mientras el otro hilo hace ping, devolver y pedir conexiones no espera
+    inicio = time.monotonic()
+    pool.release(otra)
+    assert pool.stats()['inactivas'] == 1
+    assert time.monotonic() - inicio < 0.1
+    hilo.join()
+
+
+def test_fabrica_fallida_libera_el_cupo_a_quien_espera():
+    intentos = []
+
+    def fabrica():
+        intentos.append(1)
+        if len(intentos) == 1:
+            time.sleep(0.1)
+            raise Error("servidor caído")
+        return ConexionFalsa()
+
+    pool = ConnectionPool(fabrica, min_size=0, max_size=1, timeout=2)
+    errores = []
+    hilo = threading.Thread(target=lambda: errores.append(pytest.raises(Error, pool.acquire)))
+    hilo.start()
+    time.sleep(0.02)
+
+    inicio = time.monotonic()
+    assert pool.acquire() is not None
+    assert time.monotonic() - inicio < 1
+    hilo.join()
+    assert errores
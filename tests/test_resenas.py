@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+import esquema
+from models import Producto, Resena
+
+
+def _resumen(bd, producto_id):
+    return bd.execute_query("SELECT rating_suma, total_resenas, rating FROM productos WHERE id_producto = %s",
+                            (producto_id,))[0]
+
+
+def test_crear_resena_actualiza_el_resumen(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    comprador_id = crear_usuario()
+    producto_id = crear_producto(vendedor_id, 'Queso')
+
+    assert Resena.crear_resena(producto_id, comprador_id, 5, 'Muy bueno')
+    assert Resena.crear_resena(producto_id, comprador_id, 4)
+
+    assert _resumen(bd, producto_id) == {'rating_suma': 9, 'total_resenas': 2, 'rating': Decimal('4.5')}
+
+
+def test_reconstruir_coincide_con_lo_incremental(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    comprador_id = crear_usuario()
+    productos = [crear_producto(vendedor_id, f'Producto {i}') for i in range(3)]
+    for producto_id, calificaciones in zip(productos, ([5, 3, 4], [1], [])):
+        for calificacion in calificaciones:
+            Resena.crear_resena(producto_id, comprador_id, calificacion)
+    incremental = [_resumen(bd, producto_id) for producto_id in productos]
+
+    bd.execute_update("UPDATE productos SET rating_suma = 0, total_resenas = 0, rating = 0")
+    Resena.reconstruir_ratings()
+
+    assert [_resumen(bd, producto_id) for producto_id in productos] == incremental
+    assert incremental[1]['rating'] == 1
+    assert incremental[2]['total_resenas'] == 0
+
+
+def test_listado_ordenado_por_rating(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    comprador_id = crear_usuario()
+    malo = crear_producto(vendedor_id, 'Malo')
+    bueno = crear_producto(vendedor_id, 'Bueno')
+    Resena.crear_resena(malo, comprador_id, 2)
+    Resena.crear_resena(bueno, comprador_id, 5)
+
+    assert [p['id_producto'] for p in Producto.obtener_productos()] == [bueno, malo]
+
+
+def test_resena_de_producto_inexistente_no_cambia_nada(bd, crear_usuario):
+    comprador_id = crear_usuario()
+    assert Resena.crear_resena(999, comprador_id, 5) is None
+    assert bd.execute_query("SELECT COUNT(*) AS total FROM resenas")[0]['total'] == 0
+
+
+def test_migracion_suma_las_resenas_anteriores(bd, crear_usuario, tmp_path):
+    bd.disconnect()
+    bd.ruta = str(tmp_path / 'anterior.db')
+    esquema.migrar(destino=1)
+    comprador_id, vendedor_id = crear_usuario(), crear_usuario('VENDEDOR')
+    con_resenas, sin_resenas = (
+        bd.execute_insert("INSERT INTO productos (id_vendedor, nombre, precio) VALUES (%s, %s, 1000)",
+                          (vendedor_id, nombre)) for nombre in ('Miel', 'Pan'))
+    for calificacion in (5, 4):
+        bd.execute_insert("INSERT INTO resenas (id_producto, id_comprador, calificacion) VALUES (%s, %s, %s)",
+                          (con_resenas, comprador_id, calificacion))
+
+    esquema.migrar()
+    filas = {fila['id_producto']: fila for fila in bd.execute_query(
+        "SELECT id_producto, rating_suma, total_resenas, rating FROM productos")}
+    assert (filas[con_resenas]['rating_suma'], filas[con_resenas]['total_resenas']) == (9, 2)
+    assert filas[con_resenas]['rating'] == Decimal('4.5')
+    assert (filas[sin_resenas]['total_resenas'], filas[sin_resenas]['rating']) == (0, 0)
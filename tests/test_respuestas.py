@@ -0,0 +1,55 @@
+import gzip
+import json
+
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+import app as aplicacion
+from models import Producto
+from respuestas import comprimir_cuerpo
+
+
+def test_304_sin_ejecutar_la_vista(cliente, crear_usuario, crear_producto, monkeypatch):
+    crear_producto(crear_usuario('VENDEDOR'), 'Miel')
+    primera = cliente.get('/api/productos')
+    assert primera.headers['Cache-Control'] == 'no-cache'
+
+    def no_debe_ejecutarse(*args):
+        raise AssertionError("la vista se ejecutó con un ETag vigente")
+
+    monkeypatch.setattr(aplicacion, 'consulta_api_productos', no_debe_ejecutarse)
+    resp = cliente.get('/api/productos', headers={'If-None-Match': primera.headers['ETag']})
+    assert resp.status_code == 304
+
+
+def test_etag_cambia_cuando_cambia_el_catalogo(cliente, crear_usuario, crear_producto):
+    producto_id = crear_producto(crear_usuario('VENDEDOR'), 'Miel')
+    etag = cliente.get('/api/productos').headers['ETag']
+
+    resp = cliente.get('/api/productos', headers={'If-None-Match': etag})
+    assert resp.status_code == 304 and resp.data == b''
+
+    Producto.actualizar_producto(producto_id, {'precio': 2000})
+    resp = cliente.get('/api/productos', headers={'If-None-Match': etag})
+    assert resp.status_code == 200 and resp.headers['ETag'] != etag
+
+
+def test_json_grande_se_comprime(cliente, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    for i in range(30):
+        crear_producto(vendedor_id, f'Producto con un nombre bastante largo {i}')
+
+    resp = cliente.get('/api/productos', headers={'Accept-Encoding': 'gzip'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert len(json.loads(gzip.decompress(resp.data))['productos']) == 30
+    assert resp.headers['ETag'].startswith('W/')
+
+    resp = cliente.get('/api/productos')
+    assert 'Content-Encoding' not in resp.headers
+
+
+def test_cuerpos_pequenos_no_se_comprimen():
+    aceptadas = parse_accept_header('gzip', Accept)
+    assert comprimir_cuerpo(b'{}', aceptadas) == (b'{}', None)
+    cuerpo, codificacion = comprimir_cuerpo(b'a' * 5000, aceptadas)
+    assert codificacion == 'gzip' and gzip.decompress(cuerpo) == b'a' * 5000
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from sesiones import AlmacenMemoria, AlmacenSQLite
+
+
+@pytest.fixture(params=['memoria', 'sqlite'])
+def almacen(request, tmp_path):
+    if request.param == 'memoria':
+        return AlmacenMemoria(ttl=0.2, max_entries=2)
+    return AlmacenSQLite(str(tmp_path / 'sesiones.db'), ttl=0.2)
+
+
+def test_guardar_leer_borrar(almacen):
+    almacen.set('abc', {'user_id': 1})
+    assert almacen.get('abc') == {'user_id': 1}
+    almacen.delete('abc')
+    assert almacen.get('abc') is None
+
+
+def test_vence_sin_uso(almacen):
+    almacen.set('abc', {'user_id': 1})
+    time.sleep(0.25)
+    assert almacen.get('abc') is None
+
+
+def test_memoria_expulsa_la_menos_usada():
+    almacen = AlmacenMemoria(ttl=60, max_entries=2)
+    almacen.set('a', {})
+    almacen.set('b', {})
+    almacen.get('a')
+    almacen.set('c', {})
+    assert almacen.get('b') is None
+    assert almacen.get('a') == {}
+
+
+def test_memoria_entrega_copias():
+    almacen = AlmacenMemoria(ttl=60)
+    almacen.set('a', {'x': 1})
+    almacen.get('a')['x'] = 2
+    assert almacen.get('a') == {'x': 1}
+
+
+def _cookie(cliente, app):
+    cookie = cliente.get_cookie(app.config['SESSION_COOKIE_NAME'])
+    return cookie.value if cookie else None
+
+
+def test_login_guarda_la_sesion_en_el_servidor(cliente, crear_usuario):
+    from app import app
+
+    crear_usuario(correo='ana@mercadovecino.co', contraseña='secreta1')
+    cliente.get('/login')
+    antes = _cookie(cliente, app)
+
+    cliente.post('/login', data={'correo': 'ana@mercadovecino.co', 'contraseña': 'secreta1'})
+    sid = _cookie(cliente, app)
+    assert sid and sid != antes
+    # La cookie es solo el ID: los datos están en el almacén
+    assert app.session_interface.almacen.get(sid)['user_role'] == 'COMPRADOR'
+    assert 'user_id' not in sid
+
+    cliente.get('/logout')
+    assert app.session_interface.almacen.get(sid) is None
+
+
+def test_estaticos_no_abren_sesion(cliente):
+    from app import app
+
+    resp = cliente.get('/static/js/index.js')
+    assert 'Set-Cookie' not in resp.headers
+    assert _cookie(cliente, app) is None
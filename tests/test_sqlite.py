@@ -0,0 +1,69 @@
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from conexion import ErrorBD, SQLiteConnection, crear_conexion, es_duplicado, traducir_sqlite
+
+
+def test_traducir_sqlite():
+    assert traducir_sqlite("SELECT * FROM p WHERE id = %s FOR UPDATE") == "SELECT * FROM p WHERE id = ?"
+    assert traducir_sqlite("INSERT IGNORE INTO f (a) VALUES (%s)") == "INSERT OR IGNORE INTO f (a) VALUES (?)"
+    assert traducir_sqlite(
+        "INSERT INTO p (a, b) VALUES (%s, %s) ON DUPLICATE KEY UPDATE b = VALUES(b), c = c + VALUES(b)"
+    ) == "INSERT INTO p (a, b) VALUES (?, ?) ON CONFLICT DO UPDATE SET b = excluded.b, c = c + excluded.b"
+
+
+def test_crear_conexion_segun_el_entorno(monkeypatch, tmp_path):
+    monkeypatch.setenv('DB_BACKEND', 'sqlite')
+    monkeypatch.setenv('DB_SQLITE', str(tmp_path / 'otra.db'))
+    conexion = crear_conexion()
+    assert isinstance(conexion, SQLiteConnection) and conexion.ruta == str(tmp_path / 'otra.db')
+
+
+def test_tipos_como_en_mysql(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    producto_id = crear_producto(vendedor_id, 'Miel', precio=Decimal('12500.50'))
+    fila = bd.execute_query("SELECT precio, fecha_registro FROM productos WHERE id_producto = %s", (producto_id,))[0]
+    assert fila['precio'] == Decimal('12500.50')
+    assert isinstance(fila['fecha_registro'], datetime)
+
+    bd.execute_insert("INSERT INTO ventas_vendedor_dia (id_vendedor, dia, pedidos, unidades, ingresos) "
+                      "VALUES (%s, %s, 1, 1, 1)", (vendedor_id, date(2026, 1, 31)))
+    assert bd.execute_query("SELECT dia FROM ventas_vendedor_dia") == [{'dia': date(2026, 1, 31)}]
+
+
+def test_duplicados(bd, crear_usuario):
+    crear_usuario(correo='ana@mercadovecino.co')
+    with pytest.raises(ErrorBD) as error:
+        with bd.transaction():
+            crear_usuario(correo='ana@mercadovecino.co')
+    assert es_duplicado(error.value)
+
+
+def test_upsert_traducido(bd, crear_usuario, crear_producto):
+    vendedor_id = crear_usuario('VENDEDOR')
+    consulta = """
+        INSERT INTO productos (id_vendedor, sku, nombre, precio, stock) VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE nombre = VALUES(nombre), stock = VALUES(stock)
+    """
+    bd.execute_insert(consulta, (vendedor_id, 'A1', 'Miel', 1, 1))
+    bd.execute_insert(consulta, (vendedor_id, 'A1', 'Miel pura', 1, 5))
+    assert bd.execute_query("SELECT nombre, stock FROM productos") == [{'nombre': 'Miel pura', 'stock': 5}]
+
+
+def test_una_conexion_por_hilo(bd):
+    propias = []
+    hilo = threading.Thread(target=lambda: propias.append(bd.get_connection()))
+    hilo.start()
+    hilo.join()
+    assert propias[0] is not bd.get_connection()
+    assert bd.get_connection() is bd.get_connection()
+
+
+def test_disconnect_renueva_las_conexiones(bd):
+    antes = bd.get_connection()
+    bd.disconnect()
+    assert bd.get_connection() is not antes
+    assert bd.execute_query("SELECT 1 AS uno") == [{'uno': 1}]
@@ -0,0 +1,70 @@
+import pytest
+
+from conexion import ErrorBD, _multi_row
+
+
+def _correos(bd):
+    return [fila['correo'] for fila in bd.execute_query("SELECT correo FROM usuarios ORDER BY id_usuario")]
+
+
+def _insertar(bd, correo):
+    return bd.execute_insert("""
+        INSERT INTO usuarios (nombre, correo, password_hash) VALUES ('Ana', %s, 'x')
+    """, (correo,))
+
+
+def test_multi_row():
+    assert _multi_row("INSERT INTO t (a, b) VALUES (%s, %s)", 3) == \
+        "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)"
+    assert _multi_row("INSERT INTO t (a) VALUES (COALESCE(%s, 0)) ON DUPLICATE KEY UPDATE a = VALUES(a)", 2) == \
+        "INSERT INTO t (a) VALUES (COALESCE(%s, 0)), (COALESCE(%s, 0)) ON DUPLICATE KEY UPDATE a = VALUES(a)"
+    assert _multi_row("UPDATE t SET a = %s WHERE b = %s", 2) is None
+    assert _multi_row("INSERT INTO t (a) SELECT a FROM s", 2) is None
+
+
+def test_transaccion_confirma_todo_junto(bd):
+    with bd.transaction():
+        _insertar(bd, 'a@mercadovecino.co')
+        _insertar(bd, 'b@mercadovecino.co')
+    assert _correos(bd) == ['a@mercadovecino.co', 'b@mercadovecino.co']
+
+
+def test_error_deshace_y_se_propaga(bd):
+    with pytest.raises(ErrorBD):
+        with bd.transaction():
+            _insertar(bd, 'a@mercadovecino.co')
+            _insertar(bd, 'a@mercadovecino.co')  # correo único repetido
+    assert _correos(bd) == []
+    # Fuera de una transacción el error se informa y se retorna None
+    assert _insertar(bd, 'a@mercadovecino.co')
+    assert _insertar(bd, 'a@mercadovecino.co') is None
+
+
+def test_transacciones_anidadas_se_unen(bd):
+    with pytest.raises(RuntimeError):
+        with bd.transaction():
+            _insertar(bd, 'a@mercadovecino.co')
+            with bd.transaction():
+                _insertar(bd, 'b@mercadovecino.co')
+            raise RuntimeError("falla después del bloque interno")
+    assert _correos(bd) == []
+
+
+def test_cache_se_invalida_al_confirmar(bd):
+    consulta = "SELECT COUNT(*) AS total FROM usuarios"
+    assert bd.execute_query(consulta, cache=True) == [{'total': 0}]
+    with bd.transaction():
+        _insertar(bd, 'a@mercadovecino.co')
+        assert bd.execute_query(consulta, cache=True) == [{'total': 1}]
+    assert bd.execute_query(consulta, cache=True) == [{'total': 1}]
+
+
+def test_execute_many_en_lotes(bd):
+    filas = ((f'u{i}@mercadovecino.co',) for i in range(25))
+    total = bd.execute_many("INSERT INTO usuarios (nombre, correo, password_hash) VALUES ('Ana', %s, 'x')",
+                            filas, batch_size=10)
+    assert total == 25
+    assert len(_correos(bd)) == 25
+
+    assert bd.execute_many("UPDATE usuarios SET nombre = %s WHERE correo = %s",
+                           [('Bea', 'u1@mercadovecino.co'), ('Bea', 'u2@mercadovecino.co')]) == 2
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+import conexion
+import wsgi
+from conexion import ConnectionPool, DatabaseConnection
+
+
+class ConexionFalsa:
+    in_transaction = False
+
+    def __init__(self):
+        self.cerrada = False
+
+    def close(self):
+        self.cerrada = True
+
+
+def test_compilar_plantillas():
+    assert wsgi.compilar_plantillas(wsgi.app) > 0
+
+
+def test_precalentar_llena_las_caches_y_cierra(bd, crear_usuario, crear_producto):
+    crear_producto(crear_usuario('VENDEDOR'), 'Miel')
+    bd.disconnect()
+
+    assert wsgi.precalentar(wsgi.app)
+    # Las conexiones no cruzan el fork: todas quedaron cerradas
+    assert len(bd._conexiones) == 0
+    assert not wsgi.indice.vencido()
+
+    resp = wsgi.app.test_client().get('/')
+    assert 'desc="1 consultas"' in resp.headers['Server-Timing']
+
+
+def test_despues_de_fork_suelta_sin_cerrar():
+    db = DatabaseConnection(pooled=True)
+    db.pool = ConnectionPool(ConexionFalsa, min_size=2, max_size=2)
+    db.pool.fill()
+    heredadas = [conn for conn, _, _ in db.pool._idle]
+
+    db.despues_de_fork()
+
+    assert db.pool is None
+    assert all(conn in conexion._heredadas and not conn.cerrada for conn in heredadas)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requiere os.fork")
+def test_hijo_abre_su_propia_conexion(bd, crear_usuario):
+    user_id = crear_usuario()
+    conexion_padre = bd.get_connection()
+
+    lectura, escritura = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = bd.get_connection() is not conexion_padre and \
+                bd.execute_query("SELECT id_usuario FROM usuarios") == [{'id_usuario': user_id}]
+            os.write(escritura, b'1' if ok else b'0')
+        finally:
+            os._exit(0)
+    os.close(escritura)
+    os.waitpid(pid, 0)
+    assert os.read(lectura, 1) == b'1'
+    os.close(lectura)
+    # El padre sigue usando su conexión
+    assert bd.get_connection() is conexion_padre
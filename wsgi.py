@@ -0,0 +1,76 @@
+"""
+Punto de entrada WSGI para producción
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+`crear_app()` deja la aplicación lista antes de que los workers reciban tráfico:
+compila las plantillas, construye el índice de búsqueda y renderiza las páginas
+públicas, que quedan en las cachés (consultas, fragmentos, páginas anónimas).
+Con preload_app el proceso maestro hace este trabajo una sola vez y los workers
+lo heredan al hacer fork. Antes del fork el maestro cierra sus conexiones; cada
+worker abre su propio pool en `al_iniciar_worker()` (hook post_fork).
+
+Dimensionamiento y variables de entorno: ver gunicorn.conf.py.
+"""
+import os
+
+from app import app as aplicacion
+from busqueda import indice
+from catalogo import version_catalogo
+from conexion import db
+
+# Páginas públicas que se renderizan al arrancar para llenar las cachés de HTML
+PAGINAS_PRECALENTAR = ('/', '/productos')
+
+
+def compilar_plantillas(app):
+    """Compila todas las plantillas de Jinja; quedan en la caché del entorno"""
+    total = 0
+    for nombre in app.jinja_env.list_templates(extensions=('html',)):
+        app.jinja_env.get_template(nombre)
+        total += 1
+    return total
+
+
+def precalentar(app):
+    """Llena las cachés de la aplicación consultando la base de datos una vez"""
+    if not db.connect():
+        print("❌ No se pudo precalentar: sin conexión a MySQL")
+        return False
+
+    try:
+        version_catalogo.actual()
+        indice.asegurar_cargado()
+        cliente = app.test_client()
+        for ruta in PAGINAS_PRECALENTAR:
+            # Sin cookie de sesión: se guardan como páginas anónimas
+            respuesta = cliente.get(ruta)
+            if respuesta.status_code != 200:
+                print(f"❌ {ruta} respondió {respuesta.status_code} al precalentar")
+        print(f"✅ Cachés listas: índice de búsqueda y {len(PAGINAS_PRECALENTAR)} páginas públicas")
+        return True
+    finally:
+        # Las conexiones no deben cruzar el fork: cada worker abre las suyas
+        db.disconnect()
+
+
+def crear_app():
+    """Aplicación Flask lista para servir: plantillas compiladas y cachés calientes"""
+    plantillas = compilar_plantillas(aplicacion)
+    print(f"✅ {plantillas} plantillas compiladas")
+    if os.environ.get('PRECALENTAR', '1') != '0':
+        precalentar(aplicacion)
+    return aplicacion
+
+
+def al_iniciar_worker():
+    """Abre el pool de conexiones del worker recién creado, antes de que reciba peticiones"""
+    db.connect()
+
+
+def al_terminar_worker():
+    """Cierra las conexiones del worker"""
+    db.disconnect()
+
+
+app = crear_app()